@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Availability benchmarks.
+
+`run` compares the legacy Python overlap scan with the SQL overlap query,
+`run_search` measures the fleet-wide free vehicle search:
+    bench --site <site> execute car_rental.benchmarks.availability.run --kwargs "{'bookings_per_vehicle': 2000}"
+    bench --site <site> execute car_rental.benchmarks.availability.run_search --kwargs "{'vehicles': 5000}"
+
+Synthetic bookings are inserted inside the current transaction and rolled
+back when the run finishes.
+"""
+
+from __future__ import unicode_literals
+import json
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, getdate, now
+
+from car_rental.car_rental.doctype.rental_booking.rental_booking import (
+    get_conflicting_bookings, search_available_vehicles)
+
+STATUSES = ['Confirmed', 'Out', 'Returned', 'Completed', 'Cancelled']
+
+
+def legacy_conflicts(vehicle, start_date, end_date, exclude_booking=None):
+    """The pre-index implementation: fetch every active booking, filter in Python"""
+    filters = {
+        'vehicle': vehicle,
+        'docstatus': 1,
+        'status': ['not in', ['Cancelled', 'Completed']]
+    }
+    if exclude_booking:
+        filters['name'] = ['!=', exclude_booking]
+
+    bookings = frappe.get_all('Rental Booking', filters=filters,
+        fields=['name', 'rental_start', 'rental_end', 'status', 'customer'])
+
+    return [b for b in bookings
+        if start_date <= getdate(b.rental_end) and end_date >= getdate(b.rental_start)]
+
+
+def insert_synthetic_bookings(vehicles, bookings_per_vehicle, base_date, seed=42, batch_size=1000):
+    """Insert back-to-back synthetic bookings per vehicle directly into the table"""
+    rng = random.Random(seed)
+    timestamp = now()
+    rows = []
+
+    for vehicle in vehicles:
+        day = base_date
+        for i in range(bookings_per_vehicle):
+            length = rng.randint(1, 7)
+            start = add_days(day, rng.randint(0, 3))
+            end = add_days(start, length)
+            rows.append((
+                'BENCH-{0}-{1}'.format(vehicle, i), vehicle, 'BENCH-CUSTOMER',
+                1, rng.choice(STATUSES), '{0} 10:00:00'.format(start), '{0} 10:00:00'.format(end),
+                timestamp, timestamp, 'Administrator', 'Administrator'
+            ))
+            day = end
+
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+        frappe.db.sql("""
+            insert into `tabRental Booking`
+                (name, vehicle, customer, docstatus, status, rental_start, rental_end,
+                creation, modified, owner, modified_by)
+            values {0}
+        """.format(placeholders), tuple(value for row in chunk for value in row))
+
+    return len(rows)
+
+
+def insert_synthetic_vehicles(vehicles, seed=42, batch_size=1000):
+    """Insert bare Vehicle rows for the search benchmark"""
+    rng = random.Random(seed)
+    timestamp = now()
+    rows = [(
+        name, 'BENCH-{0}'.format(name), 'Make {0}'.format(rng.randint(1, 10)),
+        'Model {0}'.format(rng.randint(1, 30)), rng.randint(20, 200),
+        timestamp, timestamp, 'Administrator', 'Administrator'
+    ) for name in vehicles]
+
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+        frappe.db.sql("""
+            insert into `tabVehicle`
+                (name, license_plate, make, model, rate_per_day, creation, modified, owner, modified_by)
+            values {0}
+        """.format(placeholders), tuple(value for row in chunk for value in row))
+
+
+def _summarize(durations):
+    durations = sorted(durations)
+    return {
+        'total': round(sum(durations), 4),
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+        'p95_ms': round(durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000, 3)
+    }
+
+
+def _time_calls(fn, queries):
+    durations = []
+    results = []
+    for vehicle, start_date, end_date in queries:
+        started = time.time()
+        results.append(len(fn(vehicle, start_date, end_date)))
+        durations.append(time.time() - started)
+
+    return results, _summarize(durations)
+
+
+def run(vehicles=20, bookings_per_vehicle=1000, samples=200, seed=42):
+    """Benchmark both availability paths and print the comparison as JSON"""
+    rng = random.Random(seed)
+    base_date = getdate('2020-01-01')
+    vehicle_names = ['BENCH-VEHICLE-{0}'.format(i) for i in range(vehicles)]
+
+    try:
+        inserted = insert_synthetic_bookings(vehicle_names, bookings_per_vehicle, base_date, seed)
+
+        queries = []
+        for _ in range(samples):
+            start_date = add_days(base_date, rng.randint(0, bookings_per_vehicle * 5))
+            queries.append((rng.choice(vehicle_names), start_date, add_days(start_date, rng.randint(1, 14))))
+
+        legacy_results, legacy = _time_calls(legacy_conflicts, queries)
+        sql_results, indexed = _time_calls(get_conflicting_bookings, queries)
+
+        result = {
+            'bookings': inserted,
+            'samples': samples,
+            'legacy': legacy,
+            'sql': indexed,
+            'results_match': legacy_results == sql_results
+        }
+        print(json.dumps(result, indent=1))
+        return result
+
+    finally:
+        frappe.db.rollback()
+
+
+def run_search(vehicles=5000, bookings_per_vehicle=200, samples=100, seed=42):
+    """Benchmark the fleet-wide free vehicle search and print latency as JSON"""
+    rng = random.Random(seed)
+    base_date = getdate('2020-01-01')
+    vehicle_names = ['BENCH-VEHICLE-{0}'.format(i) for i in range(vehicles)]
+
+    try:
+        insert_synthetic_vehicles(vehicle_names, seed)
+        inserted = insert_synthetic_bookings(vehicle_names, bookings_per_vehicle, base_date, seed)
+
+        durations = []
+        for _ in range(samples):
+            start_date = add_days(base_date, rng.randint(0, bookings_per_vehicle * 5))
+            started = time.time()
+            search_available_vehicles(start_date, add_days(start_date, rng.randint(1, 14)))
+            durations.append(time.time() - started)
+
+        result = {
+            'vehicles': vehicles,
+            'bookings': inserted,
+            'samples': samples,
+            'search': _summarize(durations)
+        }
+        print(json.dumps(result, indent=1))
+        return result
+
+    finally:
+        frappe.db.rollback()
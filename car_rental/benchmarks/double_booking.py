@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Concurrent submit load test for Rental Booking.
+
+Worker processes each open their own site connection and race to submit
+bookings drawn from a small pool of vehicles and overlapping periods. The run
+reports throughput and checks that no two submitted bookings overlap:
+    bench --site <site> execute car_rental.benchmarks.double_booking.run --kwargs "{'submits': 300, 'processes': 16}"
+
+Bookings created by the run are cancelled and deleted afterwards unless
+keep=True.
+"""
+
+from __future__ import unicode_literals
+import json
+import multiprocessing
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, getdate, today
+
+from car_rental.car_rental import pricing
+from car_rental.car_rental.doctype.rental_booking.rental_booking import VehicleNotAvailableError
+
+
+def _submit_booking(args):
+    site, sites_path, customer, vehicle, start_date, end_date = args
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    frappe.set_user('Administrator')
+
+    started = time.time()
+    outcome = {'vehicle': vehicle, 'name': None, 'result': 'submitted'}
+    try:
+        booking = frappe.new_doc('Rental Booking')
+        booking.customer = customer
+        booking.vehicle = vehicle
+        booking.rental_start = '{0} 10:00:00'.format(start_date)
+        booking.rental_end = '{0} 10:00:00'.format(end_date)
+        booking.status = 'Confirmed'
+        booking.insert()
+        outcome['name'] = booking.name
+        frappe.db.commit()
+
+        booking.submit()
+        frappe.db.commit()
+    except VehicleNotAvailableError:
+        frappe.db.rollback()
+        outcome['result'] = 'rejected'
+    except Exception as e:
+        frappe.db.rollback()
+        outcome['result'] = 'error'
+        outcome['error'] = str(e)
+    finally:
+        outcome['duration'] = time.time() - started
+        frappe.destroy()
+
+    return outcome
+
+
+def find_double_bookings(names):
+    """Pairs of submitted, overlapping bookings on the same vehicle among `names`"""
+    if not names:
+        return []
+
+    return frappe.db.sql("""
+        select a.name, b.name
+        from `tabRental Booking` a
+        join `tabRental Booking` b
+            on a.vehicle = b.vehicle and a.name < b.name
+        where a.name in %(names)s and b.name in %(names)s
+            and a.docstatus = 1 and b.docstatus = 1
+            and date(a.rental_start) <= date(b.rental_end)
+            and date(a.rental_end) >= date(b.rental_start)
+    """, {'names': tuple(names)})
+
+
+def cleanup(names):
+    for name in names:
+        try:
+            booking = frappe.get_doc('Rental Booking', name)
+            if booking.docstatus == 1:
+                booking.cancel()
+            frappe.delete_doc('Rental Booking', name, force=True)
+        except Exception as e:
+            frappe.log_error(f"Error cleaning up load test booking {name}: {str(e)}")
+    frappe.db.commit()
+
+
+def run(submits=200, processes=8, vehicles=5, periods=10, seed=42, keep=False):
+    """Fire concurrent submits and print correctness and throughput as JSON"""
+    rng = random.Random(seed)
+    customer = frappe.db.get_value('Customer', {}, 'name')
+    # Only vehicles with a tariff or rate can be submitted
+    vehicle_names = [v.name for v in frappe.get_all('Vehicle', fields=['name'])
+        if pricing.has_rate(v.name)][:vehicles]
+    if not customer or not vehicle_names:
+        frappe.throw("The load test needs at least one Customer and one Vehicle with a rate or Base Rate rule")
+
+    # Overlapping candidate periods so many submits race for the same days
+    base_date = add_days(getdate(today()), 30)
+    candidates = []
+    for i in range(periods):
+        start_date = add_days(base_date, i * 2)
+        candidates.append((start_date, add_days(start_date, rng.randint(1, 4))))
+
+    jobs = []
+    for _ in range(submits):
+        start_date, end_date = rng.choice(candidates)
+        jobs.append((frappe.local.site, frappe.local.sites_path, customer,
+            rng.choice(vehicle_names), start_date, end_date))
+
+    started = time.time()
+    pool = multiprocessing.get_context('spawn').Pool(processes)
+    try:
+        outcomes = pool.map(_submit_booking, jobs)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - started
+
+    names = [outcome['name'] for outcome in outcomes if outcome['name']]
+    durations = sorted(outcome['duration'] for outcome in outcomes)
+    double_bookings = find_double_bookings(names)
+
+    result = {
+        'submits': submits,
+        'processes': processes,
+        'submitted': sum(1 for o in outcomes if o['result'] == 'submitted'),
+        'rejected': sum(1 for o in outcomes if o['result'] == 'rejected'),
+        'errors': sum(1 for o in outcomes if o['result'] == 'error'),
+        'double_bookings': [list(pair) for pair in double_bookings],
+        'elapsed': round(elapsed, 3),
+        'throughput_per_sec': round(submits / elapsed, 2) if elapsed else 0,
+        'p50_ms': round(durations[len(durations) // 2] * 1000, 1),
+        'p95_ms': round(durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000, 1)
+    }
+    print(json.dumps(result, indent=1))
+
+    if not keep:
+        cleanup(names)
+    return result
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Deterministic synthetic data for benchmarks.
+
+Generates vehicles, customers, bookings with Additional Services, pre/post
+inspections, contracts and the occupancy calendar straight into the tables,
+committing every `batch_size` bookings so runs of up to a million bookings
+keep memory and transactions bounded:
+    bench --site <site> execute car_rental.benchmarks.generator.generate --kwargs "{'bookings': 1000000, 'vehicles': 5000}"
+    bench --site <site> execute car_rental.benchmarks.generator.cleanup
+
+The same seed and as_of date always produce the same rows. Bookings of a
+vehicle never overlap; each vehicle's timeline ends a little after `as_of`,
+so past bookings are Completed (some Cancelled or still Returned), bookings
+spanning `as_of` are Out and later ones Confirmed. Each vehicle's status is
+derived from its planned bookings as of `as_of`. Every generated name
+starts with `prefix`, which is how cleanup finds them.
+"""
+
+from __future__ import unicode_literals
+import json
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, cint, getdate, now
+
+from car_rental.car_rental.doctype.rental_booking.rental_booking import compute_vehicle_status
+from car_rental.car_rental.doctype.vehicle_occupancy.vehicle_occupancy import (
+    get_occupancy_rows, insert_occupancy_rows)
+
+DEFAULT_PREFIX = 'BENCH'
+DEFAULT_AS_OF = '2025-07-01'
+
+VEHICLE_TYPES = ['Compact', 'Sedan', 'SUV', 'Van', 'Luxury']
+VEHICLE_TYPE_RATES = {'Compact': 35, 'Sedan': 50, 'SUV': 80, 'Van': 90, 'Luxury': 180}
+SERVICE_CATALOG = [('GPS', 5), ('Child Seat', 8), ('Additional Driver', 12), ('Full Insurance', 20)]
+FUEL_LEVELS = ['Empty', '1/2', '3/4', 'Full']
+
+# Share of the timeline after as_of, and of past bookings cancelled / awaiting invoice
+FUTURE_SHARE = 0.15
+CANCELLED_SHARE = 0.05
+RETURNED_DAYS = 3
+
+
+def insert_rows(doctype, rows, batch_size=1000):
+    """Multi-row INSERT of dict rows, skipping columns this site does not have"""
+    if not rows:
+        return
+    timestamp = now()
+    columns = [c for c in rows[0] if frappe.db.has_column(doctype, c)]
+    columns += ['creation', 'modified', 'owner', 'modified_by']
+
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        placeholders = ', '.join(['({0})'.format(', '.join(['%s'] * len(columns)))] * len(chunk))
+        values = []
+        for row in chunk:
+            values.extend(row.get(c) for c in columns[:-4])
+            values.extend([timestamp, timestamp, 'Administrator', 'Administrator'])
+        frappe.db.sql("""
+            insert into `tab{doctype}` ({columns}) values {placeholders}
+        """.format(doctype=doctype, columns=', '.join('`{0}`'.format(c) for c in columns),
+            placeholders=placeholders), tuple(values))
+
+
+def plan_vehicle_bookings(rng, count, as_of):
+    """[(start, end, status, docstatus)] back-to-back bookings of one vehicle around as_of"""
+    # Bookings average about six days including the gap before them
+    day = add_days(as_of, -int(count * 6 * (1 - FUTURE_SHARE)))
+    plan = []
+    for _ in range(count):
+        # At least a day between bookings: a return and the next pick-up
+        # on the same day would overlap under the inclusive date checks
+        start = add_days(day, rng.randint(1, 3))
+        end = add_days(start, rng.randint(1, 7))
+        day = end
+
+        if start > as_of:
+            status, docstatus = 'Confirmed', 1
+        elif end >= as_of:
+            status, docstatus = 'Out', 1
+        elif rng.random() < CANCELLED_SHARE:
+            status, docstatus = 'Cancelled', 2
+        elif end >= add_days(as_of, -RETURNED_DAYS):
+            status, docstatus = 'Returned', 1
+        else:
+            status, docstatus = 'Completed', 1
+        plan.append((start, end, status, docstatus))
+    return plan
+
+
+def get_planned_status(plan, as_of):
+    """Vehicle status implied by a plan, by the rule booking updates apply"""
+    return compute_vehicle_status([frappe._dict(rental_start=start, rental_end=end, status=status)
+        for start, end, status, _docstatus in plan], as_of)
+
+
+def make_vehicles(rng, count, prefix):
+    vehicles = []
+    for i in range(count):
+        vehicle_type = VEHICLE_TYPES[i % len(VEHICLE_TYPES)]
+        vehicles.append({
+            'name': '{0}-VEH-{1:06d}'.format(prefix, i),
+            'license_plate': '{0}-{1:06d}'.format(prefix, i),
+            'make': 'Make {0}'.format(rng.randint(1, 12)),
+            'model': 'Model {0}'.format(rng.randint(1, 40)),
+            'vehicle_type': vehicle_type,
+            'rate_per_day': VEHICLE_TYPE_RATES[vehicle_type] + rng.randint(0, 20)
+        })
+    return vehicles
+
+
+def make_customers(count, prefix):
+    return [{
+        'name': '{0}-CUST-{1:06d}'.format(prefix, i),
+        'customer_name': 'Benchmark Customer {0}'.format(i),
+        'customer_type': 'Individual',
+        'email_id': 'customer{0}@example.com'.format(i),
+        'mobile_no': '+1555{0:07d}'.format(i)
+    } for i in range(count)]
+
+
+class Batch(object):
+    """Rows of the dependent doctypes waiting for the next flush"""
+
+    def __init__(self):
+        self.vehicles = []
+        self.bookings = []
+        self.services = []
+        self.inspections = []
+        self.contracts = []
+        self.contract_services = []
+
+    def flush(self, batch_size):
+        insert_rows('Vehicle', self.vehicles, batch_size)
+        insert_rows('Rental Booking', self.bookings, batch_size)
+        insert_rows('Additional Services', self.services + self.contract_services, batch_size)
+        insert_rows('Vehicle Inspection', self.inspections, batch_size)
+        insert_rows('Rental Contract', self.contracts, batch_size)
+
+        occupancy = []
+        for booking in self.bookings:
+            occupancy.extend(get_occupancy_rows(frappe._dict(booking)))
+        insert_occupancy_rows(occupancy)
+        frappe.db.commit()
+
+        counts = {'vehicles': len(self.vehicles), 'bookings': len(self.bookings), 'services': len(self.services),
+                  'inspections': len(self.inspections), 'contracts': len(self.contracts),
+                  'occupancy_days': len(occupancy)}
+        self.__init__()
+        return counts
+
+
+def add_booking(batch, rng, index, prefix, vehicle, customer, plan, max_services, contract_share):
+    start, end, status, docstatus = plan
+    name = '{0}-RB-{1:07d}'.format(prefix, index)
+    no_days = (end - start).days
+
+    booking = {
+        'name': name, 'vehicle': vehicle['name'], 'customer': customer['name'],
+        'docstatus': docstatus, 'status': status,
+        'rental_start': '{0} 10:00:00'.format(start), 'rental_end': '{0} 10:00:00'.format(end),
+        'no_days': no_days, 'rate_per_day': vehicle['rate_per_day'],
+        'pre_inspection': None, 'post_inspection': None, 'rental_contract': None
+    }
+
+    services = []
+    for idx, (service_name, rate) in enumerate(rng.sample(SERVICE_CATALOG, rng.randint(0, max_services)), 1):
+        services.append({
+            'name': '{0}-S{1}'.format(name, idx), 'parent': name, 'parenttype': 'Rental Booking',
+            'parentfield': 'additional_services', 'idx': idx, 'docstatus': docstatus,
+            'service_name': service_name, 'rate': rate, 'quantity': no_days, 'total': rate * no_days
+        })
+    booking['amount'] = no_days * vehicle['rate_per_day'] + sum(s['total'] for s in services)
+    batch.services.extend(services)
+
+    if status in ('Out', 'Returned', 'Completed'):
+        inspection_types = [('Pre-Inspection', 'PRE', start, 'pre_inspection')]
+        if status != 'Out':
+            inspection_types.append(('Post-Inspection', 'POST', end, 'post_inspection'))
+        for inspection_type, code, day, link_field in inspection_types:
+            inspection_name = '{0}-VI-{1}-{2:07d}'.format(prefix, code, index)
+            booking[link_field] = inspection_name
+            batch.inspections.append({
+                'name': inspection_name, 'docstatus': 1, 'status': 'Submitted',
+                'rental_booking': name, 'vehicle': vehicle['name'], 'inspection_type': inspection_type,
+                'inspection_date': '{0} 10:00:00'.format(day), 'fuel_level': rng.choice(FUEL_LEVELS),
+                'condition_summary': 'Generated inspection'
+            })
+
+    if docstatus == 1 and rng.random() < contract_share:
+        contract_name = '{0}-RC-{1:07d}'.format(prefix, index)
+        booking['rental_contract'] = contract_name
+        batch.contracts.append({
+            'name': contract_name, 'docstatus': 1, 'rental_booking': name,
+            'contract_number': contract_name, 'contract_date': '{0} 09:00:00'.format(start),
+            'contract_status': 'Completed' if status == 'Completed' else 'Active',
+            'customer': customer['name'], 'customer_name': customer['customer_name'],
+            'customer_email': customer['email_id'], 'customer_phone': customer['mobile_no'],
+            'vehicle': vehicle['name'], 'license_plate': vehicle['license_plate'],
+            'vehicle_make': vehicle['make'], 'vehicle_model': vehicle['model'],
+            'rental_start_date': booking['rental_start'], 'rental_end_date': booking['rental_end'],
+            'rental_days': str(no_days), 'rate_per_day': str(vehicle['rate_per_day']),
+            'total_amount': str(booking['amount']), 'legal_and_terms': 'Generated contract'
+        })
+        for service in services:
+            batch.contract_services.append(dict(service, name=service['name'].replace('-RB-', '-RC-'),
+                parent=contract_name, parenttype='Rental Contract'))
+
+    batch.bookings.append(booking)
+
+
+def generate(bookings=10000, vehicles=200, customers=2000, max_services=3, contract_share=0.3,
+        seed=42, as_of=DEFAULT_AS_OF, prefix=DEFAULT_PREFIX, batch_size=5000):
+    """Insert a synthetic dataset and print row counts and timing as JSON"""
+    started = time.time()
+    rng = random.Random(seed)
+    as_of = getdate(as_of)
+    bookings, vehicles, customers = cint(bookings), cint(vehicles), cint(customers)
+    batch_size = cint(batch_size) or 5000
+
+    if frappe.db.exists('Vehicle', '{0}-VEH-000000'.format(prefix)):
+        frappe.throw(f"Synthetic data with prefix {prefix} already exists; run cleanup first")
+
+    vehicle_rows = make_vehicles(rng, vehicles, prefix)
+    customer_rows = make_customers(customers, prefix)
+    insert_rows('Customer', customer_rows)
+    frappe.db.commit()
+
+    # Vehicles are inserted with their bookings, once the plan gives their status
+    totals = {'vehicles': 0, 'customers': len(customer_rows), 'bookings': 0,
+              'services': 0, 'inspections': 0, 'contracts': 0, 'occupancy_days': 0}
+    batch = Batch()
+    index = 0
+    for v, vehicle in enumerate(vehicle_rows):
+        # Spread the remainder over the first vehicles so the total is exact
+        count = bookings // vehicles + (1 if v < bookings % vehicles else 0)
+        vehicle_plan = plan_vehicle_bookings(rng, count, as_of)
+        vehicle['status'] = get_planned_status(vehicle_plan, as_of)
+        batch.vehicles.append(vehicle)
+        for plan in vehicle_plan:
+            add_booking(batch, rng, index, prefix, vehicle, rng.choice(customer_rows),
+                plan, cint(max_services), float(contract_share))
+            index += 1
+            if len(batch.bookings) >= batch_size:
+                for key, value in batch.flush(batch_size).items():
+                    totals[key] += value
+
+    for key, value in batch.flush(batch_size).items():
+        totals[key] += value
+
+    result = dict(totals, seed=seed, as_of=str(as_of), prefix=prefix,
+        elapsed=round(time.time() - started, 2))
+    print(json.dumps(result, indent=1))
+    return result
+
+
+def cleanup(prefix=DEFAULT_PREFIX):
+    """Delete every row generated with `prefix`"""
+    like = '{0}-%'.format(prefix)
+    frappe.db.sql("delete from `tabVehicle Occupancy` where rental_booking like %s", like)
+    frappe.db.sql("delete from `tabAdditional Services` where parent like %s", like)
+    for doctype in ('Rental Contract', 'Vehicle Inspection', 'Rental Booking', 'Customer', 'Vehicle'):
+        frappe.db.sql("delete from `tab{0}` where name like %s".format(doctype), like)
+    frappe.db.commit()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Query count and latency of each rental lifecycle action.
+
+run() walks fresh bookings through submit, check-out (Pre-Inspection
+submit), check-in (Post-Inspection submit), invoicing and completion,
+measuring every action and rolling the whole walk back afterwards. It only
+calls entry points the app has always had (document submit,
+create_sales_invoice_from_booking and check_and_complete_if_paid), so with
+car_rental/benchmarks copied into a checkout of the original code the same
+run gives the "before" figures to compare against:
+    bench --site <site> execute car_rental.benchmarks.lifecycle.run --kwargs "{'output': '/tmp/lifecycle-before.json'}"
+    bench --site <site> execute car_rental.benchmarks.runner.compare --kwargs "{'baseline': '/tmp/lifecycle-before.json', 'current': '/tmp/lifecycle-after.json'}"
+"""
+
+from __future__ import unicode_literals
+import json
+
+import frappe
+from frappe.utils import add_days, cint, getdate, now, today
+
+from car_rental.benchmarks.utils import measure, summarize
+
+ACTIONS = ['submit', 'check_out', 'check_in', 'invoice', 'complete']
+
+# Walks are booked this far ahead, clear of real bookings, ten days apart
+FIRST_WALK_OFFSET = 3650
+RENTAL_DAYS = 3
+
+
+def _insert(doc):
+    doc = frappe.get_doc(doc)
+    doc.flags.ignore_permissions = True
+    return doc.insert()
+
+
+def _inspection(booking, inspection_type):
+    return _insert({
+        'doctype': 'Vehicle Inspection',
+        'rental_booking': booking.name,
+        'vehicle': booking.vehicle,
+        'inspection_type': inspection_type
+    })
+
+
+def _expect_success(fn, *args):
+    result = fn(*args)
+    if result.get('status') != 'success':
+        frappe.throw(result.get('message'))
+
+
+def _mark_invoice_paid(booking_name):
+    """Stand in for a Payment Entry: a submitted invoice with nothing outstanding"""
+    invoice = frappe.db.get_value('Rental Booking', booking_name, 'sales_invoice')
+    frappe.db.set_value('Sales Invoice', invoice, {'docstatus': 1, 'outstanding_amount': 0},
+        update_modified=False)
+
+
+def walk(vehicle, customer, start):
+    """Take one new booking through every action: ({action: measure() result}, error)"""
+    from car_rental.car_rental.doctype.rental_booking.rental_booking import (
+        check_and_complete_if_paid, create_sales_invoice_from_booking)
+
+    booking = _insert({
+        'doctype': 'Rental Booking',
+        'customer': customer,
+        'vehicle': vehicle,
+        'rental_start': '{0} 10:00:00'.format(start),
+        'rental_end': '{0} 10:00:00'.format(add_days(start, RENTAL_DAYS))
+    })
+
+    # Each setup prepares its action unmeasured and returns the call to measure
+    def check_out():
+        return _inspection(booking, 'Pre-Inspection').submit
+
+    def check_in():
+        return _inspection(booking, 'Post-Inspection').submit
+
+    def invoice():
+        return lambda: _expect_success(create_sales_invoice_from_booking, booking.name)
+
+    def complete():
+        _mark_invoice_paid(booking.name)
+        return lambda: _expect_success(check_and_complete_if_paid, booking.name)
+
+    steps = [('submit', lambda: booking.submit), ('check_out', check_out), ('check_in', check_in),
+             ('invoice', invoice), ('complete', complete)]
+
+    runs = {}
+    for action, setup in steps:
+        try:
+            runs[action] = measure(setup())
+        except Exception as e:
+            # Later actions depend on this one; report how far the walk got
+            return runs, '{0}: {1}'.format(action, e)
+    return runs, None
+
+
+def get_default_vehicle():
+    """A vehicle with its own Rate Per Day if there is one, as submit needs a rate"""
+    vehicle = None
+    if frappe.get_meta('Vehicle').has_field('rate_per_day'):
+        vehicle = frappe.db.get_value('Vehicle', {'rate_per_day': ['>', 0]}, 'name')
+    return vehicle or frappe.db.get_value('Vehicle', {}, 'name')
+
+
+def run(samples=5, vehicle=None, customer=None, output=None, label=None):
+    """Measure every lifecycle action over `samples` walks and print the result as JSON"""
+    samples = cint(samples) or 1
+    vehicle = vehicle or get_default_vehicle()
+    customer = customer or frappe.db.get_value('Customer', {}, 'name')
+    if not vehicle or not customer:
+        frappe.throw("Needs at least one Vehicle and one Customer")
+
+    runs = {action: [] for action in ACTIONS}
+    errors = []
+    original_commit = frappe.db.commit
+    # Actions commit their writes; keep them inside the walk's transaction instead
+    frappe.db.commit = lambda *args, **kwargs: None
+    try:
+        for i in range(samples):
+            start = add_days(getdate(today()), FIRST_WALK_OFFSET + i * 10)
+            walk_runs, error = walk(vehicle, customer, start)
+            for action, result in walk_runs.items():
+                runs[action].append(result)
+            if error:
+                errors.append(error)
+            frappe.db.rollback()
+    finally:
+        frappe.db.commit = original_commit
+        frappe.db.rollback()
+
+    result = {
+        'meta': {'label': label, 'site': frappe.local.site, 'started_at': now(), 'samples': samples,
+                 'vehicle': vehicle, 'customer': customer},
+        # Invoicing needs Car Rental Settings, items and accounts; errors say where walks stopped
+        'benchmarks': {action: summarize(runs[action]) for action in ACTIONS},
+        'errors': errors
+    }
+
+    output_json = json.dumps(result, indent=1, default=str)
+    print(output_json)
+    if output:
+        with open(output, 'w') as f:
+            f.write(output_json)
+    return result
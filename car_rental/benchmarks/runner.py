@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Benchmark suite for the rental hot paths, run against generator data.
+
+    bench --site <site> execute car_rental.benchmarks.generator.generate --kwargs "{'bookings': 100000}"
+    bench --site <site> execute car_rental.benchmarks.runner.run --kwargs "{'output': '/tmp/bench-main.json'}"
+    bench --site <site> execute car_rental.benchmarks.runner.compare --kwargs "{'baseline': '/tmp/bench-main.json', 'current': '/tmp/bench-branch.json'}"
+
+Every benchmark samples its inputs from the generated rows with a fixed
+seed and rolls back its writes, so runs on the same dataset are comparable.
+Results are printed as JSON and optionally written to `output`.
+"""
+
+from __future__ import unicode_literals
+import json
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, cint, getdate, now
+
+from car_rental.benchmarks.generator import DEFAULT_AS_OF, DEFAULT_PREFIX
+from car_rental.benchmarks.utils import measure, summarize
+from car_rental.car_rental import availability_cache
+
+BENCHMARKS = ['availability', 'vehicle_statuses', 'vehicle_status_smart', 'invoice_creation',
+              'contract_population']
+
+
+def _sample_names(rng, doctype, filters, samples, prefix):
+    filters = dict(filters, name=['like', '{0}-%'.format(prefix)])
+    names = [row.name for row in frappe.get_all(doctype, filters=filters, fields=['name'],
+        order_by='name', limit_page_length=max(samples * 20, 1000))]
+    return rng.sample(names, min(samples, len(names)))
+
+
+def bench_availability(rng, samples, prefix, as_of):
+    """get_vehicle_availability with a cold and a warm availability cache"""
+    from car_rental.car_rental.doctype.rental_booking.rental_booking import get_vehicle_availability
+
+    vehicles = _sample_names(rng, 'Vehicle', {}, samples, prefix)
+    queries = []
+    for vehicle in vehicles:
+        start_date = add_days(as_of, rng.randint(-60, 60))
+        queries.append((vehicle, start_date, add_days(start_date, rng.randint(1, 14))))
+
+    cold, warm = [], []
+    for vehicle, start_date, end_date in queries:
+        availability_cache.invalidate(vehicle)
+        cold.append(measure(get_vehicle_availability, vehicle, start_date, end_date))
+        warm.append(measure(get_vehicle_availability, vehicle, start_date, end_date))
+    return {'cold': summarize(cold), 'warm': summarize(warm)}
+
+
+def bench_vehicle_statuses(rng, samples, prefix, as_of, repeat=3):
+    """update_all_vehicle_statuses over the whole fleet"""
+    from car_rental.car_rental.doctype.rental_booking.rental_booking import update_all_vehicle_statuses
+
+    runs, phases = [], []
+    original_commit = frappe.db.commit
+    # The job commits its writes; keep them inside the run's transaction instead
+    frappe.db.commit = lambda *args, **kwargs: None
+    try:
+        for _ in range(cint(repeat) or 1):
+            result = {}
+            runs.append(measure(lambda: result.update(update_all_vehicle_statuses())))
+            phases.append(result.get('timings') or {})
+            frappe.db.rollback()
+    finally:
+        frappe.db.commit = original_commit
+        frappe.db.rollback()
+
+    return dict(summarize(runs), phases=phases[-1] if phases else {})
+
+
+def bench_vehicle_status_smart(rng, samples, prefix, as_of):
+    """RentalBooking.update_vehicle_status_smart for active bookings"""
+    names = _sample_names(rng, 'Rental Booking', {'docstatus': 1, 'status': ['in', ['Confirmed', 'Out']]},
+        samples, prefix)
+
+    runs = []
+    try:
+        for name in names:
+            doc = frappe.get_doc('Rental Booking', name)
+            runs.append(measure(doc.update_vehicle_status_smart))
+            frappe.db.rollback()
+    finally:
+        frappe.db.rollback()
+    return summarize(runs)
+
+
+def bench_invoice_creation(rng, samples, prefix, as_of):
+    """create_sales_invoice_from_booking for Returned bookings, rolled back after each"""
+    from car_rental.car_rental.doctype.rental_booking.rental_booking import create_sales_invoice_from_booking
+
+    names = _sample_names(rng, 'Rental Booking', {'docstatus': 1, 'status': 'Returned', 'sales_invoice': ['is', 'not set']},
+        samples, prefix)
+
+    runs, errors = [], []
+    try:
+        for name in names:
+            result = {}
+            run = measure(lambda: result.update(create_sales_invoice_from_booking(name)))
+            if result.get('status') == 'success':
+                runs.append(run)
+            else:
+                errors.append(result.get('message'))
+            frappe.db.rollback()
+    finally:
+        frappe.db.rollback()
+
+    # Invoices need a configured company, items and accounts; report why they failed
+    return dict(summarize(runs), errors=len(errors), first_error=errors[0] if errors else None)
+
+
+def bench_contract_population(rng, samples, prefix, as_of):
+    """RentalContract.populate_from_rental_booking with a changed and an unchanged source"""
+    names = _sample_names(rng, 'Rental Contract', {'docstatus': 1}, samples, prefix)
+
+    changed, unchanged = [], []
+    for name in names:
+        doc = frappe.get_doc('Rental Contract', name)
+        doc.source_fingerprint = None
+        changed.append(measure(doc.populate_from_rental_booking))
+        unchanged.append(measure(doc.populate_from_rental_booking))
+    return {'changed': summarize(changed), 'unchanged': summarize(unchanged)}
+
+
+def get_dataset(prefix):
+    like = '{0}-%'.format(prefix)
+    return {
+        doctype: frappe.db.sql("select count(*) from `tab{0}` where name like %s".format(doctype), like)[0][0]
+        for doctype in ('Vehicle', 'Customer', 'Rental Booking', 'Vehicle Inspection', 'Rental Contract')
+    }
+
+
+def run(samples=100, seed=42, benchmarks=None, prefix=DEFAULT_PREFIX, as_of=DEFAULT_AS_OF,
+        output=None, label=None):
+    """Run the suite and print (and optionally save) the results as JSON"""
+    if isinstance(benchmarks, str):
+        benchmarks = json.loads(benchmarks) if benchmarks.startswith('[') else benchmarks.split(',')
+    benchmarks = benchmarks or BENCHMARKS
+    samples = cint(samples) or 1
+
+    dataset = get_dataset(prefix)
+    if not dataset['Rental Booking']:
+        frappe.throw(f"No synthetic bookings with prefix {prefix}; run car_rental.benchmarks.generator.generate first")
+
+    result = {
+        'meta': {
+            'label': label,
+            'site': frappe.local.site,
+            'started_at': now(),
+            'samples': samples,
+            'seed': seed,
+            'dataset': dataset
+        },
+        'benchmarks': {}
+    }
+
+    for name in benchmarks:
+        if name not in BENCHMARKS:
+            frappe.throw(f"Unknown benchmark {name}")
+        started = time.time()
+        # A fresh generator per benchmark keeps its samples independent of the others run
+        result['benchmarks'][name] = globals()['bench_' + name](
+            random.Random('{0}:{1}'.format(seed, name)), samples, prefix, getdate(as_of))
+        result['benchmarks'][name]['elapsed'] = round(time.time() - started, 3)
+
+    output_json = json.dumps(result, indent=1, default=str)
+    print(output_json)
+    if output:
+        with open(output, 'w') as f:
+            f.write(output_json)
+    return result
+
+
+def _flatten(benchmarks, prefix=''):
+    flat = {}
+    for key, value in benchmarks.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix + key + '.'))
+        elif isinstance(value, (int, float)) and key.endswith(('_ms', 'queries')):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(baseline, current):
+    """Per-metric change between two saved runs, as JSON (ratio > 1 means slower)"""
+    with open(baseline) as f:
+        before = _flatten(json.load(f)['benchmarks'])
+    with open(current) as f:
+        after = _flatten(json.load(f)['benchmarks'])
+
+    result = {
+        metric: {
+            'baseline': before[metric],
+            'current': after[metric],
+            'ratio': round(after[metric] / before[metric], 3) if before[metric] else None
+        }
+        for metric in sorted(set(before) & set(after))
+    }
+    print(json.dumps(result, indent=1))
+    return result
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import time
+from contextlib import contextmanager
+
+import frappe
+
+
+@contextmanager
+def count_queries():
+    """Count frappe.db.sql calls made inside the block: `with count_queries() as stats:`"""
+    stats = {'queries': 0, 'seconds': 0}
+    original_sql = frappe.db.sql
+
+    def counting_sql(*args, **kwargs):
+        stats['queries'] += 1
+        return original_sql(*args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    started = time.time()
+    try:
+        yield stats
+    finally:
+        stats['seconds'] = round(time.time() - started, 5)
+        frappe.db.sql = original_sql
+
+
+def measure(fn, *args, **kwargs):
+    """Queries and wall time of one call"""
+    with count_queries() as stats:
+        fn(*args, **kwargs)
+    return {'queries': stats['queries'], 'ms': round(stats['seconds'] * 1000, 2)}
+
+
+def summarize(runs):
+    """Latency percentiles and mean query count of measure() results"""
+    if not runs:
+        return {'runs': 0}
+
+    durations = sorted(run['ms'] for run in runs)
+
+    def percentile(p):
+        return durations[min(int(len(durations) * p), len(durations) - 1)]
+
+    return {
+        'runs': len(runs),
+        'mean_ms': round(sum(durations) / len(durations), 3),
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': durations[-1],
+        'queries': round(sum(run['queries'] for run in runs) / float(len(runs)), 2)
+    }
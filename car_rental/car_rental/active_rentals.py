@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Snapshot and realtime diffs behind the Active Rentals page.
+
+Screens load get_snapshot() once and then apply the diffs published on
+REALTIME_EVENT whenever a booking goes Out, is Returned or leaves the board
+(Completed, Cancelled):
+    {'upsert': [rows], 'remove': [names]}
+
+Diffs are published after the transaction commits, so a screen never shows
+a change that was rolled back. They go to the Rental Booking doctype room,
+which only sessions allowed to read Rental Booking can join; screens
+subscribe to it with frappe.socketio.doctype_subscribe.
+"""
+
+from __future__ import unicode_literals
+import frappe
+from frappe.utils import now
+
+from car_rental.car_rental.instrumentation import instrument
+
+REALTIME_EVENT = 'car_rental_active_rentals'
+
+# Statuses shown on the board; any other status removes the booking
+BOARD_STATUSES = ['Out', 'Returned']
+
+# Lifecycle statuses that trigger a diff
+NOTIFY_STATUSES = BOARD_STATUSES + ['Completed', 'Cancelled']
+
+BOARD_FIELDS = ['name', 'status', 'customer', 'vehicle', 'rental_start', 'rental_end',
+                'pre_inspection', 'post_inspection', 'sales_invoice', 'modified']
+
+
+def get_board_rows(names=None):
+    filters = {'docstatus': 1, 'status': ['in', BOARD_STATUSES]}
+    if names is not None:
+        filters['name'] = ['in', names]
+    return frappe.get_all('Rental Booking', filters=filters, fields=BOARD_FIELDS, order_by='rental_end')
+
+
+@frappe.whitelist()
+@instrument
+def get_snapshot():
+    """All bookings currently on the board, plus the time the snapshot was taken"""
+    frappe.has_permission('Rental Booking', throw=True)
+    return {'rows': get_board_rows(), 'timestamp': now()}
+
+
+def get_diff(names):
+    """{'upsert': [...], 'remove': [...]} bringing a board up to date for `names`"""
+    rows = get_board_rows(names)
+    on_board = {row.name for row in rows}
+    return {'upsert': rows, 'remove': [name for name in names if name not in on_board]}
+
+
+def notify(names):
+    """Publish the board diff for bookings whose lifecycle status just changed"""
+    names = list(set(filter(None, names)))
+    if not names:
+        return
+
+    frappe.publish_realtime(REALTIME_EVENT, get_diff(names), doctype='Rental Booking', after_commit=True)
+
+
+def notify_status_change(booking):
+    """notify() for a saved booking if its status moved into NOTIFY_STATUSES"""
+    previous = booking.get_doc_before_save()
+    if booking.status in NOTIFY_STATUSES and (not previous or previous.status != booking.status):
+        notify([booking.name])
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Cache of active booking rows per vehicle and month bucket.
+
+Every key embeds a per-vehicle version token. Booking lifecycle hooks bump the
+token, so all buckets of that vehicle become unreachable at once and an answer
+computed before a submit/cancel can never be served afterwards.
+
+Hit/miss/invalidation/error counters are kept in a Redis hash shared by all
+workers. Only while a process runs on the in-process fallback does it count
+into its own `local_stats`.
+"""
+
+from __future__ import unicode_literals
+import time
+from collections import OrderedDict
+
+import frappe
+from frappe.utils import add_days, add_months, cint, get_first_day, getdate
+
+from car_rental.car_rental.instrumentation import instrument
+
+CACHE_PREFIX = 'car_rental:availability'
+CACHE_TTL = 6 * 60 * 60
+LOCAL_CACHE_SIZE = 10000
+
+STAT_NAMES = ('hits', 'misses', 'evictions', 'invalidations', 'errors')
+
+# Counters of this process, used while the backend is the in-process fallback
+local_stats = dict.fromkeys(STAT_NAMES, 0)
+
+_backend = None
+
+
+class LocalCache(object):
+    """In-process LRU fallback used when Redis is not reachable"""
+
+    def __init__(self, max_size=LOCAL_CACHE_SIZE):
+        self.max_size = max_size
+        self.data = OrderedDict()
+
+    def get_value(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at and expires_at < time.time():
+            del self.data[key]
+            local_stats['evictions'] += 1
+            return None
+
+        self.data.move_to_end(key)
+        return value
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.data[key] = (value, time.time() + expires_in_sec if expires_in_sec else None)
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+            local_stats['evictions'] += 1
+
+    def delete_value(self, key):
+        self.data.pop(key, None)
+
+
+def get_backend():
+    """Frappe's Redis cache if it answers, otherwise the in-process fallback"""
+    global _backend
+    if _backend is None:
+        try:
+            cache = frappe.cache()
+            cache.ping()
+            _backend = cache
+        except Exception:
+            _backend = LocalCache()
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the cache backend (tests pass a LocalCache or a Redis stand-in)"""
+    global _backend
+    _backend = backend
+
+
+def _key(*parts):
+    return ':'.join([CACHE_PREFIX, frappe.local.site or ''] + [str(part) for part in parts])
+
+
+def count(**increments):
+    """Add to the shared counters in Redis; never fails the lookup being counted"""
+    increments = {name: value for name, value in increments.items() if value}
+    if not increments:
+        return
+
+    backend = get_backend()
+    if not isinstance(backend, LocalCache):
+        try:
+            pipe = backend.pipeline()
+            for name, value in increments.items():
+                pipe.hincrby(_key('stats'), name, value)
+            pipe.execute()
+            return
+        except Exception:
+            pass
+
+    for name, value in increments.items():
+        local_stats[name] += value
+
+
+def _new_version(vehicle):
+    get_backend().set_value(_key('version', vehicle), frappe.generate_hash(length=10))
+
+
+def get_version(vehicle):
+    backend = get_backend()
+    version = backend.get_value(_key('version', vehicle))
+    if not version:
+        version = frappe.generate_hash(length=10)
+        backend.set_value(_key('version', vehicle), version)
+    return version
+
+
+def invalidate(vehicle):
+    """Drop every cached bucket of a vehicle, again after commit when supported"""
+    if not vehicle:
+        return
+
+    try:
+        _new_version(vehicle)
+        count(invalidations=1)
+
+        # A reader between this call and the commit could cache pre-commit rows
+        after_commit = getattr(frappe.db, 'after_commit', None)
+        if after_commit is not None:
+            after_commit.add(lambda: _new_version(vehicle))
+    except Exception as e:
+        count(errors=1)
+        frappe.log_error(f"Error invalidating availability cache for {vehicle}: {str(e)}")
+
+
+def month_buckets(start_date, end_date):
+    """First day of every month touched by the period"""
+    bucket = get_first_day(getdate(start_date))
+    end_date = getdate(end_date)
+    buckets = []
+    while bucket <= end_date:
+        buckets.append(bucket)
+        bucket = add_months(bucket, 1)
+    return buckets
+
+
+def get_active_bookings(vehicle, start_date, end_date, fetch):
+    """Active booking rows of a vehicle touching the months of the period.
+
+    `fetch(vehicle, start, end)` loads active bookings overlapping a date span
+    from the database; all missing buckets are loaded with one call.
+    """
+    try:
+        backend = get_backend()
+        version = get_version(vehicle)
+    except Exception:
+        count(errors=1)
+        return fetch(vehicle, start_date, end_date)
+
+    buckets = month_buckets(start_date, end_date)
+    rows = {}
+    missing = []
+    for bucket in buckets:
+        cached = backend.get_value(_key(vehicle, version, bucket))
+        if cached is None:
+            missing.append(bucket)
+        else:
+            rows.update((row.name, row) for row in cached)
+    count(hits=len(buckets) - len(missing), misses=len(missing))
+
+    if missing:
+        span_end = add_days(add_months(missing[-1], 1), -1)
+        fetched = fetch(vehicle, missing[0], span_end)
+
+        for bucket in missing:
+            bucket_end = add_days(add_months(bucket, 1), -1)
+            bucket_rows = [
+                row for row in fetched
+                if getdate(row.rental_start) <= bucket_end and getdate(row.rental_end) >= bucket
+            ]
+            backend.set_value(_key(vehicle, version, bucket), bucket_rows, expires_in_sec=CACHE_TTL)
+            rows.update((row.name, row) for row in bucket_rows)
+
+    return sorted(rows.values(), key=lambda row: row.rental_start)
+
+
+@frappe.whitelist()
+@instrument
+def get_cache_stats():
+    """Fleet-wide counters from Redis, plus this process's fallback counters.
+
+    Redis evicts and expires keys server-side, so `evictions` on the Redis
+    backend is the server's evicted_keys, which covers every cache user.
+    """
+    frappe.only_for('System Manager')
+    backend = get_backend()
+    if isinstance(backend, LocalCache):
+        stats = dict(local_stats, backend='local', scope='process')
+    else:
+        shared = backend.hgetall(_key('stats')) or {}
+        stats = {name: cint(shared.get(name.encode()) or shared.get(name)) for name in STAT_NAMES}
+        server = backend.info('stats')
+        stats.update(backend='redis', scope='site',
+            evictions=cint(server.get('evicted_keys')), expired_keys=cint(server.get('expired_keys')),
+            local_fallback=dict(local_stats))
+
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0
+    return stats
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Bulk Rental Contract PDF export.
+
+export_contract_pdfs() queues a background job that renders the contracts
+missing from the PDF cache in a pool of worker processes and packs all of
+them into one zip under the site's private files. The zip is written entry
+by entry from the cached files and downloaded through its File URL, so
+neither the job nor the download holds the whole archive in memory.
+
+Cached PDFs live in private/contract_pdf_cache and are named after a hash of
+contract name, contract modified, print format and print format modified,
+language and default letterhead (name and modified): an edited contract,
+print format or letterhead, or a user printing in another language, simply
+misses the cache, and stale entries are pruned by age.
+"""
+
+from __future__ import unicode_literals
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now
+
+from car_rental.car_rental.instrumentation import instrument
+
+REALTIME_EVENT = 'car_rental_contract_export'
+CACHE_FOLDER = 'contract_pdf_cache'
+CACHE_MAX_AGE_DAYS = 30
+RENDER_CHUNK_SIZE = 20
+DEFAULT_PROCESSES = 4
+
+
+def get_cache_dir():
+    path = frappe.get_site_path('private', CACHE_FOLDER)
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
+
+
+def get_print_format(print_format=None):
+    return print_format or frappe.get_meta('Rental Contract').default_print_format or 'Standard'
+
+
+def get_letter_head():
+    """(name, modified) of the default Letter Head that prints of Rental Contract use"""
+    return frappe.db.get_value('Letter Head', {'is_default': 1}, ['name', 'modified']) or (None, None)
+
+
+def get_cache_key(name, modified, print_format, print_format_modified=None, lang=None, letter_head=None):
+    """Everything the rendered PDF depends on: the contract, print format, language and letterhead"""
+    key = '|'.join([name, str(modified), print_format, str(print_format_modified or ''), lang or '']
+        + [str(value or '') for value in (letter_head or (None, None))])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def get_cache_paths(names, print_format):
+    """{name: cached pdf path} for contracts, whether the file exists yet or not"""
+    print_format_modified = frappe.db.get_value('Print Format', print_format, 'modified')
+    letter_head = get_letter_head()
+    cache_dir = get_cache_dir()
+    return {
+        row.name: os.path.join(cache_dir, get_cache_key(row.name, row.modified, print_format,
+            print_format_modified, frappe.local.lang, letter_head) + '.pdf')
+        for row in frappe.get_all('Rental Contract', filters={'name': ['in', names]}, fields=['name', 'modified'])
+    }
+
+
+def _render_contracts(args):
+    """Worker process: render a chunk of contracts into their cache paths"""
+    site, sites_path, user, lang, print_format, jobs = args
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    frappe.set_user(user)
+    # Render in the requesting user's language, which the cache key records
+    frappe.local.lang = lang
+
+    rendered, failed = [], []
+    try:
+        for name, path in jobs:
+            try:
+                pdf = frappe.get_print('Rental Contract', name, print_format, as_pdf=True)
+                # Write under a temporary name so readers never see a partial file
+                tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+                with open(tmp_path, 'wb') as f:
+                    f.write(pdf)
+                os.rename(tmp_path, path)
+                rendered.append(name)
+            except Exception as e:
+                failed.append({'contract': name, 'error': str(e)})
+    finally:
+        frappe.destroy()
+
+    return rendered, failed
+
+
+def render_missing(paths, print_format, processes=DEFAULT_PROCESSES):
+    """Render contracts without a cached PDF in parallel; returns (rendered, failed)"""
+    missing = [(name, path) for name, path in sorted(paths.items()) if not os.path.exists(path)]
+    if not missing:
+        return [], []
+
+    chunks = [missing[i:i + RENDER_CHUNK_SIZE] for i in range(0, len(missing), RENDER_CHUNK_SIZE)]
+    jobs = [(frappe.local.site, frappe.local.sites_path, frappe.session.user, frappe.local.lang, print_format, chunk)
+            for chunk in chunks]
+
+    pool = multiprocessing.get_context('spawn').Pool(min(cint(processes) or 1, len(chunks)))
+    try:
+        results = pool.map(_render_contracts, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+    rendered = [name for names, _failed in results for name in names]
+    failed = [row for _names, rows in results for row in rows]
+    return rendered, failed
+
+
+def write_zip(paths, zip_path):
+    """Pack cached PDFs into `zip_path`, copying each file in chunks from disk"""
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name, path in sorted(paths.items()):
+            if os.path.exists(path):
+                archive.write(path, arcname='{0}.pdf'.format(name))
+                # Touch cache hits so pruning keeps what is still used
+                os.utime(path, None)
+
+
+def prune_cache(max_age_days=CACHE_MAX_AGE_DAYS):
+    """Delete cached PDFs not used for `max_age_days`"""
+    cutoff = time.time() - cint(max_age_days) * 86400
+    removed = 0
+    cache_dir = get_cache_dir()
+    for filename in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, filename)
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+@frappe.whitelist()
+@instrument
+def export_contract_pdfs(contracts, print_format=None, processes=DEFAULT_PROCESSES):
+    """Queue a zip export of many Rental Contract PDFs.
+
+    The finished archive is announced on REALTIME_EVENT to the requesting
+    user with its file URL.
+    """
+    if isinstance(contracts, str):
+        contracts = json.loads(contracts)
+    contracts = list(set(filter(None, contracts)))
+    if not contracts:
+        frappe.throw(_("Select at least one Rental Contract"))
+
+    for name in contracts:
+        frappe.has_permission('Rental Contract', 'print', doc=name, throw=True)
+
+    export_id = frappe.generate_hash(length=10)
+    frappe.enqueue(
+        'car_rental.car_rental.contract_export.build_contract_export',
+        queue='long',
+        timeout=7200,
+        export_id=export_id,
+        contracts=contracts,
+        print_format=get_print_format(print_format),
+        processes=cint(processes) or DEFAULT_PROCESSES
+    )
+
+    return {
+        'status': 'success',
+        'export_id': export_id,
+        'message': f'Exporting {len(contracts)} contracts in the background'
+    }
+
+
+def build_contract_export(export_id, contracts, print_format, processes=DEFAULT_PROCESSES):
+    """Background job: render cache misses, zip everything, publish the download link"""
+    started = time.time()
+    paths = get_cache_paths(contracts, print_format)
+    rendered, failed = render_missing(paths, print_format, processes)
+
+    file_name = f'rental-contracts-{export_id}.zip'
+    zip_path = frappe.get_site_path('private', 'files', file_name)
+    write_zip(paths, zip_path)
+
+    file_doc = frappe.get_doc({
+        'doctype': 'File',
+        'file_name': file_name,
+        'file_url': '/private/files/' + file_name,
+        'file_size': os.path.getsize(zip_path),
+        'is_private': 1
+    })
+    file_doc.flags.ignore_permissions = True
+    file_doc.insert()
+    frappe.db.commit()
+
+    prune_cache()
+
+    if failed:
+        frappe.log_error(
+            "\n".join(f"{row['contract']}: {row['error']}" for row in failed),
+            f"Contract Export {export_id}"
+        )
+
+    result = {
+        'export_id': export_id,
+        'file_url': file_doc.file_url,
+        'contracts': len(paths),
+        'rendered': len(rendered),
+        'cached': len(paths) - len(rendered) - len(failed),
+        'failed': failed,
+        'missing': [name for name in contracts if name not in paths],
+        'elapsed': round(time.time() - started, 3),
+        'finished_at': now()
+    }
+    frappe.publish_realtime(REALTIME_EVENT, result, user=frappe.session.user)
+    return result
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Field-projection loaders shared by the car_rental doctypes.
+
+Use these instead of frappe.get_doc when only a few columns are read: they
+select just the requested fields, skip child tables, and resolve many names
+with a single query. Fields missing from a site's schema (custom fields not
+installed) come back as None instead of raising.
+"""
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model import default_fields
+
+
+def _existing_fields(doctype, fields):
+    meta = frappe.get_meta(doctype)
+    return [f for f in fields if f in default_fields or meta.has_field(f)]
+
+
+def get_fields(doctype, name, fields):
+    """One row of `doctype` projected onto `fields`, or None if it does not exist"""
+    if not name:
+        return None
+
+    row = frappe.db.get_value(doctype, name, ['name'] + _existing_fields(doctype, fields), as_dict=True)
+    if row:
+        for fieldname in fields:
+            row.setdefault(fieldname, None)
+    return row
+
+
+def get_fields_map(doctype, names, fields):
+    """{name: row} for many names of `doctype` with one query"""
+    names = list(set(filter(None, names)))
+    if not names:
+        return {}
+
+    rows = frappe.get_all(
+        doctype,
+        filters={'name': ['in', names]},
+        fields=['name'] + _existing_fields(doctype, fields)
+    )
+    for row in rows:
+        for fieldname in fields:
+            row.setdefault(fieldname, None)
+    return {row.name: row for row in rows}
+
+
+def get_child_rows(child_doctype, parenttype, parents, fields):
+    """{parent: [rows]} of a child table for many parents, in idx order"""
+    parents = list(set(filter(None, parents)))
+    if not parents:
+        return {}
+
+    rows_by_parent = {}
+    for row in frappe.get_all(
+        child_doctype,
+        filters={'parenttype': parenttype, 'parent': ['in', parents]},
+        fields=['parent'] + _existing_fields(child_doctype, fields),
+        order_by='idx'
+    ):
+        rows_by_parent.setdefault(row.parent, []).append(row)
+    return rows_by_parent
@@ -3,26 +3,20 @@
 # For license information, please see license.txt
 
 from __future__ import unicode_literals
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 class AdditionalServices(Document):
-	
- def validate(self):
-        if self.rate < 0:
-            frappe.throw("Rate cannot be negative")
-        
-        if not self.service_name:
-            frappe.throw("Service name is required")
+	# Totals are computed by RentalBooking.calculate_totals, which calls
+	# validate for every row; rows never save their parent
+	def validate(self):
+		if (self.rate or 0) < 0:
+			frappe.throw("Rate cannot be negative")
 
-def before_insert(self):
-        # Set default values
-        if not self.quantity:
-            self.quantity = 1
-    
-def on_update(self):
-        # Recalculate parent totals
-        if self.parent and self.parenttype == 'Rental Booking':
-            parent_doc = frappe.get_doc(self.parenttype, self.parent)
-            parent_doc.calculate_totals()
-            parent_doc.save()
\ No newline at end of file
+		if not self.service_name:
+			if not self.service_item:
+				frappe.throw("Service name is required")
+			self.service_name = self.service_item
+
+		if not self.quantity:
+			self.quantity = 1
@@ -5,6 +5,8 @@
 from __future__ import unicode_literals
 # import frappe
 from frappe.model.document import Document
+from car_rental.car_rental import instrumentation
 
 class CarRentalSettings(Document):
-	pass
+	def on_update(self):
+		instrumentation.set_enabled(self.enable_instrumentation)
@@ -30,11 +30,7 @@ frappe.ui.form.on('Rental Booking', {
     vehicle(frm) {
         check_vehicle_availability(frm);
         if (frm.doc.vehicle) {
-            frappe.db.get_doc('Vehicle', frm.doc.vehicle)
-                .then(vehicle => {
-                    frm.set_value('rate_per_day', vehicle.rate_per_day);
-                    calculate_total_amount(frm);
-                });
+            fetch_quote(frm);
         } else {
             frm.set_value('rate_per_day', 0);
         }
@@ -49,6 +45,7 @@ frappe.ui.form.on('Rental Booking', {
             frm.set_value('status', 'Draft');
         }
         setup_date_restrictions(frm);
+        setup_live_updates(frm);
         check_and_submit_if_needed(frm);
         if (!frm.doc.__islocal && frm.doc.name) {
             setTimeout(() => {
@@ -114,26 +111,6 @@ frappe.ui.form.on('Rental Booking', {
                 add_action_buttons(frm);
             }, 300);
         }
-    },
-
-    on_cancel(frm) {
-        frappe.db.set_value('Rental Booking', frm.doc.name, 'status', 'Cancelled')
-            .then(() => {
-                frm.reload_doc();
-            });
-            
-        if (frm.doc.vehicle) {
-            frappe.db.set_value('Vehicle', frm.doc.vehicle, 'status', 'Available')
-                .then(() => {
-                    frappe.show_alert({
-                        message: __('Vehicle status updated to Available'),
-                        indicator: 'green'
-                    });
-                })
-                .catch(err => {
-                    frappe.msgprint(__('Error updating vehicle status: ') + err.message);
-                });
-        }
     }
 });
 
@@ -468,68 +445,71 @@ function validate_end_date(frm) {
     return true;
 }
 
+const AVAILABILITY_CHECK_DELAY = 400;
+
 function check_vehicle_availability(frm) {
-    return new Promise((resolve) => {
-        if (!frm.doc.vehicle || !frm.doc.rental_start || !frm.doc.rental_end) {
-            resolve(true);
-            return;
-        }
-        frappe.call({
-            method: 'frappe.client.get_list',
-            args: {
-                doctype: 'Rental Booking',
-                filters: {
-                    'vehicle': frm.doc.vehicle,
-                    'status': ['not in', ['Cancelled', 'Completed', 'Draft']],
-                    'name': ['!=', frm.doc.name || ''] 
-                },
-                fields: ['name', 'rental_start', 'rental_end', 'status', 'customer']
-            },
-            callback: function(response) {
-                if (response.message) {
-                    const conflicting_bookings = response.message.filter(booking => {
-                        const booking_start = booking.rental_start;
-                        const booking_end = booking.rental_end;
-                        const selected_start = frm.doc.rental_start;
-                        const selected_end = frm.doc.rental_end;
-                    
-                        return (
-                            (selected_start <= booking_end && selected_end >= booking_start) ||
-                            (booking_start <= selected_end && booking_end >= selected_start)
-                        );
-                    });
-                    
-                    if (conflicting_bookings.length > 0) {
-                        let conflict_details = conflicting_bookings.map(booking => 
-                            `• ${booking.name} (${booking.rental_start} to ${booking.rental_end}) - Status: ${booking.status}`
-                        ).join('<br>');
-                        
-                        frappe.msgprint({
-                            title: __('Vehicle Not Available'),
-                            message: __(`This vehicle is already booked for the selected dates:<br><br>${conflict_details}<br><br>Please select different dates or choose another vehicle.`),
-                            indicator: 'red'
-                        });
-                        
-                        frm.set_value('vehicle', '');
-                        frm.set_value('rate_per_day', 0);
-                        calculate_total_amount(frm);
-                        resolve(false);
-                    } else {
-                        frappe.show_alert({
-                            message: __('Vehicle is available for selected dates'),
-                            indicator: 'green'
-                        });
-                        resolve(true);
-                    }
-                } else {
-                    resolve(true);
-                }
-            },
-            error: function() {
+    // Debounce: fast edits of vehicle/start/end only trigger one server check
+    clearTimeout(frm._availability_timer);
+    frm._availability_timer = setTimeout(() => {
+        run_vehicle_availability_check(frm);
+    }, AVAILABILITY_CHECK_DELAY);
+}
+
+function run_vehicle_availability_check(frm) {
+    // Cancel any in-flight check, its answer would be stale
+    if (frm._availability_request && frm._availability_request.abort) {
+        frm._availability_request.abort();
+    }
+    const request_id = (frm._availability_request_id || 0) + 1;
+    frm._availability_request_id = request_id;
+
+    if (!frm.doc.vehicle || !frm.doc.rental_start || !frm.doc.rental_end) {
+        return;
+    }
+
+    frm._availability_request = frappe.call({
+        method: 'car_rental.car_rental.doctype.rental_booking.rental_booking.get_vehicle_availability',
+        args: {
+            vehicle: frm.doc.vehicle,
+            start_date: frm.doc.rental_start,
+            end_date: frm.doc.rental_end,
+            exclude_booking: frm.doc.__islocal ? null : frm.doc.name
+        },
+        callback: function(response) {
+            if (request_id !== frm._availability_request_id || !response.message) {
+                return;
+            }
+            const result = response.message;
+
+            if (result.error) {
                 frappe.msgprint(__('Error checking vehicle availability'));
-                resolve(false);
+            } else if (!result.available) {
+                let conflict_details = result.conflicts.map(booking => 
+                    `• ${booking.booking_name} (${booking.start_date} to ${booking.end_date}) - Status: ${booking.status}`
+                ).join('<br>');
+                
+                frappe.msgprint({
+                    title: __('Vehicle Not Available'),
+                    message: __(`This vehicle is already booked for the selected dates:<br><br>${conflict_details}<br><br>Please select different dates or choose another vehicle.`),
+                    indicator: 'red'
+                });
+                
+                frm.set_value('vehicle', '');
+                frm.set_value('rate_per_day', 0);
+                calculate_total_amount(frm);
+            } else {
+                frappe.show_alert({
+                    message: __('Vehicle is available for selected dates'),
+                    indicator: 'green'
+                });
             }
-        });
+        },
+        error: function() {
+            if (request_id !== frm._availability_request_id) {
+                return;
+            }
+            frappe.msgprint(__('Error checking vehicle availability'));
+        }
     });
 }
 
@@ -540,8 +520,39 @@ function calculate_days(frm) {
         const diff = frappe.datetime.get_diff(end, start);
         const days = Math.ceil(diff) || 0;
         frm.set_value('no_days', days);
+        fetch_quote(frm);
+    }
+}
+
+function fetch_quote(frm) {
+    // Preview the server price; validate recomputes it when the booking is saved
+    if (!frm.doc.vehicle || frm.doc.docstatus !== 0) {
         calculate_total_amount(frm);
+        return;
     }
+    if (!frm.doc.rental_start || !frm.doc.rental_end || !(frm.doc.no_days > 0)) {
+        frappe.db.get_value('Vehicle', frm.doc.vehicle, 'rate_per_day').then(r => {
+            frm.set_value('rate_per_day', (r.message && r.message.rate_per_day) || 0);
+            calculate_total_amount(frm);
+        });
+        return;
+    }
+
+    frappe.call({
+        method: 'car_rental.car_rental.pricing.get_quote',
+        args: {
+            vehicle: frm.doc.vehicle,
+            rental_start: frm.doc.rental_start,
+            rental_end: frm.doc.rental_end
+        },
+        callback: function(r) {
+            // No quote means the vehicle has no rate yet; keep the entered one as a preview
+            if (r.message) {
+                frm.set_value('rate_per_day', r.message.rate_per_day);
+            }
+            calculate_total_amount(frm);
+        }
+    });
 }
 
 function calculate_total_amount(frm) {
@@ -549,7 +560,7 @@ function calculate_total_amount(frm) {
     let services_total = 0;
 
     (frm.doc.additional_services || []).forEach(row => {
-        const row_total = (row.rate || 0) * (row.quantity || 0);
+        const row_total = (row.rate || 0) * (row.quantity || 1);
         services_total += row_total;
     });
 
@@ -573,7 +584,7 @@ frappe.ui.form.on('Additional Services', {
 
 function calculate_row_total(cdt, cdn) {
     const row = locals[cdt][cdn];
-    const total = (row.rate || 0) * (row.quantity || 0);
+    const total = (row.rate || 0) * (row.quantity || 1);
     frappe.model.set_value(cdt, cdn, 'total', total);
 }
 
@@ -583,30 +594,32 @@ function check_and_submit_if_needed(frm) {
     if (frm.doc.status === 'Out' && frm.doc.docstatus === 0) {
         console.log('Auto-submitting rental booking because pre-inspection is completed');
         
-        // Set status to Confirmed first (required for submission)
-        frm.set_value('status', 'Confirmed');
-        
-        // Save and submit
-        frm.save().then(() => {
-            frm.submit().then(() => {
-                // After submission, update status to Out
-                setTimeout(() => {
-                    frappe.call({
-                        method: 'frappe.client.set_value',
-                        args: {
-                            doctype: 'Rental Booking',
-                            name: frm.doc.name,
-                            fieldname: 'status',
-                            value: 'Out'
-                        },
-                        callback: function() {
-                            frm.reload_doc();
-                        }
-                    });
-                }, 1000);
-            });
-        });
+        // on_submit keeps the Out status, so no follow-up write is needed
+        frm.save('Submit');
     }
 }
 
 
+function setup_live_updates(frm) {
+    // Check-out, check-in and payment completion change the booking on the
+    // server; reload when its Active Rentals diff arrives instead of polling
+    if (frm._live_updates) {
+        return;
+    }
+    frm._live_updates = true;
+
+    if (frappe.socketio && frappe.socketio.socket) {
+        frappe.socketio.doctype_subscribe('Rental Booking');
+    }
+    frappe.realtime.on('car_rental_active_rentals', diff => {
+        if (!frm.doc || frm.doc.__islocal || frm.is_dirty()) {
+            return;
+        }
+        const row = (diff.upsert || []).find(r => r.name === frm.doc.name);
+        if ((row && row.modified !== frm.doc.modified) || (diff.remove || []).includes(frm.doc.name)) {
+            frm.reload_doc();
+        }
+    });
+}
+
+
@@ -4,31 +4,138 @@
 
 from __future__ import unicode_literals
 import frappe
-from frappe.model.document import Document
+from car_rental.car_rental import active_rentals, availability_cache, data_access, pricing
+from car_rental.car_rental.instrumentation import InstrumentedDocument, instrument
+from car_rental.car_rental.unit_of_work import UnitOfWork
+from car_rental.car_rental.doctype.rental_revenue_rollup import rental_revenue_rollup
+from car_rental.car_rental.doctype.vehicle_occupancy import vehicle_occupancy
 
-class RentalBooking(Document):
+
+class VehicleNotAvailableError(frappe.ValidationError):
+    pass
+
+
+class RentalBooking(InstrumentedDocument):
 
     def validate(self):
         """Validation before save/submit"""
-        # Calculate number of days if dates are provided
+        # Totals are fixed at submit; later saves only move the status
+        if self._action in ('save', 'submit'):
+            self.calculate_totals()
+
+    def calculate_totals(self):
+        """Authoritative no_days, service row totals and amount, in one pass over the rows.
+
+        Rent comes from the pricing engine when the booking has a vehicle;
+        the form's figures are only a preview. Child rows never save the
+        parent, so a booking with many services is written once.
+        """
+        from frappe.utils import date_diff, flt
+
         if self.rental_start and self.rental_end:
-            from frappe.utils import date_diff
             self.no_days = date_diff(self.rental_end, self.rental_start)
             if self.no_days <= 0:
                 frappe.throw("End date must be after start date")
 
+        rental_amount = flt(self.no_days) * flt(self.rate_per_day)
+        # A draft of a vehicle without any tariff or rate keeps its entered rate
+        # as a provisional figure; submit refuses it through get_rent_quote
+        if self.vehicle and self.no_days and (self._action == 'submit' or pricing.has_rate(self.vehicle)):
+            rent = pricing.get_rent_quote(self.vehicle, self.rental_start, self.no_days)
+            self.rate_per_day = rent.rate_per_day
+            rental_amount = rent.rental_amount
+
+        # Blank rows (added on the form and never filled in) are dropped
+        # rather than failing the save of the whole booking
+        self.additional_services = [row for row in self.additional_services
+            if row.service_name or row.service_item]
+        for idx, row in enumerate(self.additional_services, 1):
+            row.idx = idx
+
+        services_amount = 0
+        for row, priced in zip(self.additional_services, pricing.price_services(self.additional_services)):
+            row.validate()
+            row.rate, row.quantity, row.total = priced.rate, priced.quantity, priced.total
+            services_amount += priced.total
+
+        self.amount = flt(rental_amount + services_amount, self.precision('amount'))
+
+    def before_submit(self):
+        """Reserve the vehicle before the booking becomes active"""
+        self.reserve_vehicle()
+
+    def reserve_vehicle(self):
+        """Serialize submits per vehicle and refuse overlapping bookings.
+
+        The vehicle row lock makes concurrent submits for the same vehicle wait
+        for each other until commit; other vehicles are not blocked. The
+        conflict query is a locking read so it sees bookings committed while
+        this transaction was waiting.
+        """
+        if not self.vehicle or not self.rental_start or not self.rental_end:
+            return
+        
+        from frappe.utils import add_days, getdate
+        
+        frappe.db.sql("select name from `tabVehicle` where name = %s for update", self.vehicle)
+        
+        conflicts = frappe.db.sql("""
+            select name, rental_start, rental_end, status
+            from `tabRental Booking`
+            where vehicle = %(vehicle)s
+                and docstatus = 1
+                and status not in ('Cancelled', 'Completed')
+                and rental_start < %(end_bound)s
+                and rental_end >= %(start_date)s
+                and name != %(name)s
+            for update
+        """, {
+            'vehicle': self.vehicle,
+            'start_date': getdate(self.rental_start),
+            'end_bound': add_days(getdate(self.rental_end), 1),
+            'name': self.name
+        }, as_dict=True)
+        
+        if conflicts:
+            conflict_details = ', '.join(
+                f"{booking.name} ({booking.rental_start} to {booking.rental_end})" for booking in conflicts)
+            frappe.throw(
+                f"Vehicle {self.vehicle} is already booked for the selected dates: {conflict_details}",
+                VehicleNotAvailableError
+            )
+
     def on_update(self):
         """Handle updates after save"""
+        self.invalidate_availability_cache()
+        # On submit, on_update runs just before on_submit, which does both
+        if self._action == 'submit':
+            return
+        vehicle_occupancy.sync_booking(self)
         if self.vehicle and not self.flags.ignore_vehicle_update:
             self.update_vehicle_status()
 
     def on_update_after_submit(self):
         """Handle status changes after document is submitted"""
+        self.invalidate_availability_cache()
+        vehicle_occupancy.sync_booking(self)
         if self.vehicle and not self.flags.ignore_vehicle_update:
             self.update_vehicle_status()
             
         if self.rental_contract:
           self.update_contract_status()
+
+        previous = self.get_doc_before_save()
+        if self.status == 'Completed' and previous and previous.status != 'Completed':
+            rental_revenue_rollup.record_completion(self.name)
+        active_rentals.notify_status_change(self)
+    
+    def invalidate_availability_cache(self):
+        """Drop cached availability of this booking's vehicle (and a previous one)"""
+        availability_cache.invalidate(self.vehicle)
+        
+        previous = self.get_doc_before_save()
+        if previous and previous.vehicle != self.vehicle:
+            availability_cache.invalidate(previous.vehicle)
     
     def update_vehicle_status(self):
         """Update vehicle status based on rental booking status"""
@@ -36,88 +143,87 @@ class RentalBooking(Document):
 
     def on_submit(self):
         """Actions when document is submitted"""
-        # Set status to Confirmed when submitted
-        self.status = 'Confirmed'
+        # Set status to Confirmed when submitted (a check-out submits straight to Out)
+        if self.status != 'Out':
+            self.status = 'Confirmed'
+        vehicle_occupancy.sync_booking(self)
         
         # Update vehicle status
         if self.vehicle:
             self.flags.ignore_vehicle_update = False
             self.update_vehicle_status()
+        active_rentals.notify_status_change(self)
 
     def on_cancel(self):
         """Actions when document is cancelled"""
-       
-        if self.rental_contract:
-            try:
-                 frappe.db.set_value('Rental Contract', self.rental_contract, {
-                'rental_booking': None,
-                'contract_status': 'Terminated'
-            })
-                 frappe.db.commit()
+        # Inspections go through their own cancel/delete so their hooks and
+        # audit trail run; they all share the request's transaction
+        self.cancel_related_inspections()
+        
+        # The field changes are staged and written together when the block exits
+        with UnitOfWork() as uow:
+            if self.rental_contract:
+                uow.set_value('Rental Contract', self.rental_contract, {
+                    'rental_booking': None,
+                    'contract_status': 'Terminated'
+                })
+            
+            self.status = "Cancelled"
+            uow.set_value('Rental Booking', self.name, 'status', 'Cancelled')
+            uow.after_apply(self.invalidate_availability_cache)
+            uow.after_apply(lambda: active_rentals.notify([self.name]))
+            vehicle_occupancy.sync_booking(self)
             
-                 frappe.msgprint(
+            # Update vehicle status from the remaining active bookings
+            self.update_vehicle_status_smart(uow)
+        
+        if self.rental_contract:
+            frappe.msgprint(
                 f"Rental Contract {self.rental_contract} link removed and status updated to Terminated",
                 alert=True,
                 indicator='orange'
             )
-            except Exception as e:
-                 frappe.log_error(f"Error handling contract on cancel: {str(e)}")
-          
-        # Cancel related vehicle inspections
-        self.cancel_related_inspections()
-        
-        # Update vehicle status to Available
-        
-        self.status = "Cancelled"
-        frappe.db.set_value('Rental Booking', self.name, 'status', 'Cancelled')
-        frappe.db.commit()      
-     
         if self.vehicle:
-            try:
-              self.update_vehicle_status_smart()
-            
-              frappe.msgprint(
+            frappe.msgprint(
                 f"Vehicle {self.vehicle} status updated based on remaining active bookings",
                 alert=True
-               )
-            except Exception as e:
-              frappe.log_error(f"Error updating vehicle status on cancel: {str(e)}")
+            )
         
         
     def cancel_related_inspections(self):
         """Cancel related vehicle inspections when rental booking is cancelled"""
-        try:
-            # Find vehicle inspections linked to this rental booking
-            inspections = frappe.get_all(
-                'Vehicle Inspection',
-                filters={
-                    'rental_booking': self.name,
-                    'docstatus': ['!=', 2]  # Not already cancelled
-                },
-                fields=['name', 'docstatus']
-            )
-            
-            for inspection in inspections:
-                if inspection.docstatus == 1:  # If submitted, cancel it
-                    inspection_doc = frappe.get_doc('Vehicle Inspection', inspection.name)
-                    inspection_doc.cancel()
-                    frappe.msgprint(f"Vehicle Inspection {inspection.name} has been cancelled", alert=True)
-                elif inspection.docstatus == 0:  # If draft, delete it
-                    frappe.delete_doc('Vehicle Inspection', inspection.name)
-                    frappe.msgprint(f"Vehicle Inspection {inspection.name} has been deleted", alert=True)
-                    
-        except Exception as e:
-            frappe.log_error(f"Error cancelling related inspections: {str(e)}")
+        # Find vehicle inspections linked to this rental booking
+        inspections = frappe.get_all(
+            'Vehicle Inspection',
+            filters={
+                'rental_booking': self.name,
+                'docstatus': ['!=', 2]  # Not already cancelled
+            },
+            fields=['name', 'docstatus']
+        )
+        
+        for inspection in inspections:
+            if inspection.docstatus == 1:  # If submitted, cancel it with the booking
+                inspection_doc = frappe.get_doc('Vehicle Inspection', inspection.name)
+                # The booking is being cancelled; its status must not be reset
+                inspection_doc.flags.from_booking_cancel = True
+                inspection_doc.flags.ignore_permissions = True
+                inspection_doc.cancel()
+                frappe.msgprint(f"Vehicle Inspection {inspection.name} has been cancelled", alert=True)
+            elif inspection.docstatus == 0:  # If draft, delete it
+                frappe.delete_doc('Vehicle Inspection', inspection.name)
+                frappe.msgprint(f"Vehicle Inspection {inspection.name} has been deleted", alert=True)
 
     def update_contract_status(self):
        """Update contract status based on rental booking status"""
        if self.rental_contract:
         try:
-            contract_doc = frappe.get_doc('Rental Contract', self.rental_contract)
+            contract_status = frappe.db.get_value('Rental Contract', self.rental_contract, 'contract_status')
             
             # Update contract status based on rental booking status
             if self.status == 'Completed':
-                if contract_doc.contract_status != 'Completed':
+                if contract_status != 'Completed':
+                    contract_doc = frappe.get_doc('Rental Contract', self.rental_contract)
                     contract_doc.contract_status = 'Completed'
                     contract_doc.flags.ignore_permissions = True
                     contract_doc.flags.ignore_validate_update_after_submit = True
@@ -130,7 +236,8 @@ class RentalBooking(Document):
                     )
             
             elif self.status == 'Cancelled':
-                if contract_doc.contract_status != 'Terminated':
+                if contract_status != 'Terminated':
+                    contract_doc = frappe.get_doc('Rental Contract', self.rental_contract)
                     contract_doc.contract_status = 'Terminated'
                     contract_doc.flags.ignore_permissions = True
                     contract_doc.flags.ignore_validate_update_after_submit = True
@@ -146,51 +253,26 @@ class RentalBooking(Document):
             frappe.log_error(f"Error updating contract status: {str(e)}")
      
      
-    def update_vehicle_status_smart(self):
-      """Smart vehicle status update based on current date and all active bookings"""
+    def update_vehicle_status_smart(self, uow=None):
+      """Smart vehicle status update based on current date and all active bookings.
+
+      With a UnitOfWork the change is staged instead of saving the Vehicle.
+      """
       if not self.vehicle:
         return
         
       try:
-        from frappe.utils import today, getdate
-        current_date = getdate(today())
-        
-        # Get all active bookings for this vehicle (not cancelled/completed)
-        active_bookings = frappe.get_all(
-            'Rental Booking',
-            filters={
-                'vehicle': self.vehicle,
-                'docstatus': 1,  # Only submitted bookings
-                'status': ['not in', ['Cancelled', 'Completed']]
-            },
-            fields=['name', 'rental_start', 'rental_end', 'status'],
-            order_by='rental_start'
-        )
-        
-        vehicle_doc = frappe.get_doc('Vehicle', self.vehicle)
-        current_vehicle_status = vehicle_doc.status
-        new_vehicle_status = 'Available'  # Default
+        if uow:
+            vehicle_occupancy.stage_vehicle_status(self.vehicle, uow)
+            return
         
-        # Check what status the vehicle should have based on current date
-        for booking in active_bookings:
-            booking_start = getdate(booking.rental_start)
-            booking_end = getdate(booking.rental_end)
-            
-            if booking_start <= current_date <= booking_end:
-                # Vehicle is currently rented
-                if booking.status == 'Out':
-                    new_vehicle_status = 'Rented'
-                    break
-                elif booking.status == 'Confirmed':
-                    new_vehicle_status = 'Booked'
-                    break
-            elif booking_start > current_date:
-                # Future booking exists
-                if new_vehicle_status == 'Available':  # Only if not already rented/booked
-                    new_vehicle_status = 'Booked'
+        current_vehicle_status = frappe.db.get_value('Vehicle', self.vehicle, 'status')
+        # Read today's and upcoming occupancy from the materialized calendar
+        new_vehicle_status = vehicle_occupancy.get_vehicle_status(self.vehicle)
         
         # Update vehicle status if it needs to change
         if current_vehicle_status != new_vehicle_status:
+            vehicle_doc = frappe.get_doc('Vehicle', self.vehicle)
             vehicle_doc.status = new_vehicle_status
             vehicle_doc.flags.ignore_permissions = True
             vehicle_doc.save()
@@ -205,61 +287,169 @@ class RentalBooking(Document):
         
                
             
+def compute_vehicle_status(active_bookings, current_date):
+    """Derive a vehicle status from its active bookings, ordered by rental_start.
+
+    The same rule vehicle_occupancy.get_vehicle_statuses applies to the
+    calendar: only Confirmed and Out bookings hold the vehicle.
+    """
+    from frappe.utils import getdate
+    
+    new_status = 'Available'  # Default
+    
+    for booking in active_bookings:
+        if booking.status not in ('Confirmed', 'Out'):
+            continue
+        booking_start = getdate(booking.rental_start)
+        booking_end = getdate(booking.rental_end)
+        
+        if booking_start <= current_date <= booking_end:
+            # Vehicle is currently rented
+            if booking.status == 'Out':
+                return 'Rented'
+            return 'Booked'
+        elif booking_start > current_date:
+            # Future booking exists
+            new_status = 'Booked'
+    
+    return new_status
+
+
+VEHICLE_STATUS_BATCH_SIZE = 500
+
+
+def set_vehicle_statuses(changes):
+    """Write vehicle status changes as one UPDATE per target status (chunked)"""
+    from frappe.utils import now
+    
+    modified = now()
+    for status, vehicle_names in changes.items():
+        for i in range(0, len(vehicle_names), VEHICLE_STATUS_BATCH_SIZE):
+            chunk = vehicle_names[i:i + VEHICLE_STATUS_BATCH_SIZE]
+            frappe.db.sql("""
+                update `tabVehicle`
+                set status = %s, modified = %s, modified_by = %s
+                where name in %s
+            """, (status, modified, frappe.session.user, tuple(chunk)))
+
+
+def refresh_vehicle_statuses(vehicles, current_date, whole_fleet=False):
+    """Recompute and write the status of `vehicles` (rows with name and status).
+
+    Statuses come from the occupancy calendar, like every other status
+    update; `whole_fleet` says the list is every vehicle, so the calendar is
+    scanned without a vehicle filter. Returns ({new status: [names]}, phase
+    timings); the caller commits.
+    """
+    import time
+    timings = {}
+    
+    # Today's and upcoming occupancy of these vehicles in one grouped query
+    phase_start = time.time()
+    statuses = vehicle_occupancy.get_vehicle_statuses(
+        [vehicle.name for vehicle in vehicles], current_date, whole_fleet=whole_fleet)
+    timings['fetch'] = round(time.time() - phase_start, 4)
+    
+    phase_start = time.time()
+    changes = {}
+    for vehicle in vehicles:
+        new_status = statuses.get(vehicle.name, 'Available')
+        if vehicle.status != new_status:
+            changes.setdefault(new_status, []).append(vehicle.name)
+    timings['compute'] = round(time.time() - phase_start, 4)
+    
+    # Batched writes grouped by target status
+    phase_start = time.time()
+    set_vehicle_statuses(changes)
+    timings['write'] = round(time.time() - phase_start, 4)
+    
+    return changes, timings
+
+
 @frappe.whitelist()
+@instrument
 def update_all_vehicle_statuses():
     """Update all vehicle statuses based on current bookings - can be run as scheduled job"""
     try:
+        import time
         from frappe.utils import today, getdate
         current_date = getdate(today())
         
-        # Get all vehicles
+        phase_start = time.time()
         vehicles = frappe.get_all('Vehicle', fields=['name', 'status'])
+        vehicles_fetch = round(time.time() - phase_start, 4)
         
-        for vehicle in vehicles:
-            # Get all active bookings for this vehicle
-            active_bookings = frappe.get_all(
-                'Rental Booking',
-                filters={
-                    'vehicle': vehicle.name,
-                    'docstatus': 1,
-                    'status': ['not in', ['Cancelled', 'Completed']]
-                },
-                fields=['name', 'rental_start', 'rental_end', 'status'],
-                order_by='rental_start'
-            )
-            
-            new_status = 'Available'  # Default
-            
-            # Check current status based on today's date
-            for booking in active_bookings:
-                booking_start = getdate(booking.rental_start)
-                booking_end = getdate(booking.rental_end)
-                
-                if booking_start <= current_date <= booking_end:
-                    # Currently in use
-                    if booking.status == 'Out':
-                        new_status = 'Rented'
-                        break
-                    elif booking.status == 'Confirmed':
-                        new_status = 'Booked'
-                        break
-                elif booking_start > current_date:
-                    # Future booking
-                    if new_status == 'Available':
-                        new_status = 'Booked'
-            
-            # Update if status changed
-            if vehicle.status != new_status:
-                frappe.db.set_value('Vehicle', vehicle.name, 'status', new_status)
-                
+        changes, timings = refresh_vehicle_statuses(vehicles, current_date, whole_fleet=True)
+        timings['fetch'] = round(timings['fetch'] + vehicles_fetch, 4)
         frappe.db.commit()
-        return f"Updated vehicle statuses based on current date: {current_date}"
+        
+        updated = sum(len(names) for names in changes.values())
+        return {
+            'status': 'success',
+            'message': f"Updated {updated} of {len(vehicles)} vehicle statuses based on current date: {current_date}",
+            'updated': updated,
+            'by_status': {status: len(names) for status, names in changes.items()},
+            'timings': timings
+        }
         
     except Exception as e:
         frappe.log_error(f"Error updating all vehicle statuses: {str(e)}")
-        return f"Error: {str(e)}"        
+        return {'status': 'error', 'message': str(e)}
+
+AVAILABILITY_INDEX_FIELDS = ['vehicle', 'docstatus', 'status', 'rental_start', 'rental_end']
+
+
+def on_doctype_update():
+    """Composite index backing the availability overlap queries"""
+    frappe.db.add_index('Rental Booking', AVAILABILITY_INDEX_FIELDS, 'vehicle_availability_index')
+
+
+def get_conflicting_bookings(vehicle, start_date, end_date, exclude_booking=None):
+    """Fetch active bookings of a vehicle overlapping the given dates.
+
+    The overlap predicate runs in the database; rental_start/rental_end are
+    Datetime fields, so the end bound is the day after end_date.
+    """
+    from frappe.utils import add_days, getdate
+    
+    filters = [
+        ['vehicle', '=', vehicle],
+        ['docstatus', '=', 1],  # Only submitted bookings
+        ['status', 'not in', ['Cancelled', 'Completed']],
+        ['rental_start', '<', add_days(getdate(end_date), 1)],
+        ['rental_end', '>=', getdate(start_date)]
+    ]
+    
+    if exclude_booking:
+        filters.append(['name', '!=', exclude_booking])
+    
+    return frappe.get_all(
+        'Rental Booking',
+        filters=filters,
+        fields=['name', 'rental_start', 'rental_end', 'status', 'customer'],
+        order_by='rental_start'
+    )
+
+
+def format_conflict(booking, start_date, end_date):
+    """Shape an overlapping booking row for the availability response"""
+    from frappe.utils import getdate
+    
+    booking_start = getdate(booking.rental_start)
+    booking_end = getdate(booking.rental_end)
+    
+    return {
+        'booking_name': booking.name,
+        'start_date': booking.rental_start,
+        'end_date': booking.rental_end,
+        'status': booking.status,
+        'customer': booking.customer,
+        'overlap_type': 'full' if booking_start <= start_date and booking_end >= end_date else 'partial'
+    }
+
 
 @frappe.whitelist()
+@instrument
 def get_vehicle_availability(vehicle, start_date, end_date, exclude_booking=None):
     """Enhanced vehicle availability checker with detailed status"""
     try:
@@ -268,36 +458,15 @@ def get_vehicle_availability(vehicle, start_date, end_date, exclude_booking=None
         start_date = getdate(start_date)
         end_date = getdate(end_date)
         
-        filters = {
-            'vehicle': vehicle,
-            'docstatus': 1,  # Only submitted bookings
-            'status': ['not in', ['Cancelled', 'Completed']]
-        }
-        
-        if exclude_booking:
-            filters['name'] = ['!=', exclude_booking]
+        bookings = availability_cache.get_active_bookings(
+            vehicle, start_date, end_date, get_conflicting_bookings)
         
-        conflicting_bookings = frappe.get_all(
-            'Rental Booking',
-            filters=filters,
-            fields=['name', 'rental_start', 'rental_end', 'status', 'customer']
-        )
-        
-        conflicts = []
-        for booking in conflicting_bookings:
-            booking_start = getdate(booking.rental_start)
-            booking_end = getdate(booking.rental_end)
-            
-            # Check for overlap
-            if start_date <= booking_end and end_date >= booking_start:
-                conflicts.append({
-                    'booking_name': booking.name,
-                    'start_date': booking.rental_start,
-                    'end_date': booking.rental_end,
-                    'status': booking.status,
-                    'customer': booking.customer,
-                    'overlap_type': 'full' if booking_start <= start_date and booking_end >= end_date else 'partial'
-                })
+        conflicts = [
+            format_conflict(booking, start_date, end_date)
+            for booking in bookings
+            if getdate(booking.rental_start) <= end_date and getdate(booking.rental_end) >= start_date
+            and booking.name != exclude_booking
+        ]
         
         return {
             'available': len(conflicts) == 0,
@@ -318,20 +487,248 @@ def get_vehicle_availability(vehicle, start_date, end_date, exclude_booking=None
         
         
 
+def find_overlaps(requests, bookings):
+    """Sort-and-sweep overlap pass.
+
+    `requests` are (index, start_date, end_date, exclude_booking) tuples and
+    `bookings` are rows with date-normalized `start`/`end`, both for one
+    vehicle. Returns {index: [overlapping bookings]}.
+    """
+    requests = sorted(requests, key=lambda r: r[1])
+    bookings = sorted(bookings, key=lambda b: b.start)
+    overlaps = {request[0]: [] for request in requests}
+    
+    active = []
+    position = 0
+    for index, start_date, end_date, exclude_booking in requests:
+        # Admit every booking starting on or before this request's end
+        while position < len(bookings) and bookings[position].start <= end_date:
+            active.append(bookings[position])
+            position += 1
+        # Requests are sorted by start, so bookings ending before it are done for good
+        active = [booking for booking in active if booking.end >= start_date]
+        overlaps[index] = [
+            booking for booking in active
+            if booking.start <= end_date and booking.name != exclude_booking
+        ]
+    
+    return overlaps
+
+
 @frappe.whitelist()
-def create_sales_invoice_from_booking(rental_booking_name):
-    """Create Sales Invoice from Rental Booking after post-inspection"""
+@instrument
+def get_vehicle_availability_batch(items):
+    """Answer many (vehicle, start, end, exclude_booking) availability checks at once.
+
+    Accepts a list (or JSON string) of tuples or dicts and returns a list of
+    results in the same shape as get_vehicle_availability, in input order.
+    """
     try:
-        frappe.log_error(f"🔥 Creating sales invoice for rental booking: {rental_booking_name}", "Sales Invoice Debug")
+        import json
+        from frappe.utils import add_days, getdate
+        
+        if isinstance(items, str):
+            items = json.loads(items)
+        
+        requests_by_vehicle = {}
+        results = [None] * len(items)
+        for index, item in enumerate(items):
+            if isinstance(item, dict):
+                item = (item.get('vehicle'), item.get('start_date'), item.get('end_date'), item.get('exclude_booking'))
+            vehicle, start_date, end_date = item[0], getdate(item[1]), getdate(item[2])
+            exclude_booking = item[3] if len(item) > 3 else None
+            requests_by_vehicle.setdefault(vehicle, []).append((index, start_date, end_date, exclude_booking))
+        
+        if not requests_by_vehicle:
+            return results
+        
+        # One bulk fetch of candidate bookings over the envelope of all periods
+        all_requests = [request for requests in requests_by_vehicle.values() for request in requests]
+        candidates = frappe.get_all(
+            'Rental Booking',
+            filters=[
+                ['vehicle', 'in', list(requests_by_vehicle)],
+                ['docstatus', '=', 1],
+                ['status', 'not in', ['Cancelled', 'Completed']],
+                ['rental_start', '<', add_days(max(r[2] for r in all_requests), 1)],
+                ['rental_end', '>=', min(r[1] for r in all_requests)]
+            ],
+            fields=['name', 'vehicle', 'rental_start', 'rental_end', 'status', 'customer']
+        )
         
-        rental_doc = frappe.get_doc('Rental Booking', rental_booking_name)
-        frappe.log_error(f"✅ Rental doc loaded: {rental_doc.name}", "Sales Invoice Debug")
+        bookings_by_vehicle = {}
+        for booking in candidates:
+            booking.start = getdate(booking.rental_start)
+            booking.end = getdate(booking.rental_end)
+            bookings_by_vehicle.setdefault(booking.vehicle, []).append(booking)
+        
+        for vehicle, requests in requests_by_vehicle.items():
+            overlaps = find_overlaps(requests, bookings_by_vehicle.get(vehicle, []))
+            for index, start_date, end_date, exclude_booking in requests:
+                conflicts = [format_conflict(booking, start_date, end_date) for booking in overlaps[index]]
+                results[index] = {
+                    'available': len(conflicts) == 0,
+                    'conflicts': conflicts,
+                    'vehicle': vehicle,
+                    'requested_period': {
+                        'start': start_date,
+                        'end': end_date
+                    }
+                }
+        
+        return results
         
-        try:
-            settings = frappe.get_single('Car Rental Settings')
-        except:
-            settings = None
-            frappe.log_error("⚠️ Car Rental Settings not found, using defaults", "Sales Invoice Debug")
+    except Exception as e:
+        frappe.log_error(f"Error checking batch vehicle availability: {str(e)}")
+        return [{
+            'available': False,
+            'error': str(e)
+        } for _ in (items if isinstance(items, list) else [])]
+
+
+@frappe.whitelist()
+@instrument
+def search_available_vehicles(start_date, end_date, vehicle_type=None, make=None, model=None,
+                              sort_order='asc', start=0, page_length=20):
+    """Return every vehicle free for the given dates in a single anti-join query"""
+    frappe.has_permission('Vehicle', throw=True)
+    try:
+        from frappe.desk.reportview import get_match_cond
+        from frappe.utils import add_days, getdate, cint
+        
+        start_date = getdate(start_date)
+        end_date = getdate(end_date)
+        if end_date < start_date:
+            frappe.throw("End date must be after start date")
+        
+        start = max(cint(start), 0)
+        page_length = min(max(cint(page_length) or 20, 1), 500)
+        sort_order = 'desc' if str(sort_order).lower() == 'desc' else 'asc'
+        
+        values = {
+            'start_date': start_date,
+            'end_bound': add_days(end_date, 1),
+            'limit': page_length + 1,
+            'offset': start
+        }
+        
+        # vehicle_type and rate_per_day are custom fields some sites do not have
+        meta = frappe.get_meta('Vehicle')
+        fields = ['name'] + [f for f in ('make', 'model', 'license_plate', 'vehicle_type', 'rate_per_day')
+            if meta.has_field(f)]
+        
+        conditions = []
+        for fieldname, value in (('vehicle_type', vehicle_type), ('make', make), ('model', model)):
+            if value:
+                if not meta.has_field(fieldname):
+                    frappe.throw(f"Vehicle has no field {fieldname} to filter by")
+                conditions.append(f"and `tabVehicle`.`{fieldname}` = %({fieldname})s")
+                values[fieldname] = value
+        
+        order_by = f"`tabVehicle`.rate_per_day {sort_order}, `tabVehicle`.name" \
+            if 'rate_per_day' in fields else f"`tabVehicle`.name {sort_order}"
+        
+        # get_match_cond applies user permissions and permission query conditions
+        vehicles = frappe.db.sql("""
+            select {fields}
+            from `tabVehicle`
+            where not exists (
+                select 1 from `tabRental Booking` rb
+                where rb.vehicle = `tabVehicle`.name
+                    and rb.docstatus = 1
+                    and rb.status not in ('Cancelled', 'Completed')
+                    and rb.rental_start < %(end_bound)s
+                    and rb.rental_end >= %(start_date)s
+            )
+            {conditions}
+            {match_conditions}
+            order by {order_by}
+            limit %(limit)s offset %(offset)s
+        """.format(fields=', '.join(f'`tabVehicle`.`{f}`' for f in fields),
+            conditions=' '.join(conditions), match_conditions=get_match_cond('Vehicle'),
+            order_by=order_by), values, as_dict=True)
+        
+        return {
+            'vehicles': vehicles[:page_length],
+            'has_more': len(vehicles) > page_length,
+            'start': start,
+            'page_length': page_length,
+            'requested_period': {
+                'start': start_date,
+                'end': end_date
+            }
+        }
+        
+    except Exception as e:
+        frappe.log_error(f"Error searching available vehicles: {str(e)}")
+        return {
+            'vehicles': [],
+            'error': str(e)
+        }
+
+
+def get_car_rental_settings():
+    """Car Rental Settings, or None when the single has not been set up"""
+    try:
+        return frappe.get_single('Car Rental Settings')
+    except Exception:
+        return None
+
+
+INVOICE_BOOKING_FIELDS = ['customer', 'vehicle', 'rental_start', 'rental_end', 'no_days', 'rate_per_day']
+INVOICE_SERVICE_FIELDS = ['service_name', 'quantity', 'rate', 'total']
+
+
+def make_sales_invoice(rental_doc, services, settings=None):
+    """Build an unsaved Sales Invoice for a rental booking and its services"""
+    invoice = frappe.new_doc('Sales Invoice')
+    invoice.customer = rental_doc.customer
+    invoice.posting_date = frappe.utils.today()
+    invoice.due_date = frappe.utils.add_days(frappe.utils.today(), 30)
+    invoice.set_posting_time = 1
+    invoice.remarks = f"Sales Invoice for Rental Booking: {rental_doc.name}"
+    
+    rental_item = invoice.append('items', {})
+    
+    if settings and settings.get('rental_service'):
+        rental_item.item_code = settings.rental_service
+    else:
+        rental_item.item_code = 'VEHICLE-RENTAL-SERVICE'
+        
+    rental_item.item_name = f"Vehicle Rental - {rental_doc.vehicle}"
+    rental_item.description = f"Rental of {rental_doc.vehicle} from {rental_doc.rental_start} to {rental_doc.rental_end}"
+    rental_item.qty = rental_doc.no_days or 1
+    rental_item.rate = rental_doc.rate_per_day or 0
+    rental_item.amount = (rental_doc.no_days or 1) * (rental_doc.rate_per_day or 0)
+    
+    for service in services or []:
+        if not service.get('service_name'):
+            continue
+        
+        service_item = invoice.append('items', {})
+        service_item.item_code = 'SERVICE-GENERAL'
+        service_item.item_name = service.service_name
+        service_item.description = f"{service.service_name} - {service.get('description') or ''}"
+        service_item.qty = service.get('quantity') or 1
+        service_item.rate = service.get('rate') or 0
+        service_item.amount = service.get('total') or (service_item.qty * service_item.rate)
+    
+    if invoice.meta.has_field('rental_booking_reference'):
+        invoice.rental_booking_reference = rental_doc.name
+    
+    return invoice
+
+
+@frappe.whitelist()
+@instrument
+def create_sales_invoice_from_booking(rental_booking_name):
+    """Create Sales Invoice from Rental Booking after post-inspection"""
+    try:
+        rental_doc = data_access.get_fields('Rental Booking', rental_booking_name, INVOICE_BOOKING_FIELDS + [
+            'status', 'post_inspection', 'sales_invoice'])
+        if not rental_doc:
+            frappe.throw(f"Rental Booking {rental_booking_name} not found")
+        settings = get_car_rental_settings()
     
         # Validate conditions
         if rental_doc.status != 'Returned':
@@ -340,87 +737,19 @@ def create_sales_invoice_from_booking(rental_booking_name):
         if not rental_doc.post_inspection:
             frappe.throw("Post-inspection must be completed before creating invoice")
  
-        post_inspection = frappe.get_doc('Vehicle Inspection', rental_doc.post_inspection)
-        if post_inspection.docstatus != 1:
+        if frappe.db.get_value('Vehicle Inspection', rental_doc.post_inspection, 'docstatus') != 1:
             frappe.throw("Post-inspection must be submitted before creating invoice")
             
         if rental_doc.sales_invoice:
             frappe.throw("Sales Invoice already exists for this rental booking")
         
-        frappe.log_error("✅ All validations passed, creating invoice", "Sales Invoice Debug")
-        
-        
-        invoice = frappe.new_doc('Sales Invoice')
-        invoice.customer = rental_doc.customer
-        invoice.posting_date = frappe.utils.today()
-        invoice.due_date = frappe.utils.add_days(frappe.utils.today(), 30)
-        invoice.set_posting_time = 1
-        invoice.remarks = f"Sales Invoice for Rental Booking: {rental_doc.name}"
-        
-        frappe.log_error("✅ Invoice header created", "Sales Invoice Debug")
-        
-      
-        rental_item = invoice.append('items', {})
-        
-       
-        if settings and hasattr(settings, 'rental_service') and settings.rental_service:
-            rental_item.item_code = settings.rental_service
-        else:
-            rental_item.item_code = 'VEHICLE-RENTAL-SERVICE'
-            
-        rental_item.item_name = f"Vehicle Rental - {rental_doc.vehicle}"
-        rental_item.description = f"Rental of {rental_doc.vehicle} from {rental_doc.rental_start} to {rental_doc.rental_end}"
-        rental_item.qty = rental_doc.no_days or 1
-        rental_item.rate = rental_doc.rate_per_day or 0
-        rental_item.amount = (rental_doc.no_days or 1) * (rental_doc.rate_per_day or 0)
-        
-        frappe.log_error(f"✅ Main rental item added: {rental_item.item_code}", "Sales Invoice Debug")
-        
-        if hasattr(rental_doc, 'additional_services') and rental_doc.additional_services:
-            frappe.log_error(f"📋 Processing {len(rental_doc.additional_services)} additional services", "Sales Invoice Debug")
-            
-            for idx, service in enumerate(rental_doc.additional_services):
-                try:
-                    if not hasattr(service, 'service_name') or not service.service_name:
-                        frappe.log_error(f"⚠️ Service {idx+1} missing service_name, skipping", "Sales Invoice Debug")
-                        continue
-                    
-                    service_item = invoice.append('items', {})
-                    service_item.item_code = 'SERVICE-GENERAL'
-                    service_item.item_name = service.service_name
-                    service_item.description = f"{service.service_name} - {getattr(service, 'description', '')}"
-                    service_item.qty = getattr(service, 'quantity', 1) or 1
-                    service_item.rate = getattr(service, 'rate', 0) or 0
-                    service_item.amount = getattr(service, 'total', 0) or (service_item.qty * service_item.rate)
-                    
-                    frappe.log_error(f"✅ Added service {idx+1}: {service_item.item_code} - {service_item.item_name} - Qty: {service_item.qty}, Rate: {service_item.rate}, Amount: {service_item.amount}", "Sales Invoice Debug")
-                    
-                except Exception as service_error:
-                    frappe.log_error(f"⚠️ Error adding service {idx+1}: {str(service_error)}", "Sales Invoice Debug")
-                    frappe.log_error(f"⚠️ Service data: {service}", "Sales Invoice Debug")
-                    continue
-        else:
-            frappe.log_error("ℹ️ No additional services found", "Sales Invoice Debug")
-        
-        try:
-            if hasattr(invoice, 'rental_booking_reference'):
-                invoice.rental_booking_reference = rental_doc.name
-        except:
-            pass
-        
-        frappe.log_error("🚀 Attempting to insert invoice", "Sales Invoice Debug")
-  
+        services = data_access.get_child_rows(
+            'Additional Services', 'Rental Booking', [rental_doc.name], INVOICE_SERVICE_FIELDS)
+        invoice = make_sales_invoice(rental_doc, services.get(rental_doc.name), settings)
         invoice.insert()
         
-        frappe.log_error(f"✅ Invoice created: {invoice.name}", "Sales Invoice Debug")
-        
-
-        rental_doc.sales_invoice = invoice.name
-        rental_doc.flags.ignore_permissions = True
-        rental_doc.flags.ignore_validate_update_after_submit = True
-        rental_doc.save()
-        
-        frappe.log_error(f"✅ Rental booking updated with invoice reference", "Sales Invoice Debug")
+        frappe.db.set_value('Rental Booking', rental_doc.name, 'sales_invoice', invoice.name)
+        rental_revenue_rollup.record_invoice(rental_doc, services.get(rental_doc.name), invoice.posting_date)
         
         return {
             'status': 'success',
@@ -429,20 +758,136 @@ def create_sales_invoice_from_booking(rental_booking_name):
         }
         
     except Exception as e:
-        frappe.log_error(f"❌ Error creating sales invoice: {str(e)}", "Sales Invoice Error")
-        frappe.log_error(f"❌ Full traceback: {frappe.get_traceback()}", "Sales Invoice Error")
+        frappe.log_error(f"Error creating sales invoice for {rental_booking_name}: {str(e)}\n{frappe.get_traceback()}", "Sales Invoice Error")
         
         return {
             'status': 'error',
             'message': str(e)
         }     
+
+
+BULK_INVOICE_BATCH_SIZE = 100
+
+
+def get_invoiceable_bookings(limit=None):
+    """Returned bookings with a submitted post-inspection and no sales invoice"""
+    return frappe.db.sql_list("""
+        select rb.name
+        from `tabRental Booking` rb
+        inner join `tabVehicle Inspection` vi on vi.name = rb.post_inspection
+        where rb.docstatus = 1
+            and rb.status = 'Returned'
+            and vi.docstatus = 1
+            and ifnull(rb.sales_invoice, '') = ''
+        order by rb.rental_end
+        {limit}
+    """.format(limit=f'limit {frappe.utils.cint(limit)}' if limit else ''))
+
+
+@frappe.whitelist()
+@instrument
+def enqueue_bulk_invoicing(batch_size=BULK_INVOICE_BATCH_SIZE, limit=None):
+    """Queue invoice creation for every eligible booking in background batches"""
+    frappe.only_for(['System Manager', 'Accounts Manager'])
+    
+    batch_size = frappe.utils.cint(batch_size) or BULK_INVOICE_BATCH_SIZE
+    names = get_invoiceable_bookings(limit)
+    run_id = frappe.generate_hash(length=10)
+    
+    batches = [names[i:i + batch_size] for i in range(0, len(names), batch_size)]
+    for index, batch in enumerate(batches):
+        frappe.enqueue(
+            'car_rental.car_rental.doctype.rental_booking.rental_booking.create_sales_invoices_batch',
+            queue='long',
+            timeout=3600,
+            run_id=run_id,
+            batch_index=index,
+            rental_booking_names=batch
+        )
+    
+    frappe.cache().set_value(f'car_rental:bulk_invoicing:{run_id}:total', len(names), expires_in_sec=86400)
+    
+    return {
+        'status': 'success',
+        'run_id': run_id,
+        'bookings': len(names),
+        'batches': len(batches),
+        'message': f'Queued {len(names)} bookings for invoicing in {len(batches)} batches'
+    }
+
+
+def create_sales_invoices_batch(rental_booking_names, run_id=None, batch_index=0):
+    """Background job: invoice a batch of bookings, one failure never aborts the rest"""
+    settings = get_car_rental_settings()
+    
+    # Prefetch bookings and all their service rows with two queries
+    bookings = frappe.get_all(
+        'Rental Booking',
+        filters={'name': ['in', rental_booking_names], 'status': 'Returned', 'docstatus': 1},
+        fields=['name', 'sales_invoice'] + INVOICE_BOOKING_FIELDS
+    )
+    services_by_booking = data_access.get_child_rows(
+        'Additional Services', 'Rental Booking', rental_booking_names, INVOICE_SERVICE_FIELDS)
+    
+    created, failed = [], []
+    found = {booking.name for booking in bookings}
+    for name in rental_booking_names:
+        if name not in found:
+            failed.append({'rental_booking': name, 'error': 'No longer eligible for invoicing'})
+    
+    for booking in bookings:
+        if booking.sales_invoice:
+            continue
+        try:
+            invoice = make_sales_invoice(booking, services_by_booking.get(booking.name), settings)
+            invoice.insert()
+            frappe.db.set_value('Rental Booking', booking.name, 'sales_invoice', invoice.name)
+            rental_revenue_rollup.record_invoice(booking, services_by_booking.get(booking.name), invoice.posting_date)
+            frappe.db.commit()
+            created.append({'rental_booking': booking.name, 'invoice_name': invoice.name})
+        except Exception as e:
+            frappe.db.rollback()
+            failed.append({'rental_booking': booking.name, 'error': str(e)})
+    
+    if failed:
+        frappe.log_error(
+            "\n".join(f"{row['rental_booking']}: {row['error']}" for row in failed),
+            f"Bulk Invoicing {run_id} batch {batch_index}"
+        )
+    
+    result = {'created': len(created), 'failed': failed}
+    if run_id:
+        frappe.cache().hset(f'car_rental:bulk_invoicing:{run_id}', batch_index, result)
+        frappe.publish_realtime('car_rental_bulk_invoicing', dict(result, run_id=run_id, batch_index=batch_index))
+    
+    return result
+
+
+@frappe.whitelist()
+@instrument
+def get_bulk_invoicing_progress(run_id):
+    """Aggregate progress of a bulk invoicing run"""
+    batches = frappe.cache().hgetall(f'car_rental:bulk_invoicing:{run_id}') or {}
+    failed = [row for result in batches.values() for row in result['failed']]
+    
+    return {
+        'run_id': run_id,
+        'total': frappe.cache().get_value(f'car_rental:bulk_invoicing:{run_id}:total'),
+        'batches_done': len(batches),
+        'created': sum(result['created'] for result in batches.values()),
+        'failed': failed
+    }
         
         
 @frappe.whitelist()
+@instrument
 def check_and_complete_if_paid(rental_booking_name):
     """Check if sales invoice is paid and complete rental if so"""
     try:
-        rental_doc = frappe.get_doc('Rental Booking', rental_booking_name)
+        # Most calls stop at a check; the full document is loaded only to complete
+        rental_doc = data_access.get_fields('Rental Booking', rental_booking_name, ['sales_invoice', 'status'])
+        if not rental_doc:
+            return {'status': 'error', 'message': f'Rental Booking {rental_booking_name} not found'}
         
         if not rental_doc.sales_invoice:
             return {'status': 'error', 'message': 'No sales invoice found'}
@@ -453,39 +898,27 @@ def check_and_complete_if_paid(rental_booking_name):
         if rental_doc.status != 'Returned':
             return {'status': 'error', 'message': 'Rental must be in Returned status'}
       
-        invoice = frappe.get_doc('Sales Invoice', rental_doc.sales_invoice)
+        invoice = data_access.get_fields('Sales Invoice', rental_doc.sales_invoice, ['docstatus', 'outstanding_amount'])
         
-        if invoice.docstatus != 1:
+        if not invoice or invoice.docstatus != 1:
             return {'status': 'error', 'message': 'Sales Invoice must be submitted first'}
             
         if invoice.outstanding_amount > 0:
             return {'status': 'pending_payment', 'message': f'Invoice has outstanding amount of {invoice.outstanding_amount}'}
             
         # Update rental booking status to Completed
+        rental_doc = frappe.get_doc('Rental Booking', rental_booking_name)
         rental_doc.status = 'Completed'
         rental_doc.flags.ignore_permissions = True
         rental_doc.flags.ignore_validate_update_after_submit = True
+        # on_update_after_submit refreshes the vehicle status and completes the contract
         rental_doc.save()
         
-        # Update vehicle status to Available
         if rental_doc.vehicle:
-            vehicle_doc = frappe.get_doc('Vehicle', rental_doc.vehicle)
-            vehicle_doc.status = 'Available'
-            vehicle_doc.flags.ignore_permissions = True
-            vehicle_doc.save()
-            
             frappe.msgprint(
-                f"Rental {rental_booking_name} completed automatically after payment confirmation. Vehicle {rental_doc.vehicle} is now available.",
+                f"Rental {rental_booking_name} completed automatically after payment confirmation. Vehicle {rental_doc.vehicle} status refreshed.",
                 alert=True
             )
-            
-        # Update contract status to Completed
-        if rental_doc.rental_contract:
-            contract_doc = frappe.get_doc('Rental Contract', rental_doc.rental_contract)
-            contract_doc.contract_status = 'Completed'
-            contract_doc.flags.ignore_permissions = True
-            contract_doc.flags.ignore_validate_update_after_submit = True
-            contract_doc.save()
         
         return {
             'status': 'success',
@@ -495,49 +928,80 @@ def check_and_complete_if_paid(rental_booking_name):
     except Exception as e:
         frappe.log_error(f"Error completing rental after payment: {str(e)}")
         return {'status': 'error', 'message': str(e)}
+
+
+PAYMENT_COMPLETION_LOCK_TTL = 600
+
+
+def enqueue_payment_completion(sales_invoices):
+    """Queue completion for Returned bookings of the given invoices.
+
+    Bookings are looked up with one query and the job runs only after the
+    payment commits. The job itself takes a short lived per-booking cache
+    key, so concurrent jobs for the same booking complete it once, and a
+    payment that rolls back leaves nothing behind to block a retry.
+    """
+    if not sales_invoices:
+        return
+    
+    rental_bookings = frappe.get_all(
+        'Rental Booking',
+        filters={
+            'sales_invoice': ['in', list(set(sales_invoices))],
+            'status': 'Returned',
+            'docstatus': 1
+        },
+        fields=['name']
+    )
+    
+    if rental_bookings:
+        frappe.enqueue(
+            'car_rental.car_rental.doctype.rental_booking.rental_booking.complete_paid_bookings',
+            rental_booking_names=[booking.name for booking in rental_bookings],
+            enqueue_after_commit=True
+        )
+
+
+def complete_paid_bookings(rental_booking_names):
+    """Background job: complete every booking whose invoice is fully paid"""
+    cache = frappe.cache()
+    for name in rental_booking_names:
+        key = cache.make_key(f'car_rental:complete_booking:{name}')
+        if not cache.set(key, 1, nx=True, ex=PAYMENT_COMPLETION_LOCK_TTL):
+            # Another job is completing this booking right now
+            continue
+        
+        try:
+            result = check_and_complete_if_paid(name)
+            if result['status'] == 'error':
+                frappe.db.rollback()
+                frappe.log_error(f"Error auto-completing rental {name}: {result['message']}")
+            else:
+                frappe.db.commit()
+        finally:
+            cache.delete(key)
+
+
+@instrument
 def on_payment_entry_submit(doc, method):
     """Hook called when a Payment Entry is submitted"""
     try:
-        for reference in doc.references:
-            if reference.reference_doctype == 'Sales Invoice':
-                rental_bookings = frappe.get_all(
-                    'Rental Booking',
-                    filters={
-                        'sales_invoice': reference.reference_name,
-                        'status': 'Returned' 
-                    },
-                    fields=['name']
-                )
-                
-                for booking in rental_bookings:
-                    result = check_and_complete_if_paid(booking.name)
-                    if result['status'] == 'success':
-                        frappe.log_error(f"Auto-completed rental: {booking.name}")
+        enqueue_payment_completion([
+            reference.reference_name for reference in doc.references
+            if reference.reference_doctype == 'Sales Invoice'
+        ])
                         
     except Exception as e:
         frappe.log_error(f"Error in payment entry hook: {str(e)}")
 
 
+@instrument
 def on_sales_invoice_update(doc, method):
     """Hook called when a Sales Invoice is updated after submit"""
     try:
         # Only process if outstanding amount changed to 0
         if doc.outstanding_amount == 0:
-            # Check if this sales invoice is linked to any rental booking
-            rental_bookings = frappe.get_all(
-                'Rental Booking',
-                filters={
-                    'sales_invoice': doc.name,
-                    'status': 'Returned'
-                },
-                fields=['name']
-            )
-            
-            for booking in rental_bookings:
-                result = check_and_complete_if_paid(booking.name)
-                if result['status'] == 'success':
-                    frappe.log_error(f"Auto-completed rental from invoice update: {booking.name}")
+            enqueue_payment_completion([doc.name])
                         
     except Exception as e:
-        frappe.log_error(f"Error in sales invoice update hook: {str(e)}")   
-        
+        frappe.log_error(f"Error in sales invoice update hook: {str(e)}")
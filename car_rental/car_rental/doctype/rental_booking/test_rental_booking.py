@@ -3,8 +3,147 @@
 # See license.txt
 from __future__ import unicode_literals
 
-# import frappe
+import frappe
+import random
 import unittest
+from unittest.mock import patch
+from frappe.utils import getdate
+
+from car_rental.benchmarks.generator import get_planned_status, plan_vehicle_bookings
+from car_rental.car_rental import availability_cache
+from car_rental.car_rental.unit_of_work import UnitOfWork
+from car_rental.car_rental.doctype.rental_booking.rental_booking import compute_vehicle_status, find_overlaps
+
+
+def _booking(start, end, status):
+	return frappe._dict(rental_start=start, rental_end=end, status=status)
+
+
+class RedisStandIn(object):
+	"""Dict-backed stand-in exposing the frappe RedisWrapper value API"""
+	def __init__(self):
+		self.data = {}
+
+	def get_value(self, key):
+		return self.data.get(key)
+
+	def set_value(self, key, value, expires_in_sec=None):
+		self.data[key] = value
+
+	def delete_value(self, key):
+		self.data.pop(key, None)
+
 
 class TestRentalBooking(unittest.TestCase):
-	pass
+	def tearDown(self):
+		availability_cache.set_backend(None)
+
+	def test_compute_vehicle_status(self):
+		today = getdate('2025-07-10')
+
+		self.assertEqual(compute_vehicle_status([], today), 'Available')
+		self.assertEqual(compute_vehicle_status([
+			_booking('2025-07-08', '2025-07-12', 'Out')
+		], today), 'Rented')
+		self.assertEqual(compute_vehicle_status([
+			_booking('2025-07-08', '2025-07-12', 'Confirmed')
+		], today), 'Booked')
+		self.assertEqual(compute_vehicle_status([
+			_booking('2025-07-08', '2025-07-12', 'Returned'),
+			_booking('2025-07-20', '2025-07-22', 'Confirmed')
+		], today), 'Booked')
+		self.assertEqual(compute_vehicle_status([
+			_booking('2025-07-01', '2025-07-05', 'Confirmed')
+		], today), 'Available')
+		# Like the occupancy calendar, a Returned booking never holds the vehicle
+		self.assertEqual(compute_vehicle_status([
+			_booking('2025-07-20', '2025-07-22', 'Returned')
+		], today), 'Available')
+
+	def test_find_overlaps(self):
+		bookings = [
+			frappe._dict(name='RB-1', start=getdate('2025-07-01'), end=getdate('2025-07-05')),
+			frappe._dict(name='RB-2', start=getdate('2025-07-10'), end=getdate('2025-07-12')),
+			frappe._dict(name='RB-3', start=getdate('2025-07-20'), end=getdate('2025-07-30'))
+		]
+		requests = [
+			(0, getdate('2025-07-04'), getdate('2025-07-11'), None),
+			(1, getdate('2025-07-06'), getdate('2025-07-09'), None),
+			(2, getdate('2025-07-01'), getdate('2025-07-31'), 'RB-2'),
+			(3, getdate('2025-07-12'), getdate('2025-07-12'), None)
+		]
+
+		overlaps = find_overlaps(requests, bookings)
+
+		self.assertEqual([b.name for b in overlaps[0]], ['RB-1', 'RB-2'])
+		self.assertEqual(overlaps[1], [])
+		self.assertEqual([b.name for b in overlaps[2]], ['RB-1', 'RB-3'])
+		self.assertEqual([b.name for b in overlaps[3]], ['RB-2'])
+
+	def test_availability_cache_invalidation(self):
+		for backend in (RedisStandIn(), availability_cache.LocalCache()):
+			availability_cache.set_backend(backend)
+			rows = [frappe._dict(name='RB-1', rental_start='2025-07-01 10:00:00', rental_end='2025-07-05 10:00:00')]
+			calls = []
+
+			def fetch(vehicle, start_date, end_date):
+				calls.append((start_date, end_date))
+				return list(rows)
+
+			first = availability_cache.get_active_bookings('VEH-1', '2025-07-02', '2025-08-03', fetch)
+			second = availability_cache.get_active_bookings('VEH-1', '2025-07-10', '2025-07-12', fetch)
+			self.assertEqual(len(calls), 1)
+			self.assertEqual([r.name for r in first], ['RB-1'])
+			self.assertEqual([r.name for r in second], ['RB-1'])
+
+			rows.append(frappe._dict(name='RB-2', rental_start='2025-07-10 10:00:00', rental_end='2025-07-12 10:00:00'))
+			availability_cache.invalidate('VEH-1')
+
+			third = availability_cache.get_active_bookings('VEH-1', '2025-07-10', '2025-07-12', fetch)
+			self.assertEqual(len(calls), 2)
+			self.assertEqual([r.name for r in third], ['RB-1', 'RB-2'])
+
+	def test_unit_of_work_batches_and_atomicity(self):
+		uow = UnitOfWork()
+		uow.set_value('Vehicle', 'VEH-1', 'status', 'Available')
+		uow.set_value('Vehicle', 'VEH-2', 'status', 'Available')
+		uow.set_value('Vehicle', 'VEH-3', 'status', 'Rented')
+		uow.set_value('Rental Contract', 'RC-1', {'rental_booking': None, 'contract_status': 'Terminated'})
+
+		batches = uow.get_batches()
+		self.assertEqual(len(batches), 3)
+		self.assertEqual(batches[0][2], ['VEH-1', 'VEH-2'])
+
+		with patch.object(frappe.db, 'sql') as sql:
+			with self.assertRaises(ValueError):
+				with UnitOfWork() as failing:
+					failing.set_value('Vehicle', 'VEH-1', 'status', 'Available')
+					raise ValueError('cascade failed')
+			sql.assert_not_called()
+
+			with UnitOfWork() as uow:
+				uow.set_value('Vehicle', 'VEH-1', 'status', 'Available')
+				uow.set_value('Vehicle', 'VEH-2', 'status', 'Available')
+			self.assertEqual(sql.call_count, 1)
+
+	def test_synthetic_plan_is_deterministic(self):
+		as_of = getdate('2025-07-01')
+		plan = plan_vehicle_bookings(random.Random(7), 200, as_of)
+		self.assertEqual(plan, plan_vehicle_bookings(random.Random(7), 200, as_of))
+
+		# Back-to-back bookings never overlap, and statuses follow the dates
+		for (_start, end, _status, _docstatus), (next_start, _end, _s, _d) in zip(plan, plan[1:]):
+			self.assertLess(end, next_start)
+		for start, end, status, docstatus in plan:
+			if start > as_of:
+				self.assertEqual(status, 'Confirmed')
+			elif end >= as_of:
+				self.assertEqual(status, 'Out')
+			else:
+				self.assertIn(status, ('Returned', 'Completed', 'Cancelled'))
+			self.assertEqual(docstatus, 2 if status == 'Cancelled' else 1)
+
+		# The timeline runs past as_of, so the vehicle is held by its Out or next Confirmed booking
+		out = [booking for booking in plan if booking[2] == 'Out']
+		self.assertEqual(get_planned_status(plan, as_of), 'Rented' if out else 'Booked')
+		self.assertEqual(get_planned_status([], as_of), 'Available')
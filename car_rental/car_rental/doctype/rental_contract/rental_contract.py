@@ -3,11 +3,77 @@
 # For license information, please see license.txt
 
 from __future__ import unicode_literals
+import hashlib
+
 import frappe
-from frappe.model.document import Document
 from frappe.utils import today, formatdate
+from car_rental.car_rental import data_access
+from car_rental.car_rental.instrumentation import InstrumentedDocument, instrument
+
+CONTRACT_SERVICE_FIELDS = ['service_name', 'quantity', 'rate', 'total']
+
+# (table alias, doctype, fieldname) of every value a contract copies
+CONTRACT_SOURCE_FIELDS = [
+    ('rb', 'Rental Booking', 'customer'),
+    ('rb', 'Rental Booking', 'vehicle'),
+    ('rb', 'Rental Booking', 'rental_start'),
+    ('rb', 'Rental Booking', 'rental_end'),
+    ('rb', 'Rental Booking', 'no_days'),
+    ('rb', 'Rental Booking', 'rate_per_day'),
+    ('rb', 'Rental Booking', 'amount'),
+    ('c', 'Customer', 'customer_name'),
+    ('c', 'Customer', 'email_id'),
+    ('c', 'Customer', 'mobile_no'),
+    ('v', 'Vehicle', 'make'),
+    ('v', 'Vehicle', 'model'),
+    ('v', 'Vehicle', 'license_plate')
+]
+
+
+def get_row_hash(row, fields=CONTRACT_SERVICE_FIELDS):
+    return hashlib.md5('|'.join(str(row.get(f) if row.get(f) is not None else '') for f in fields).encode('utf-8')).hexdigest()
+
+
+def get_source_fingerprint(rental_booking, source, services):
+    """Hash of everything a contract copies: the booking, customer and vehicle
+    values in CONTRACT_SOURCE_FIELDS and the booking's service rows.
+
+    Built from the copied values rather than modified timestamps, which
+    change on writes a contract does not care about (such as the booking's
+    rental_contract link set when the contract itself is submitted).
+    """
+    parts = [rental_booking] + [
+        str(source.get(fieldname)) if source.get(fieldname) is not None else ''
+        for _alias, _doctype, fieldname in CONTRACT_SOURCE_FIELDS
+    ]
+    parts += [get_row_hash(service) for service in services or []]
+    return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
 
-class RentalContract(Document):
+def sync_child_rows(doc, tablefield, source_rows, fields=CONTRACT_SERVICE_FIELDS):
+    """Make `doc.tablefield` match `source_rows` position by position.
+
+    Matching rows are left alone, differing ones are updated in place and
+    only the surplus is appended or dropped, so existing rows keep their names.
+    Returns True if anything changed.
+    """
+    existing = doc.get(tablefield) or []
+    changed = len(existing) != len(source_rows)
+
+    for row, source in zip(existing, source_rows):
+        if get_row_hash(row, fields) != get_row_hash(source, fields):
+            row.update({f: source.get(f) for f in fields})
+            changed = True
+
+    for source in source_rows[len(existing):]:
+        doc.append(tablefield, {f: source.get(f) for f in fields})
+
+    if len(existing) > len(source_rows):
+        doc.set(tablefield, existing[:len(source_rows)])
+    return changed
+
+
+class RentalContract(InstrumentedDocument):
     
     def validate(self):
         """Validation before save/submit"""
@@ -33,10 +99,11 @@ class RentalContract(Document):
     def validate_rental_booking(self):
         """Validate rental booking is in correct status for contract creation"""
         try:
-            rental_doc = frappe.get_doc('Rental Booking', self.rental_booking)
-            
+            booking_docstatus = frappe.db.get_value('Rental Booking', self.rental_booking, 'docstatus')
+            if booking_docstatus is None:
+                raise frappe.DoesNotExistError
             
-            if rental_doc.docstatus != 1:
+            if booking_docstatus != 1:
                 frappe.throw("Contract can only be created for submitted rental bookings")
             
         
@@ -49,44 +116,55 @@ class RentalContract(Document):
         except frappe.DoesNotExistError:
             frappe.throw("Rental booking does not exist")
     
+    def get_source(self):
+        """Every value in CONTRACT_SOURCE_FIELDS with one query; missing fields come back as None"""
+        columns = [
+            f'{alias}.`{fieldname}`' if frappe.get_meta(doctype).has_field(fieldname) else f'null as `{fieldname}`'
+            for alias, doctype, fieldname in CONTRACT_SOURCE_FIELDS
+        ]
+        rows = frappe.db.sql("""
+            select {0}
+            from `tabRental Booking` rb
+            left join `tabCustomer` c on c.name = rb.customer
+            left join `tabVehicle` v on v.name = rb.vehicle
+            where rb.name = %s
+        """.format(', '.join(columns)), self.rental_booking, as_dict=True)
+        return rows[0] if rows else None
+
     def populate_from_rental_booking(self):
-        """Auto-populate contract fields from rental booking"""
+        """Auto-populate contract fields from rental booking when the source changed"""
         try:
-            rental_doc = frappe.get_doc('Rental Booking', self.rental_booking)
+            source = self.get_source()
+            if not source:
+                return
+
+            services = data_access.get_child_rows('Additional Services', 'Rental Booking', [self.rental_booking],
+                CONTRACT_SERVICE_FIELDS).get(self.rental_booking) or []
+            fingerprint = get_source_fingerprint(self.rental_booking, source, services)
+            if fingerprint == self.source_fingerprint:
+                return
             
-           
-            self.customer = rental_doc.customer
-            self.vehicle = rental_doc.vehicle
-            self.rental_start_date = str(rental_doc.rental_start)
-            self.rental_end_date = str(rental_doc.rental_end)
-            self.rental_days = str(rental_doc.no_days or 0)
-            self.rate_per_day = str(rental_doc.rate_per_day or 0)
-            self.total_amount = str(rental_doc.amount or 0)
+            self.customer = source.customer
+            self.vehicle = source.vehicle
+            self.rental_start_date = str(source.rental_start)
+            self.rental_end_date = str(source.rental_end)
+            self.rental_days = str(source.no_days or 0)
+            self.rate_per_day = str(source.rate_per_day or 0)
+            self.total_amount = str(source.amount or 0)
             
             
-            if rental_doc.customer:
-                customer_doc = frappe.get_doc('Customer', rental_doc.customer)
-                self.customer_name = customer_doc.customer_name
-                self.customer_email = getattr(customer_doc, 'email_id', '')
-                self.customer_phone = getattr(customer_doc, 'mobile_no', '')
+            self.customer_name = source.customer_name
+            self.customer_email = source.email_id or ''
+            self.customer_phone = source.mobile_no or ''
             
       
-            if rental_doc.vehicle:
-                vehicle_doc = frappe.get_doc('Vehicle', rental_doc.vehicle)
-                self.vehicle_make = getattr(vehicle_doc, 'make', '')
-                self.vehicle_model = getattr(vehicle_doc, 'model', '')
-                self.license_plate = getattr(vehicle_doc, 'license_plate', '')
+            self.vehicle_make = source.make or ''
+            self.vehicle_model = source.model or ''
+            self.license_plate = source.license_plate or ''
                 
    
-            self.set('additional_services', [])
-            if rental_doc.additional_services:
-                for service in rental_doc.additional_services:
-                    self.append('additional_services', {
-                        'service_name': service.service_name,
-                        'quantity': service.quantity,
-                        'rate': service.rate,
-                        'total': service.total
-                    })
+            sync_child_rows(self, 'additional_services', services)
+            self.source_fingerprint = fingerprint
             
             # Leave terms and conditions empty for user to fill
             # User will write their own terms and conditions
@@ -106,11 +184,7 @@ class RentalContract(Document):
         # Update rental booking with contract reference
         if self.rental_booking:
             try:
-                rental_doc = frappe.get_doc('Rental Booking', self.rental_booking)
-                rental_doc.rental_contract = self.name
-                rental_doc.flags.ignore_permissions = True
-                rental_doc.flags.ignore_validate_update_after_submit = True
-                rental_doc.save()
+                frappe.db.set_value('Rental Booking', self.rental_booking, 'rental_contract', self.name)
                 
                 frappe.msgprint(f"Rental booking {self.rental_booking} updated with contract reference", 
                               alert=True, indicator='green')
@@ -126,23 +200,20 @@ class RentalContract(Document):
         # Remove contract reference from rental booking
         if self.rental_booking:
             try:
-                rental_doc = frappe.get_doc('Rental Booking', self.rental_booking)
-                rental_doc.rental_contract = None
-                rental_doc.flags.ignore_permissions = True
-                rental_doc.flags.ignore_validate_update_after_submit = True
-                rental_doc.save()
+                frappe.db.set_value('Rental Booking', self.rental_booking, 'rental_contract', None)
                 
             except Exception as e:
                 frappe.log_error(f"Error removing contract reference from rental booking: {str(e)}")
 
 
 @frappe.whitelist()
+@instrument
 def create_contract_from_booking(rental_booking_name):
     """Create rental contract from rental booking"""
     try:
-        rental_doc = frappe.get_doc('Rental Booking', rental_booking_name)
+        booking_docstatus = frappe.db.get_value('Rental Booking', rental_booking_name, 'docstatus')
     
-        if rental_doc.docstatus != 1:
+        if booking_docstatus != 1:
             return {
                 'status': 'error',
                 'message': 'Rental booking must be submitted before creating contract'
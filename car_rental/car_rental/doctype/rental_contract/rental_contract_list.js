@@ -0,0 +1,38 @@
+// The export runs in the background and announces its zip when done
+function show_contract_export(result) {
+    let message = __("{0} contracts exported ({1} from cache)", [result.contracts, result.cached]);
+    if (result.failed.length) {
+        message += "<br>" + __("{0} failed, see Error Log", [result.failed.length]);
+    }
+    frappe.msgprint({
+        title: __("Contract Export Ready"),
+        message: message + `<br><a href="${result.file_url}" target="_blank">${__("Download zip")}</a>`,
+        indicator: result.failed.length ? "orange" : "green"
+    });
+}
+
+frappe.listview_settings["Rental Contract"] = {
+    onload: function(listview) {
+        listview.page.add_actions_menu_item(__("Export PDFs (zip)"), function() {
+            const names = listview.get_checked_items(true);
+            if (!names.length) {
+                frappe.msgprint(__("Select the contracts to export"));
+                return;
+            }
+
+            frappe.call({
+                method: "car_rental.car_rental.contract_export.export_contract_pdfs",
+                args: { contracts: names },
+                callback: function(r) {
+                    if (r.message) {
+                        frappe.show_alert({ message: r.message.message, indicator: "blue" });
+                    }
+                }
+            });
+        });
+
+        // onload runs on every visit of the list; keep a single handler
+        frappe.realtime.off("car_rental_contract_export", show_contract_export);
+        frappe.realtime.on("car_rental_contract_export", show_contract_export);
+    }
+};
@@ -3,8 +3,32 @@
 # See license.txt
 from __future__ import unicode_literals
 
-# import frappe
+import frappe
 import unittest
 
+from car_rental.car_rental.doctype.rental_contract.rental_contract import get_source_fingerprint
+
 class TestRentalContract(unittest.TestCase):
-	pass
+	def test_source_fingerprint(self):
+		source = frappe._dict(customer='CUST-1', vehicle='VEH-1', rental_start='2025-07-01 10:00:00',
+			rental_end='2025-07-04 10:00:00', no_days=3, rate_per_day=50, amount=160,
+			customer_name='Jane Doe', email_id='jane@example.com', mobile_no='+15550000001',
+			make='Toyota', model='Corolla', license_plate='ABC-123')
+		services = [frappe._dict(service_name='GPS', quantity=2, rate=5, total=10)]
+		fingerprint = get_source_fingerprint('RB-1', source, services)
+
+		# Timestamps are not part of it: a rental_contract link write changes nothing
+		self.assertEqual(fingerprint, get_source_fingerprint('RB-1',
+			frappe._dict(source, modified='2025-07-02 08:00:00', rental_contract='RC-1'),
+			[frappe._dict(service_name='GPS', quantity=2, rate=5, total=10)]))
+
+		# Any copied value - booking, customer, vehicle or a service row - is detected
+		self.assertNotEqual(fingerprint, get_source_fingerprint('RB-2', source, services))
+		self.assertNotEqual(fingerprint, get_source_fingerprint('RB-1', frappe._dict(source, amount=170), services))
+		self.assertNotEqual(fingerprint, get_source_fingerprint('RB-1',
+			frappe._dict(source, email_id='jane.doe@example.com'), services))
+		self.assertNotEqual(fingerprint, get_source_fingerprint('RB-1',
+			frappe._dict(source, license_plate='XYZ-987'), services))
+		self.assertNotEqual(fingerprint, get_source_fingerprint('RB-1', source,
+			[frappe._dict(service_name='GPS', quantity=3, rate=5, total=15)]))
+		self.assertNotEqual(fingerprint, get_source_fingerprint('RB-1', source, []))
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate
+
+from car_rental.car_rental import pricing
+
+
+class RentalRateRule(Document):
+
+    def validate(self):
+        if self.rule_type == 'Base Rate' and self.rate is not None and self.rate < 0:
+            frappe.throw("Rate cannot be negative")
+
+        if self.rule_type == 'Season':
+            if not self.from_date or not self.to_date:
+                frappe.throw("Season rules need a From Date and a To Date")
+            if getdate(self.to_date) < getdate(self.from_date):
+                frappe.throw("To Date must be after From Date")
+
+        if self.rule_type == 'Weekday' and not self.weekday:
+            frappe.throw("Weekday rules need a Weekday")
+
+        if self.rule_type == 'Length Discount' and (self.min_days or 0) <= 0:
+            frappe.throw("Length Discount rules need Minimum Days greater than zero")
+
+    def on_update(self):
+        pricing.invalidate()
+
+    def on_trash(self):
+        pricing.invalidate()
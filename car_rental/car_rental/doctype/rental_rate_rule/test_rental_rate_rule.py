@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and Contributors
+# See license.txt
+from __future__ import unicode_literals
+
+import frappe
+import unittest
+from frappe.utils import getdate
+
+from car_rental.car_rental import pricing
+from car_rental.car_rental.pricing import RateTable
+
+
+def make_rule(rule_type, **kwargs):
+	rule = frappe._dict({'vehicle_type': None, 'priority': 0, 'rate': 0, 'adjustment_percent': 0,
+		'from_date': None, 'to_date': None, 'weekday': None, 'min_days': 0})
+	rule.update(kwargs, rule_type=rule_type)
+	return rule
+
+
+class TestRentalRateRule(unittest.TestCase):
+	def setUp(self):
+		self.table = RateTable('v1', [
+			make_rule('Base Rate', rate=40),
+			make_rule('Base Rate', vehicle_type='SUV', rate=80),
+			make_rule('Weekday', weekday='Saturday', adjustment_percent=10),
+			make_rule('Season', vehicle_type='SUV', from_date='2025-08-01', to_date='2025-08-31', adjustment_percent=20),
+			make_rule('Season', vehicle_type='SUV', from_date='2025-08-10', to_date='2025-08-12',
+				adjustment_percent=50, priority=1),
+			make_rule('Length Discount', min_days=7, adjustment_percent=5),
+			make_rule('Length Discount', min_days=30, adjustment_percent=15)
+		], [
+			frappe._dict(name='VEH-1', rate_per_day=0, vehicle_type='SUV'),
+			frappe._dict(name='VEH-2', rate_per_day=55, vehicle_type='SUV'),
+			frappe._dict(name='VEH-3', rate_per_day=0, vehicle_type='Compact')
+		])
+
+	def test_base_rate_precedence(self):
+		self.assertEqual(self.table.get_base_rate('VEH-1'), 80)
+		# The Vehicle Type tariff wins over the vehicle's stored rate
+		self.assertEqual(self.table.get_base_rate('VEH-2'), 80)
+		self.assertEqual(self.table.get_base_rate('VEH-3'), 40)
+
+	def test_vehicle_rate_fallback(self):
+		table = RateTable('v2', [
+			make_rule('Season', vehicle_type='SUV', from_date='2025-08-01', to_date='2025-08-31', adjustment_percent=20)
+		], [
+			frappe._dict(name='VEH-2', rate_per_day=55, vehicle_type='SUV'),
+			frappe._dict(name='VEH-3', rate_per_day=0, vehicle_type='Compact')
+		])
+		self.assertEqual(table.get_base_rate('VEH-2'), 55)
+		self.assertEqual(table.get_base_rate('VEH-3'), 0)
+
+		# Adjustments apply on top of the stored vehicle rate
+		pricing._tables['test-site'] = table
+		try:
+			base_rate, vehicle_type, gross, discount_percent, rate_per_day, amount = pricing._quote_rent(
+				'test-site', table.version, 'VEH-2', getdate('2025-08-04'), 2)
+		finally:
+			pricing._tables.pop('test-site', None)
+		self.assertEqual(base_rate, 55)
+		self.assertEqual(gross, 132)
+		self.assertEqual(amount, 132)
+
+	def test_day_factor(self):
+		# 2025-08-02 is a Saturday inside the SUV season
+		self.assertAlmostEqual(self.table.get_day_factor('SUV', getdate('2025-08-02')), 1.2 * 1.1)
+		self.assertAlmostEqual(self.table.get_day_factor('Compact', getdate('2025-08-02')), 1.1)
+		# The higher priority season wins on overlapping days
+		self.assertAlmostEqual(self.table.get_day_factor('SUV', getdate('2025-08-11')), 1.5)
+
+	def test_length_discount(self):
+		self.assertEqual(self.table.get_length_discount('SUV', 3), 0)
+		self.assertEqual(self.table.get_length_discount('SUV', 10), 5)
+		self.assertEqual(self.table.get_length_discount('Compact', 45), 15)
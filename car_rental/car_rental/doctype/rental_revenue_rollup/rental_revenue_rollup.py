@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt, getdate, now
+
+from car_rental.car_rental import data_access
+from car_rental.car_rental.instrumentation import instrument
+
+# Service line of the vehicle rental itself; additional services use their name
+RENTAL_LINE = 'Rental'
+
+REVENUE_BOOKING_FIELDS = ['customer', 'vehicle', 'no_days', 'rate_per_day', 'sales_invoice']
+REVENUE_SERVICE_FIELDS = ['service_name', 'quantity', 'rate', 'total']
+
+
+class RentalRevenueRollup(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index('Rental Revenue Rollup', ['posting_date', 'vehicle_type'], 'posting_date_type_index')
+
+
+def get_rollup_name(posting_date, vehicle, customer, service_line):
+    """Deterministic row name, so increments for the same day and dimensions meet one row.
+
+    Must stay in sync with the md5(concat_ws(...)) expression in rebuild_revenue_rollup.
+    """
+    key = '|'.join([str(getdate(posting_date)), vehicle or '', customer or '', service_line or ''])
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def get_revenue_lines(booking, services):
+    """[(service_line, amount, rentals)] a booking contributes, priced like its invoice"""
+    lines = [(RENTAL_LINE, flt(booking.no_days or 1) * flt(booking.rate_per_day), 1)]
+    for service in services or []:
+        if not service.get('service_name'):
+            continue
+        amount = flt(service.get('total')) or flt(service.get('quantity') or 1) * flt(service.get('rate'))
+        lines.append((service.service_name, amount, 0))
+    return lines
+
+
+def add_to_rollup(booking, services, posting_date, measure, sign=1):
+    """Add (or with sign=-1 subtract) a booking's revenue lines to the daily rows with one upsert"""
+    # vehicle_type is a custom field of Vehicle; get_fields returns None where it is missing
+    vehicle = data_access.get_fields('Vehicle', booking.vehicle, ['vehicle_type'])
+    vehicle_type = vehicle.vehicle_type if vehicle else None
+    timestamp = now()
+    user = frappe.session.user
+    posting_date = getdate(posting_date)
+
+    values = []
+    for service_line, amount, rentals in get_revenue_lines(booking, services):
+        values.extend([
+            get_rollup_name(posting_date, booking.vehicle, booking.customer, service_line),
+            posting_date, booking.vehicle, vehicle_type, booking.customer, service_line,
+            sign * amount if measure == 'invoiced_amount' else 0,
+            sign * amount if measure == 'completed_amount' else 0,
+            sign * rentals if measure == 'invoiced_amount' else 0,
+            timestamp, timestamp, user, user
+        ])
+
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * (len(values) // 13))
+    frappe.db.sql("""
+        insert into `tabRental Revenue Rollup`
+            (name, posting_date, vehicle, vehicle_type, customer, service_line,
+            invoiced_amount, completed_amount, rental_count,
+            creation, modified, owner, modified_by)
+        values {0}
+        on duplicate key update
+            invoiced_amount = invoiced_amount + values(invoiced_amount),
+            completed_amount = completed_amount + values(completed_amount),
+            rental_count = rental_count + values(rental_count),
+            vehicle_type = values(vehicle_type),
+            modified = values(modified),
+            modified_by = values(modified_by)
+    """.format(placeholders), tuple(values))
+
+
+def record_invoice(booking, services, posting_date):
+    """Count a freshly created invoice of `booking` as invoiced revenue"""
+    add_to_rollup(booking, services, posting_date, 'invoiced_amount')
+
+
+def record_completion(rental_booking_name):
+    """Count a completed rental as realised revenue on its invoice's posting date"""
+    booking = data_access.get_fields('Rental Booking', rental_booking_name, REVENUE_BOOKING_FIELDS)
+    if not booking or not booking.sales_invoice:
+        return
+
+    posting_date = frappe.db.get_value('Sales Invoice', booking.sales_invoice, 'posting_date')
+    if not posting_date:
+        return
+
+    services = data_access.get_child_rows(
+        'Additional Services', 'Rental Booking', [booking.name], REVENUE_SERVICE_FIELDS)
+    add_to_rollup(booking, services.get(booking.name), posting_date, 'completed_amount')
+
+
+@instrument
+def on_sales_invoice_cancel(doc, method):
+    """Take a cancelled invoice's revenue back out of the rollup (doc event).
+
+    Mirrors rebuild_revenue_rollup, which leaves out cancelled invoices: the
+    invoiced amount goes, and the completed amount too for Completed rentals.
+    """
+    bookings = frappe.get_all('Rental Booking',
+        filters={'sales_invoice': doc.name, 'docstatus': 1},
+        fields=['name', 'status'] + REVENUE_BOOKING_FIELDS)
+    if not bookings:
+        return
+
+    services = data_access.get_child_rows(
+        'Additional Services', 'Rental Booking', [booking.name for booking in bookings], REVENUE_SERVICE_FIELDS)
+    for booking in bookings:
+        add_to_rollup(booking, services.get(booking.name), doc.posting_date, 'invoiced_amount', sign=-1)
+        if booking.status == 'Completed':
+            add_to_rollup(booking, services.get(booking.name), doc.posting_date, 'completed_amount', sign=-1)
+
+
+def get_rollup_totals(from_date=None, to_date=None):
+    conditions, values = get_date_conditions('posting_date', from_date, to_date)
+    return frappe.db.sql("""
+        select ifnull(sum(invoiced_amount), 0) as invoiced_amount,
+            ifnull(sum(completed_amount), 0) as completed_amount,
+            ifnull(sum(rental_count), 0) as rental_count
+        from `tabRental Revenue Rollup`
+        where 1=1 {conditions}
+    """.format(conditions=conditions), values, as_dict=True)[0]
+
+
+def get_date_conditions(column, from_date=None, to_date=None):
+    conditions, values = '', {}
+    if from_date:
+        conditions += ' and {0} >= %(from_date)s'.format(column)
+        values['from_date'] = getdate(from_date)
+    if to_date:
+        conditions += ' and {0} <= %(to_date)s'.format(column)
+        values['to_date'] = getdate(to_date)
+    return conditions, values
+
+
+@frappe.whitelist()
+@instrument
+def rebuild_revenue_rollup(from_date=None, to_date=None):
+    """Recompute the rollup from invoices and bookings and report how far it had drifted.
+
+    Rows are rebuilt for invoices posted in the range (everything by default),
+    which also drops revenue of invoices cancelled since they were counted.
+    bench --site <site> execute car_rental.car_rental.doctype.rental_revenue_rollup.rental_revenue_rollup.rebuild_revenue_rollup
+    """
+    frappe.only_for(['System Manager', 'Accounts Manager'])
+
+    before = get_rollup_totals(from_date, to_date)
+    rollup_conditions, values = get_date_conditions('posting_date', from_date, to_date)
+    invoice_conditions, _ = get_date_conditions('si.posting_date', from_date, to_date)
+    values.update({'rental_line': RENTAL_LINE, 'now': now(), 'user': frappe.session.user})
+    has_vehicle_type = frappe.get_meta('Vehicle').has_field('vehicle_type')
+
+    frappe.db.sql("delete from `tabRental Revenue Rollup` where 1=1 {0}".format(rollup_conditions), values)
+    frappe.db.sql("""
+        insert into `tabRental Revenue Rollup`
+            (name, posting_date, vehicle, vehicle_type, customer, service_line,
+            invoiced_amount, completed_amount, rental_count,
+            creation, modified, owner, modified_by)
+        select
+            md5(concat_ws('|', l.posting_date, ifnull(l.vehicle, ''), ifnull(l.customer, ''), l.service_line)),
+            l.posting_date, l.vehicle, {vehicle_type}, l.customer, l.service_line,
+            sum(l.amount), sum(if(l.status = 'Completed', l.amount, 0)), sum(l.rentals),
+            %(now)s, %(now)s, %(user)s, %(user)s
+        from (
+            select date(si.posting_date) as posting_date, rb.vehicle, rb.customer, rb.status,
+                %(rental_line)s as service_line,
+                ifnull(nullif(rb.no_days, 0), 1) * ifnull(rb.rate_per_day, 0) as amount,
+                1 as rentals
+            from `tabRental Booking` rb
+            inner join `tabSales Invoice` si on si.name = rb.sales_invoice
+            where rb.docstatus = 1 and si.docstatus < 2 {invoice_conditions}
+            union all
+            select date(si.posting_date), rb.vehicle, rb.customer, rb.status,
+                s.service_name,
+                ifnull(nullif(s.total, 0), ifnull(nullif(s.quantity, 0), 1) * ifnull(s.rate, 0)),
+                0
+            from `tabRental Booking` rb
+            inner join `tabSales Invoice` si on si.name = rb.sales_invoice
+            inner join `tabAdditional Services` s
+                on s.parent = rb.name and s.parenttype = 'Rental Booking'
+            where rb.docstatus = 1 and si.docstatus < 2 and ifnull(s.service_name, '') != ''
+                {invoice_conditions}
+        ) l
+        left join `tabVehicle` v on v.name = l.vehicle
+        group by l.posting_date, l.vehicle, {group_vehicle_type}l.customer, l.service_line
+    """.format(invoice_conditions=invoice_conditions,
+        vehicle_type='v.vehicle_type' if has_vehicle_type else 'null as vehicle_type',
+        group_vehicle_type='v.vehicle_type, ' if has_vehicle_type else ''), values)
+
+    after = get_rollup_totals(from_date, to_date)
+    frappe.db.commit()
+
+    return {
+        'status': 'success',
+        'rentals': cint(after.rental_count),
+        'invoiced_amount': flt(after.invoiced_amount),
+        'completed_amount': flt(after.completed_amount),
+        'drift': {
+            'invoiced_amount': flt(after.invoiced_amount) - flt(before.invoiced_amount),
+            'completed_amount': flt(after.completed_amount) - flt(before.completed_amount),
+            'rental_count': cint(after.rental_count) - cint(before.rental_count)
+        }
+    }
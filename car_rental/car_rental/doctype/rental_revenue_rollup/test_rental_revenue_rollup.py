@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and Contributors
+# See license.txt
+from __future__ import unicode_literals
+
+import frappe
+import unittest
+
+from car_rental.car_rental.doctype.rental_revenue_rollup.rental_revenue_rollup import (
+	RENTAL_LINE, get_revenue_lines, get_rollup_name)
+
+
+class TestRentalRevenueRollup(unittest.TestCase):
+	def test_get_revenue_lines(self):
+		booking = frappe._dict(no_days=3, rate_per_day=50)
+		services = [
+			frappe._dict(service_name='GPS', quantity=3, rate=5, total=15),
+			frappe._dict(service_name='Child Seat', quantity=2, rate=10, total=0),
+			frappe._dict(service_name=None, quantity=1, rate=99, total=99)
+		]
+
+		self.assertEqual(get_revenue_lines(booking, services),
+			[(RENTAL_LINE, 150, 1), ('GPS', 15, 0), ('Child Seat', 20, 0)])
+
+	def test_get_rollup_name(self):
+		name = get_rollup_name('2025-07-01', 'VEH-1', 'CUST-1', RENTAL_LINE)
+		self.assertEqual(name, get_rollup_name('2025-07-01', 'VEH-1', 'CUST-1', RENTAL_LINE))
+		self.assertNotEqual(name, get_rollup_name('2025-07-02', 'VEH-1', 'CUST-1', RENTAL_LINE))
+		self.assertEqual(len(name), 32)
@@ -3,8 +3,59 @@
 # See license.txt
 from __future__ import unicode_literals
 
-# import frappe
+import frappe
 import unittest
 
+from car_rental.car_rental.doctype.vehicle_inspection.vehicle_inspection import (
+	get_booking_transitions, submit_inspection_rows)
+
+
+def _booking(name, docstatus, status):
+	return frappe._dict(name=name, docstatus=docstatus, status=status, vehicle='VEH-1')
+
+
 class TestVehicleInspection(unittest.TestCase):
-	pass
+	def test_submit_inspection_rows(self):
+		bookings = {booking.name: booking for booking in [
+			_booking('RB-DRAFT', 0, 'Draft'),
+			_booking('RB-CONFIRMED', 1, 'Confirmed'),
+			_booking('RB-OUT', 1, 'Out'),
+			_booking('RB-FAIL', 1, 'Out'),
+			_booking('RB-CANCELLED', 2, 'Cancelled')
+		]}
+		rows = [
+			{'rental_booking': 'RB-DRAFT', 'inspection_type': 'Pre-Inspection'},
+			{'rental_booking': 'RB-CONFIRMED', 'inspection_type': 'Pre-Inspection'},
+			{'rental_booking': 'RB-CONFIRMED', 'inspection_type': 'Pre-Inspection'},
+			{'rental_booking': 'RB-OUT', 'inspection_type': 'Post-Inspection'},
+			{'rental_booking': 'RB-FAIL', 'inspection_type': 'Post-Inspection'},
+			{'rental_booking': 'RB-CANCELLED', 'inspection_type': 'Post-Inspection'},
+			{'rental_booking': 'RB-MISSING', 'inspection_type': 'Pre-Inspection'}
+		]
+		submitted = []
+
+		def submit(row, booking):
+			if booking.name == 'RB-FAIL':
+				raise frappe.ValidationError('Fuel level missing')
+			submitted.append(booking.name)
+			return 'VI-' + booking.name
+
+		results = submit_inspection_rows(rows, bookings, submit)
+
+		self.assertEqual(submitted, ['RB-DRAFT', 'RB-CONFIRMED', 'RB-OUT'])
+		self.assertEqual([result['status'] for result in results],
+			['success', 'success', 'error', 'success', 'error', 'error', 'error'])
+		# Draft and submitted bookings both check out to Out
+		self.assertEqual(results[0]['booking_status'], 'Out')
+		self.assertEqual(results[1]['inspection'], 'VI-RB-CONFIRMED')
+		self.assertEqual(results[3]['booking_status'], 'Returned')
+		self.assertIn('more than once', results[2]['message'])
+		self.assertEqual(results[4]['message'], 'Fuel level missing')
+		self.assertIn('Cancelled', results[5]['message'])
+		self.assertIn('not found', results[6]['message'])
+
+		# The draft booking moved in its own submit; submitted ones are left for the batch update
+		self.assertEqual(get_booking_transitions(results, bookings), {
+			'RB-CONFIRMED': ('Out', 'pre_inspection', 'VI-RB-CONFIRMED'),
+			'RB-OUT': ('Returned', 'post_inspection', 'VI-RB-OUT')
+		})
@@ -4,17 +4,19 @@
 
 from __future__ import unicode_literals
 import frappe
-from frappe.model.document import Document
+from car_rental.car_rental import active_rentals, availability_cache, data_access
+from car_rental.car_rental.instrumentation import InstrumentedDocument, instrument
+from car_rental.car_rental.doctype.rental_booking.rental_booking import refresh_vehicle_statuses
+from car_rental.car_rental.doctype.vehicle_occupancy import vehicle_occupancy
 
        
-class VehicleInspection(Document):
+class VehicleInspection(InstrumentedDocument):
     
     def validate(self):
         """Validation before save/submit"""
         # Auto-set vehicle from rental booking if not provided
         if self.rental_booking and not self.vehicle:
-            rental_doc = frappe.get_doc('Rental Booking', self.rental_booking)
-            self.vehicle = rental_doc.vehicle
+            self.vehicle = frappe.db.get_value('Rental Booking', self.rental_booking, 'vehicle')
      
         # Set inspection date if not provided
         if not self.inspection_date:
@@ -22,63 +24,30 @@ class VehicleInspection(Document):
 
     def on_submit(self):
       self.status = 'Submitted'
-      frappe.db.set_value('Vehicle Inspection', self.name, 'status', 'Submitted')
-      frappe.db.commit()  
-      if not self.rental_booking or not self.inspection_type:
+      # Bulk submits move their submitted bookings together, see apply_booking_transitions
+      if not self.rental_booking or not self.inspection_type or self.flags.skip_booking_transition:
+        self.db_set('status', 'Submitted', update_modified=False)
         return
 
       try:
-        rental_doc = frappe.get_doc('Rental Booking', self.rental_booking)
-
         if self.inspection_type == 'Pre-Inspection':
-           
-            if not rental_doc.pre_inspection:  
-                rental_doc.pre_inspection = self.name
-                frappe.db.set_value('Rental Booking', self.rental_booking, 'pre_inspection', self.name)
-                frappe.db.commit()
-                
-            if rental_doc.docstatus == 0:
-                rental_doc.reload()
-                rental_doc.status = 'Confirmed'
-                rental_doc.flags.ignore_permissions = True
-                rental_doc.submit()
-
-            # After submission, update to 'Out'
-            rental_doc.reload()
-            rental_doc.status = 'Out'
-            rental_doc.flags.ignore_permissions = True
-            rental_doc.flags.ignore_validate_update_after_submit = True
-            rental_doc.save()
-            rental_doc.update_vehicle_status_smart()
-            rental_doc.reload()
-            if rental_doc.status == 'Out' and rental_doc.pre_inspection == self.name:
-                    frappe.msgprint(f"Rental booking {self.rental_booking} status updated to 'Out'", alert=True, indicator='green')
-            else:
-                    frappe.log_error(f"Status update verification failed for {self.rental_booking}")
-        
-        elif self.inspection_type == 'Post-Inspection':
-            rental_doc.reload()
-            rental_doc.status = 'Returned'
-            rental_doc.post_inspection = self.name
-            rental_doc.flags.ignore_permissions = True
-            rental_doc.flags.ignore_validate_update_after_submit = True
-            rental_doc.save()
-            rental_doc.update_vehicle_status_smart()
+            status = check_out(self)
+        else:
+            status = check_in(self)
 
         frappe.msgprint(
-            f"Rental booking {self.rental_booking} status updated to: {rental_doc.status}",
+            f"Rental booking {self.rental_booking} status updated to: {status}",
             alert=True,
             indicator='green'
         )
 
       except Exception as e:
-        frappe.log_error(f"Error updating rental booking from inspection: {str(e)}")
-        frappe.log_error(f"Traceback:\n{frappe.get_traceback()}", "Vehicle Inspection Submission Error")
+        frappe.log_error(f"Error updating rental booking from inspection: {str(e)}\n{frappe.get_traceback()}", "Vehicle Inspection Submission Error")
         frappe.throw(f"Could not update rental booking: {str(e)}")
 
     def on_cancel(self):
         """Reset rental booking status when inspection is cancelled"""
-        if not self.rental_booking:
+        if not self.rental_booking or self.flags.from_booking_cancel:
             return
             
         try:
@@ -114,4 +83,239 @@ class VehicleInspection(Document):
         elif self.inspection_type == 'Post-Inspection':
             self.naming_series = 'PTI-YYYY-MM-.####'
         else:
-            self.naming_series = 'VI-YYYY-MM-.####'            
\ No newline at end of file
+            self.naming_series = 'VI-YYYY-MM-.####'
+
+
+TRANSITION_BOOKING_FIELDS = ['docstatus', 'status', 'vehicle', 'rental_start', 'rental_end',
+                             'pre_inspection', 'post_inspection']
+
+
+def apply_booking_transition(inspection, booking, status, link_field):
+    """Move a submitted booking to `status` with the inspection linked, in one save.
+
+    The booking save runs validate_update_after_submit and
+    RentalBooking.on_update_after_submit, so the calendar, vehicle status,
+    availability cache, contract, revenue rollup, Active Rentals board and
+    Version trail follow exactly as for any other status change.
+    """
+    inspection.db_set('status', 'Submitted', update_modified=False)
+
+    rental_doc = frappe.get_doc('Rental Booking', booking.name)
+    rental_doc.status = status
+    rental_doc.set(link_field, inspection.name)
+    rental_doc.flags.ignore_permissions = True
+    rental_doc.save()
+
+    booking.status = status
+    booking[link_field] = inspection.name
+    return status
+
+
+def check_out(inspection):
+    """Pre-Inspection submitted: booking goes Out with pre_inspection linked"""
+    booking = data_access.get_fields('Rental Booking', inspection.rental_booking, TRANSITION_BOOKING_FIELDS)
+    if not booking:
+        frappe.throw(f"Rental Booking {inspection.rental_booking} not found")
+
+    if booking.docstatus == 0:
+        # A draft booking is submitted straight to Out; its hooks reserve the
+        # vehicle and refresh the calendar and vehicle status in the same save
+        inspection.db_set('status', 'Submitted', update_modified=False)
+        rental_doc = frappe.get_doc('Rental Booking', booking.name)
+        rental_doc.status = 'Out'
+        rental_doc.pre_inspection = rental_doc.pre_inspection or inspection.name
+        rental_doc.flags.ignore_permissions = True
+        rental_doc.submit()
+        return rental_doc.status
+
+    if booking.docstatus != 1:
+        frappe.throw("Cannot check out a cancelled rental booking")
+
+    return apply_booking_transition(inspection, booking, 'Out', 'pre_inspection')
+
+
+def check_in(inspection):
+    """Post-Inspection submitted: booking becomes Returned with post_inspection linked"""
+    booking = data_access.get_fields('Rental Booking', inspection.rental_booking, TRANSITION_BOOKING_FIELDS)
+    if not booking:
+        frappe.throw(f"Rental Booking {inspection.rental_booking} not found")
+
+    if booking.docstatus != 1:
+        frappe.throw("Rental booking must be submitted before check-in")
+
+    return apply_booking_transition(inspection, booking, 'Returned', 'post_inspection')
+
+
+BULK_INSPECTION_BATCH_SIZE = 50
+
+# inspection_type -> (booking statuses allowed before, booking status after, link field)
+TRANSITIONS = {
+    'Pre-Inspection': (('Draft', 'Confirmed'), 'Out', 'pre_inspection'),
+    'Post-Inspection': (('Out',), 'Returned', 'post_inspection')
+}
+
+
+@frappe.whitelist()
+@instrument
+def bulk_submit_inspections(inspections, batch_size=BULK_INSPECTION_BATCH_SIZE):
+    """Create and submit many inspections for yard check-out/check-in.
+
+    `inspections` is a list (or JSON string) of dicts with rental_booking,
+    inspection_type, fuel_level and condition_summary. Returns one result
+    per row in input order; a failing row never blocks the others, and a
+    batch that fails as a whole is rolled back before the next one starts.
+
+    Inspections are submitted row by row, but the submitted bookings of a
+    batch move with one UPDATE and one calendar, vehicle status and board
+    refresh (draft bookings still go through their own submit).
+    """
+    import json
+    from frappe.utils import cint
+
+    if isinstance(inspections, str):
+        inspections = json.loads(inspections)
+    batch_size = cint(batch_size) or BULK_INSPECTION_BATCH_SIZE
+
+    results = []
+    for i in range(0, len(inspections), batch_size):
+        batch = inspections[i:i + batch_size]
+        try:
+            results.extend(_submit_inspection_batch(batch))
+            frappe.db.commit()
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(f"Error in bulk inspection batch: {str(e)}\n{frappe.get_traceback()}")
+            results.extend({
+                'rental_booking': row.get('rental_booking'),
+                'inspection_type': row.get('inspection_type'),
+                'status': 'error',
+                'message': str(e)
+            } for row in batch)
+    return results
+
+
+def _submit_inspection_batch(rows):
+    bookings = data_access.get_fields_map(
+        'Rental Booking', [row.get('rental_booking') for row in rows], TRANSITION_BOOKING_FIELDS)
+    results = submit_inspection_rows(rows, bookings, submit_inspection)
+    apply_booking_transitions(get_booking_transitions(results, bookings), bookings)
+    return results
+
+
+def submit_inspection(row, booking):
+    """Insert and submit one inspection.
+
+    Its on_submit submits a draft booking straight to Out; a submitted
+    booking is left for apply_booking_transitions.
+    """
+    inspection = frappe.get_doc({
+        'doctype': 'Vehicle Inspection',
+        'rental_booking': booking.name,
+        'vehicle': booking.vehicle,
+        'inspection_type': row.inspection_type,
+        'fuel_level': row.fuel_level,
+        'condition_summary': row.condition_summary
+    })
+    inspection.flags.skip_booking_transition = booking.docstatus == 1
+    inspection.insert()
+    inspection.submit()
+    return inspection.name
+
+
+def submit_inspection_rows(rows, bookings, submit):
+    """Check each row against its prefetched booking and `submit(row, booking)` it.
+
+    Every row runs behind a savepoint, so a row that fails leaves nothing of
+    its inspection or booking change behind.
+    """
+    results = []
+    seen = set()
+    for row in rows:
+        row = frappe._dict(row)
+        result = {'rental_booking': row.rental_booking, 'inspection_type': row.inspection_type}
+        results.append(result)
+
+        booking = bookings.get(row.rental_booking)
+        transition = TRANSITIONS.get(row.inspection_type)
+        if not booking:
+            result.update(status='error', message=f"Rental Booking {row.rental_booking} not found")
+            continue
+        if not transition or booking.docstatus == 2 or booking.status not in transition[0]:
+            result.update(status='error',
+                message=f"Cannot submit a {row.inspection_type} for a booking in status {booking.status}")
+            continue
+        if booking.name in seen:
+            result.update(status='error', message="Rental Booking appears more than once in this batch")
+            continue
+        seen.add(booking.name)
+
+        frappe.db.sql("savepoint bulk_inspection")
+        try:
+            inspection = submit(row, booking)
+            result.update(status='success', inspection=inspection, booking_status=transition[1])
+        except Exception as e:
+            frappe.db.sql("rollback to savepoint bulk_inspection")
+            result.update(status='error', message=str(e))
+
+    return results
+
+
+def get_booking_transitions(results, bookings):
+    """{booking: (status, link_field, inspection)} for the successful rows of submitted bookings"""
+    transitions = {}
+    for result in results:
+        booking = bookings.get(result['rental_booking'])
+        if result.get('status') != 'success' or booking.docstatus != 1:
+            continue
+        status, link_field = TRANSITIONS[result['inspection_type']][1:]
+        transitions[booking.name] = (status, link_field, result['inspection'])
+    return transitions
+
+
+def apply_booking_transitions(transitions, bookings):
+    """Write the status and inspection link of many submitted bookings with one UPDATE.
+
+    The calendar, availability cache, vehicle statuses and Active Rentals
+    board are then brought up to date once for all of them. Moving to Out or
+    Returned has no contract or revenue side effects, so nothing else of a
+    booking save is needed.
+    """
+    from frappe.utils import now, today
+
+    if not transitions:
+        return
+
+    assignments = []
+    values = []
+    status_cases = []
+    link_cases = {}
+    for name, (status, link_field, inspection) in transitions.items():
+        status_cases.append('when %s then %s')
+        values.extend([name, status])
+        link_cases.setdefault(link_field, []).append((name, inspection))
+    assignments.append('status = case name {0} end'.format(' '.join(status_cases)))
+    for link_field, links in link_cases.items():
+        assignments.append('`{0}` = case name {1} else `{0}` end'.format(
+            link_field, ' '.join(['when %s then %s'] * len(links))))
+        for name, inspection in links:
+            values.extend([name, inspection])
+
+    frappe.db.sql("""
+        update `tabRental Booking`
+        set {0}, modified = %s, modified_by = %s
+        where name in %s and docstatus = 1
+    """.format(', '.join(assignments)), tuple(values) + (now(), frappe.session.user, tuple(transitions)))
+
+    moved = []
+    for name, (status, link_field, inspection) in transitions.items():
+        booking = bookings[name]
+        booking.status = status
+        booking[link_field] = inspection
+        moved.append(booking)
+
+    vehicle_occupancy.sync_bookings(moved)
+    vehicles = list({booking.vehicle for booking in moved if booking.vehicle})
+    for vehicle in vehicles:
+        availability_cache.invalidate(vehicle)
+    refresh_vehicle_statuses(list(data_access.get_fields_map('Vehicle', vehicles, ['status']).values()), today())
+    active_rentals.notify(list(transitions))
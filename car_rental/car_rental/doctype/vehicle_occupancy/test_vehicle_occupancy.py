@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and Contributors
+# See license.txt
+from __future__ import unicode_literals
+
+import frappe
+import unittest
+from frappe.utils import getdate
+
+from car_rental.car_rental.doctype.vehicle_occupancy.vehicle_occupancy import get_occupancy_rows
+from car_rental.car_rental.status_scheduler import get_boundaries
+
+
+class TestVehicleOccupancy(unittest.TestCase):
+	def test_get_occupancy_rows(self):
+		booking = frappe._dict(name='RB-1', vehicle='VEH-1', docstatus=1, status='Out',
+			rental_start='2025-07-01 10:00:00', rental_end='2025-07-03 09:00:00')
+
+		rows = get_occupancy_rows(booking)
+		self.assertEqual([row[1] for row in rows],
+			[getdate('2025-07-01'), getdate('2025-07-02'), getdate('2025-07-03')])
+		self.assertTrue(all(row[2] == 'Out' for row in rows))
+
+		booking.status = 'Completed'
+		self.assertEqual(get_occupancy_rows(booking), [])
+
+		booking.status, booking.docstatus = 'Confirmed', 2
+		self.assertEqual(get_occupancy_rows(booking), [])
+
+	def test_get_boundaries(self):
+		booking = frappe._dict(name='RB-1', vehicle='VEH-1', docstatus=1, status='Confirmed',
+			rental_start='2025-07-10 10:00:00', rental_end='2025-07-12 09:00:00')
+
+		# Status can change on the first day and on the day after the last day
+		self.assertEqual(get_boundaries(booking, '2025-07-01'),
+			[getdate('2025-07-10'), getdate('2025-07-13')])
+		self.assertEqual(get_boundaries(booking, '2025-07-11'), [getdate('2025-07-13')])
+
+		booking.status = 'Returned'
+		self.assertEqual(get_boundaries(booking, '2025-07-01'), [])
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, getdate, now
+
+from car_rental.car_rental import status_scheduler
+from car_rental.car_rental.instrumentation import instrument
+
+# Rental Booking status -> occupancy state; anything else frees the days
+BOOKING_STATES = {
+    'Confirmed': 'Booked',
+    'Out': 'Out',
+    'Returned': 'Returned'
+}
+
+INSERT_BATCH_SIZE = 1000
+
+
+class VehicleOccupancy(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index('Vehicle Occupancy', ['vehicle', 'occupancy_date'], 'vehicle_date_index')
+
+
+def get_occupancy_rows(booking):
+    """(vehicle, date, state, booking) rows a booking occupies, one per day"""
+    state = BOOKING_STATES.get(booking.status)
+    if booking.docstatus != 1 or not state or not booking.vehicle:
+        return []
+    if not booking.rental_start or not booking.rental_end:
+        return []
+
+    day = getdate(booking.rental_start)
+    end = getdate(booking.rental_end)
+    rows = []
+    while day <= end:
+        rows.append((booking.vehicle, day, state, booking.name))
+        day = add_days(day, 1)
+    return rows
+
+
+def insert_occupancy_rows(rows):
+    """Write occupancy rows with multi-row INSERTs"""
+    timestamp = now()
+    user = frappe.session.user
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        chunk = rows[i:i + INSERT_BATCH_SIZE]
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+        values = []
+        for vehicle, day, state, booking in chunk:
+            values.extend([frappe.generate_hash(length=10), vehicle, day, state, booking,
+                timestamp, timestamp, user, user])
+        frappe.db.sql("""
+            insert into `tabVehicle Occupancy`
+                (name, vehicle, occupancy_date, state, rental_booking,
+                creation, modified, owner, modified_by)
+            values {0}
+        """.format(placeholders), tuple(values))
+
+
+def sync_booking(booking):
+    """Replace the occupancy rows of one booking from its current state"""
+    sync_bookings([booking])
+
+
+def sync_bookings(bookings):
+    """Replace the occupancy rows of many bookings with one delete and batched inserts"""
+    if not bookings:
+        return
+
+    frappe.db.sql("delete from `tabVehicle Occupancy` where rental_booking in %s",
+        [tuple(booking.name for booking in bookings)])
+    rows = []
+    for booking in bookings:
+        rows.extend(get_occupancy_rows(booking))
+    insert_occupancy_rows(rows)
+    status_scheduler.push_bookings(bookings)
+
+
+def get_vehicle_status(vehicle, current_date=None):
+    """Vehicle status from the calendar with one indexed lookup.
+
+    Mirrors compute_vehicle_status: a Confirmed/Out booking covering today
+    decides the status, otherwise any upcoming Booked/Out day means Booked.
+    """
+    from frappe.utils import today
+    current_date = getdate(current_date or today())
+
+    row = frappe.db.sql("""
+        select occupancy_date, state
+        from `tabVehicle Occupancy`
+        where vehicle = %s and occupancy_date >= %s and state in ('Booked', 'Out')
+        order by occupancy_date, state = 'Out' desc
+        limit 1
+    """, (vehicle, current_date), as_dict=True)
+
+    if not row:
+        return 'Available'
+    if getdate(row[0].occupancy_date) == current_date and row[0].state == 'Out':
+        return 'Rented'
+    return 'Booked'
+
+
+def get_vehicle_statuses(vehicles, current_date=None, whole_fleet=False):
+    """{vehicle: status} for many vehicles with one grouped calendar query.
+
+    This is the source of vehicle status for every caller; with
+    `whole_fleet` the calendar is scanned without a vehicle filter.
+    """
+    from frappe.utils import today
+    current_date = getdate(current_date or today())
+    vehicles = list(set(filter(None, vehicles)))
+    if not vehicles:
+        return {}
+
+    condition = '' if whole_fleet else 'vehicle in %(vehicles)s and'
+    rows = frappe.db.sql("""
+        select vehicle, max(occupancy_date = %(today)s and state = 'Out') as out_today
+        from `tabVehicle Occupancy`
+        where {0} occupancy_date >= %(today)s and state in ('Booked', 'Out')
+        group by vehicle
+    """.format(condition), {'vehicles': tuple(vehicles), 'today': current_date}, as_dict=True)
+
+    statuses = {vehicle: 'Available' for vehicle in vehicles}
+    for row in rows:
+        if row.vehicle in statuses:
+            statuses[row.vehicle] = 'Rented' if row.out_today else 'Booked'
+    return statuses
+
+
+def stage_vehicle_status(vehicle, uow):
+    """Stage the calendar-derived status of a vehicle in a UnitOfWork if it changed"""
+    current_status = frappe.db.get_value('Vehicle', vehicle, 'status')
+    new_status = get_vehicle_status(vehicle)
+    if current_status != new_status:
+        uow.set_value('Vehicle', vehicle, 'status', new_status)
+    return new_status
+
+
+@frappe.whitelist()
+@instrument
+def get_vehicle_calendar(vehicle, start_date, end_date):
+    """Per-day occupancy of a vehicle; days without a row are free"""
+    start_date = getdate(start_date)
+    end_date = getdate(end_date)
+
+    rows = frappe.get_all(
+        'Vehicle Occupancy',
+        filters=[
+            ['vehicle', '=', vehicle],
+            ['occupancy_date', '>=', start_date],
+            ['occupancy_date', '<=', end_date]
+        ],
+        fields=['occupancy_date', 'state', 'rental_booking']
+    )
+    days = {str(row.occupancy_date): {'state': row.state, 'rental_booking': row.rental_booking} for row in rows}
+
+    calendar = []
+    day = start_date
+    while day <= end_date:
+        calendar.append(dict(days.get(str(day), {'state': 'Free', 'rental_booking': None}), date=day))
+        day = add_days(day, 1)
+    return calendar
+
+
+@frappe.whitelist()
+@instrument
+def rebuild_occupancy(batch_size=5000):
+    """Rebuild the whole calendar from submitted bookings.
+
+    bench --site <site> execute car_rental.car_rental.doctype.vehicle_occupancy.vehicle_occupancy.rebuild_occupancy
+    """
+    frappe.only_for('System Manager')
+    # page_length=0 would mean no limit and re-read the table forever
+    batch_size = cint(batch_size) or 5000
+
+    frappe.db.sql("delete from `tabVehicle Occupancy`")
+
+    start = 0
+    total = 0
+    while True:
+        bookings = frappe.get_all(
+            'Rental Booking',
+            filters={'docstatus': 1, 'status': ['in', list(BOOKING_STATES)]},
+            fields=['name', 'vehicle', 'status', 'docstatus', 'rental_start', 'rental_end'],
+            order_by='name',
+            start=start,
+            page_length=batch_size
+        )
+        if not bookings:
+            break
+
+        rows = []
+        for booking in bookings:
+            rows.extend(get_occupancy_rows(booking))
+        insert_occupancy_rows(rows)
+        total += len(rows)
+        start += batch_size
+
+    frappe.db.commit()
+    return {'status': 'success', 'message': f'Rebuilt {total} occupancy days'}
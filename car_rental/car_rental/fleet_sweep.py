@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Partitioned fleet-wide jobs.
+
+start_fleet_sweep splits the vehicles into partitions, either by a Vehicle
+field such as company or branch (one partition per value) or by a hash of
+the vehicle name, and enqueues one background job per partition. Each job
+walks its vehicles in chunks and commits after every chunk, so no worker
+holds a fleet-wide transaction.
+
+A cache lock per sweep stops a second run from starting while partitions of
+the previous one are still queued or running. The last partition to finish
+releases it; the TTL frees it if a worker dies. Per-partition timings and
+failures are stored under the run id:
+    bench --site <site> execute car_rental.car_rental.fleet_sweep.start_fleet_sweep --kwargs "{'partition_by': 'company'}"
+"""
+
+from __future__ import unicode_literals
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate, now, today
+
+from car_rental.car_rental.instrumentation import instrument
+
+DEFAULT_PARTITIONS = 4
+SWEEP_CHUNK_SIZE = 500
+SWEEP_LOCK_TTL = 2 * 60 * 60
+SWEEP_RESULT_TTL = 24 * 60 * 60
+REALTIME_EVENT = 'car_rental_fleet_sweep'
+
+
+def sweep_vehicle_statuses(vehicles):
+    """Refresh vehicle statuses for one chunk of vehicle rows"""
+    from car_rental.car_rental import availability_cache
+    from car_rental.car_rental.doctype.rental_booking.rental_booking import refresh_vehicle_statuses
+
+    changes, _timings = refresh_vehicle_statuses(vehicles, getdate(today()))
+    for names in changes.values():
+        for vehicle in names:
+            availability_cache.invalidate(vehicle)
+    return sum(len(names) for names in changes.values())
+
+
+# sweep name -> function(vehicle rows) returning the number of vehicles changed
+SWEEPS = {
+    'vehicle_status': sweep_vehicle_statuses
+}
+
+
+def _lock_key(sweep):
+    return frappe.cache().make_key(f'car_rental:fleet_sweep:{sweep}:lock')
+
+
+def _run_key(run_id, suffix=None):
+    return f'car_rental:fleet_sweep:{run_id}' + (f':{suffix}' if suffix else '')
+
+
+def get_partitions(partition_by='hash', partitions=DEFAULT_PARTITIONS):
+    """Partition keys: field values for a Vehicle field, or hash bucket numbers"""
+    if partition_by == 'hash':
+        return [str(i) for i in range(cint(partitions) or DEFAULT_PARTITIONS)]
+
+    if not frappe.get_meta('Vehicle').has_field(partition_by):
+        frappe.throw(_("Vehicle has no field {0} to partition by").format(partition_by))
+
+    return frappe.db.sql_list("""
+        select distinct ifnull(`{0}`, '') from `tabVehicle` order by 1
+    """.format(partition_by))
+
+
+def get_partition_vehicles(partition_by, key, partitions):
+    """Vehicle rows (name, status) of one partition"""
+    if partition_by == 'hash':
+        condition = 'crc32(name) %% %(partitions)s = %(key)s'
+        values = {'partitions': cint(partitions), 'key': cint(key)}
+    else:
+        condition = "ifnull(`{0}`, '') = %(key)s".format(partition_by)
+        values = {'key': key}
+
+    return frappe.db.sql("""
+        select name, status from `tabVehicle` where {0} order by name
+    """.format(condition), values, as_dict=True)
+
+
+@frappe.whitelist()
+@instrument
+def start_fleet_sweep(sweep='vehicle_status', partition_by='hash', partitions=DEFAULT_PARTITIONS):
+    """Enqueue one background job per partition of the fleet"""
+    frappe.only_for('System Manager')
+    if sweep not in SWEEPS:
+        frappe.throw(_("Unknown fleet sweep {0}").format(sweep))
+
+    keys = get_partitions(partition_by, partitions)
+    if not keys:
+        # No partition would ever finish the run and release the lock
+        return {'status': 'success', 'run_id': None, 'partitions': 0,
+                'message': f'No vehicles to sweep by {partition_by}'}
+
+    run_id = frappe.generate_hash(length=10)
+
+    cache = frappe.cache()
+    if not cache.set(_lock_key(sweep), run_id, nx=True, ex=SWEEP_LOCK_TTL):
+        running = frappe.safe_decode(cache.get(_lock_key(sweep)))
+        return {'status': 'running', 'run_id': running,
+                'message': f'Fleet sweep {sweep} is already running as {running}'}
+
+    cache.set_value(_run_key(run_id, 'meta'), {
+        'sweep': sweep, 'partition_by': partition_by, 'partitions': keys, 'started_at': now()
+    }, expires_in_sec=SWEEP_RESULT_TTL)
+
+    for key in keys:
+        frappe.enqueue(
+            'car_rental.car_rental.fleet_sweep.run_partition',
+            queue='long',
+            timeout=SWEEP_LOCK_TTL,
+            run_id=run_id,
+            sweep=sweep,
+            partition_by=partition_by,
+            key=key,
+            partitions=len(keys)
+        )
+
+    return {
+        'status': 'success',
+        'run_id': run_id,
+        'partitions': len(keys),
+        'message': f'Queued {sweep} sweep in {len(keys)} partitions by {partition_by}'
+    }
+
+
+def run_partition(run_id, sweep, partition_by, key, partitions):
+    """Background job: sweep one partition in short, separately committed chunks"""
+    started = time.time()
+    result = {'vehicles': 0, 'updated': 0, 'chunks': 0, 'failed': [], 'started_at': now()}
+
+    try:
+        vehicles = get_partition_vehicles(partition_by, key, partitions)
+        result['vehicles'] = len(vehicles)
+        result['load'] = round(time.time() - started, 4)
+
+        for i in range(0, len(vehicles), SWEEP_CHUNK_SIZE):
+            chunk = vehicles[i:i + SWEEP_CHUNK_SIZE]
+            try:
+                result['updated'] += SWEEPS[sweep](chunk)
+                frappe.db.commit()
+            except Exception as e:
+                frappe.db.rollback()
+                result['failed'].append({'first': chunk[0].name, 'last': chunk[-1].name, 'error': str(e)})
+            result['chunks'] += 1
+    except Exception as e:
+        frappe.db.rollback()
+        result['failed'].append({'error': str(e)})
+
+    result['elapsed'] = round(time.time() - started, 4)
+    if result['failed']:
+        frappe.log_error(
+            "\n".join(str(row) for row in result['failed']),
+            f"Fleet Sweep {run_id} partition {key}"
+        )
+
+    cache = frappe.cache()
+    cache.hset(_run_key(run_id), key, result)
+    frappe.publish_realtime(REALTIME_EVENT, dict(result, run_id=run_id, partition=key))
+
+    # The last partition to finish releases the lock for the next run
+    done_key = cache.make_key(_run_key(run_id, 'done'))
+    if cache.incr(done_key) >= cint(partitions):
+        cache.expire(done_key, SWEEP_RESULT_TTL)
+        cache.expire(cache.make_key(_run_key(run_id)), SWEEP_RESULT_TTL)
+        if frappe.safe_decode(cache.get(_lock_key(sweep))) == run_id:
+            cache.delete(_lock_key(sweep))
+
+    return result
+
+
+@frappe.whitelist()
+@instrument
+def get_fleet_sweep_progress(run_id):
+    """Per-partition results of a sweep run and their totals"""
+    cache = frappe.cache()
+    meta = cache.get_value(_run_key(run_id, 'meta')) or {}
+    results = cache.hgetall(_run_key(run_id)) or {}
+    results = {frappe.safe_decode(key): value for key, value in results.items()}
+
+    return {
+        'run_id': run_id,
+        'sweep': meta.get('sweep'),
+        'partition_by': meta.get('partition_by'),
+        'started_at': meta.get('started_at'),
+        'partitions': len(meta.get('partitions') or []),
+        'partitions_done': len(results),
+        'vehicles': sum(result['vehicles'] for result in results.values()),
+        'updated': sum(result['updated'] for result in results.values()),
+        'failed': {key: result['failed'] for key, result in results.items() if result['failed']},
+        'slowest': max(results.items(), key=lambda item: item[1]['elapsed'])[0] if results else None,
+        'results': results
+    }
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Opt-in latency and query-count instrumentation.
+
+While Enable Instrumentation is set in Car Rental Settings, every call of a
+function decorated with @instrument (the app's whitelisted methods and doc
+event handlers) and every controller method of an InstrumentedDocument is
+timed, together with the number of frappe.db.sql calls it made and the time
+spent in them. Nested calls are each recorded in full, so a booking submit
+counts its own queries and those of the hooks it runs.
+
+Samples go into per-process histograms with fixed buckets. Each worker adds
+them to a per-minute Redis hash at most every FLUSH_INTERVAL seconds (and at
+the end of every call outside a web request, since job processes do not
+live long). Bucket counts add up across workers and minutes, so the summary
+can report p50/p95/p99 for any recent window without keeping raw samples:
+    bench --site <site> execute car_rental.car_rental.instrumentation.get_instrumentation_summary --kwargs "{'minutes': 15}"
+"""
+
+from __future__ import unicode_literals
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt
+
+ENABLED_KEY = 'car_rental:instrumentation:enabled'
+ENABLED_CHECK_INTERVAL = 10
+FLUSH_INTERVAL = 30
+WINDOW_RETENTION = 24 * 60 * 60
+DEFAULT_SUMMARY_MINUTES = 60
+
+# Upper bounds of the histogram buckets; values above the last bound go to an overflow bucket
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Per process: {site: (checked_at, enabled)}, {site: {method: MethodStats}}, {site: flushed_at}
+_enabled = {}
+_pending = {}
+_last_flush = {}
+
+
+class Histogram(object):
+    """Counts of values per bucket, and their sum"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def percentile(self, p):
+        """Estimate by linear interpolation inside the bucket holding the p-th value"""
+        count = self.count
+        if not count:
+            return None
+
+        rank = p * count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if i == len(self.bounds):
+                    # Overflow bucket: the last bound is all that is known
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else min(0, self.bounds[0])
+                return round(lower + (self.bounds[i] - lower) * (rank - seen) / bucket_count, 2)
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class MethodStats(object):
+    """Wall time, DB time and query count histograms of one instrumented method"""
+
+    def __init__(self):
+        self.errors = 0
+        self.histograms = {
+            'wall': Histogram(LATENCY_BUCKETS_MS),
+            'db': Histogram(LATENCY_BUCKETS_MS),
+            'queries': Histogram(QUERY_BUCKETS)
+        }
+
+    @property
+    def calls(self):
+        return self.histograms['wall'].count
+
+    def add(self, wall_ms, queries, db_ms, error=False):
+        self.histograms['wall'].add(wall_ms)
+        self.histograms['db'].add(db_ms)
+        self.histograms['queries'].add(queries)
+        if error:
+            self.errors += 1
+
+    def to_fields(self):
+        """{field: increment} for the Redis hash; empty buckets are left out"""
+        fields = {'errors': self.errors} if self.errors else {}
+        for name, histogram in self.histograms.items():
+            fields[f'{name}:sum'] = flt(histogram.total, 3) if name != 'queries' else histogram.total
+            for i, count in enumerate(histogram.counts):
+                if count:
+                    fields[f'{name}:{i}'] = count
+        return fields
+
+    def add_field(self, field, value):
+        """Accumulate one field written by to_fields"""
+        if field == 'errors':
+            self.errors += cint(value)
+            return
+
+        name, _, bucket = field.partition(':')
+        histogram = self.histograms.get(name)
+        if not histogram:
+            return
+        if bucket == 'sum':
+            histogram.total += flt(value)
+        elif bucket.isdigit() and int(bucket) < len(histogram.counts):
+            # Fields of other bucket layouts (before a deploy changed them) are skipped
+            histogram.counts[int(bucket)] += cint(value)
+
+    def summarize(self, method):
+        calls = self.calls
+        wall, db, queries = self.histograms['wall'], self.histograms['db'], self.histograms['queries']
+        return {
+            'method': method,
+            'calls': calls,
+            'errors': self.errors,
+            'total_ms': round(wall.total, 2),
+            'mean_ms': round(wall.total / calls, 2) if calls else None,
+            'p50_ms': wall.percentile(0.5),
+            'p95_ms': wall.percentile(0.95),
+            'p99_ms': wall.percentile(0.99),
+            'queries': round(queries.total / float(calls), 2) if calls else None,
+            'p95_queries': queries.percentile(0.95),
+            'db_ms': round(db.total / calls, 2) if calls else None,
+            'p95_db_ms': db.percentile(0.95),
+            'db_share': round(db.total / wall.total, 3) if wall.total else None
+        }
+
+
+def set_enabled(enabled):
+    """Publish the Car Rental Settings toggle to every worker"""
+    frappe.cache().set_value(ENABLED_KEY, cint(enabled))
+    _enabled.pop(frappe.local.site, None)
+
+
+def is_enabled():
+    """The settings toggle, re-read from Redis at most every ENABLED_CHECK_INTERVAL seconds"""
+    site = getattr(frappe.local, 'site', None)
+    if not site or not getattr(frappe.local, 'db', None):
+        return False
+
+    checked = _enabled.get(site)
+    if checked and time.time() - checked[0] < ENABLED_CHECK_INTERVAL:
+        return checked[1]
+
+    try:
+        enabled = frappe.cache().get_value(ENABLED_KEY)
+        if enabled is None:
+            enabled = cint(frappe.db.get_single_value('Car Rental Settings', 'enable_instrumentation'))
+            frappe.cache().set_value(ENABLED_KEY, enabled)
+    except Exception:
+        enabled = 0
+
+    _enabled[site] = (time.time(), bool(enabled))
+    return bool(enabled)
+
+
+def _window_key(minute):
+    return f'car_rental:instrumentation:{minute}'
+
+
+def _install_query_counter(frames):
+    """Time frappe.db.sql on behalf of every open frame; returns the original"""
+    original_sql = frappe.db.sql
+
+    def timed_sql(*args, **kwargs):
+        started = time.time()
+        try:
+            return original_sql(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.time() - started) * 1000
+            for frame in frames:
+                frame['queries'] += 1
+                frame['db_ms'] += elapsed_ms
+
+    frappe.db.sql = timed_sql
+    return original_sql
+
+
+@contextmanager
+def record(method):
+    """Time the block as one call of `method` while instrumentation is enabled"""
+    if not is_enabled():
+        yield
+        return
+
+    frames = getattr(frappe.local, 'car_rental_instrumentation', None)
+    if frames is None:
+        frames = frappe.local.car_rental_instrumentation = []
+    original_sql = _install_query_counter(frames) if not frames else None
+
+    frame = {'queries': 0, 'db_ms': 0.0}
+    frames.append(frame)
+    started = time.time()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        wall_ms = (time.time() - started) * 1000
+        frames.pop()
+        if original_sql:
+            frappe.db.sql = original_sql
+        add_sample(method, wall_ms, frame['queries'], frame['db_ms'], error, outermost=not frames)
+
+
+def add_sample(method, wall_ms, queries, db_ms, error=False, outermost=True):
+    site = frappe.local.site
+    _pending.setdefault(site, {}).setdefault(method, MethodStats()).add(wall_ms, queries, db_ms, error)
+
+    if not outermost:
+        return
+    in_request = bool(getattr(frappe.local, 'request', None))
+    if not in_request or time.time() - _last_flush.get(site, 0) >= FLUSH_INTERVAL:
+        try:
+            flush()
+        except Exception:
+            # Instrumentation must never fail the call it measured; the
+            # samples stay pending for the next flush
+            pass
+
+
+def flush():
+    """Add this process's pending samples to the current minute's Redis hash"""
+    site = frappe.local.site
+    _last_flush[site] = time.time()
+    pending = _pending.pop(site, None)
+    if not pending:
+        return 0
+
+    try:
+        cache = frappe.cache()
+        key = cache.make_key(_window_key(int(time.time() // 60)))
+        pipe = cache.pipeline()
+        for method, stats in pending.items():
+            for field, value in stats.to_fields().items():
+                if isinstance(value, float):
+                    pipe.hincrbyfloat(key, f'{method}|{field}', value)
+                else:
+                    pipe.hincrby(key, f'{method}|{field}', value)
+        pipe.expire(key, WINDOW_RETENTION)
+        pipe.execute()
+    except Exception:
+        # Merge back into whatever was recorded meanwhile
+        for method, stats in pending.items():
+            target = _pending.setdefault(site, {}).setdefault(method, MethodStats())
+            for field, value in stats.to_fields().items():
+                target.add_field(field, value)
+        raise
+
+    return len(pending)
+
+
+def instrument(fn):
+    """Decorator: record calls of `fn` under its dotted path.
+
+    Goes below @frappe.whitelist(), so the whitelisted function is the wrapper.
+    """
+    method = f'{fn.__module__}.{fn.__name__}'
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with record(method):
+            return fn(*args, **kwargs)
+
+    # frappe.call picks the form arguments to pass from the inspected signature
+    wrapper.__signature__ = inspect.signature(fn)
+    return wrapper
+
+
+class InstrumentedDocument(Document):
+    """Document whose controller methods are recorded as `<DocType>:<method>`"""
+
+    def run_method(self, method, *args, **kwargs):
+        if not callable(getattr(self, method, None)):
+            return super(InstrumentedDocument, self).run_method(method, *args, **kwargs)
+        with record(f'{self.doctype}:{method}'):
+            return super(InstrumentedDocument, self).run_method(method, *args, **kwargs)
+
+
+@frappe.whitelist()
+def get_instrumentation_summary(minutes=DEFAULT_SUMMARY_MINUTES):
+    """p50/p95/p99 wall time, queries and DB time per method over the last `minutes`"""
+    frappe.only_for('System Manager')
+    minutes = min(cint(minutes) or DEFAULT_SUMMARY_MINUTES, WINDOW_RETENTION // 60)
+    if frappe.local.site in _pending:
+        flush()
+
+    cache = frappe.cache()
+    current = int(time.time() // 60)
+    pipe = cache.pipeline()
+    for minute in range(current - minutes + 1, current + 1):
+        pipe.hgetall(cache.make_key(_window_key(minute)))
+
+    stats = {}
+    for window in pipe.execute():
+        for field, value in (window or {}).items():
+            method, _, name = frappe.safe_decode(field).rpartition('|')
+            stats.setdefault(method, MethodStats()).add_field(name, frappe.safe_decode(value))
+
+    rows = [method_stats.summarize(method) for method, method_stats in stats.items()]
+    return {
+        'enabled': is_enabled(),
+        'minutes': minutes,
+        'methods': sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+    }
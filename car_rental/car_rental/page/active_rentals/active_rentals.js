@@ -0,0 +1,120 @@
+// Copyright (c) 2025, Hala and contributors
+// For license information, please see license.txt
+
+const ACTIVE_RENTALS_EVENT = 'car_rental_active_rentals';
+
+frappe.pages['active-rentals'].on_page_load = function(wrapper) {
+    const page = frappe.ui.make_app_page({
+        parent: wrapper,
+        title: __('Active Rentals'),
+        single_column: true
+    });
+    wrapper.active_rentals = new ActiveRentalsBoard(page);
+};
+
+frappe.pages['active-rentals'].on_page_show = function(wrapper) {
+    // Diffs published while the page was hidden were not applied
+    if (wrapper.active_rentals) {
+        wrapper.active_rentals.load_snapshot();
+    }
+};
+
+class ActiveRentalsBoard {
+    constructor(page) {
+        this.page = page;
+        this.rows = {};
+        this.pending = null;
+        this.$body = $('<div class="active-rentals-board"></div>').appendTo(page.main);
+        this.page.set_secondary_action(__('Reload'), () => this.load_snapshot());
+
+        frappe.realtime.on(ACTIVE_RENTALS_EVENT, diff => this.on_diff(diff));
+        if (frappe.socketio && frappe.socketio.socket) {
+            // Diffs are published to the Rental Booking room, which checks read permission
+            frappe.socketio.doctype_subscribe('Rental Booking');
+            // Reconnecting may have dropped diffs, so start again from a snapshot
+            frappe.socketio.socket.on('reconnect', () => this.load_snapshot());
+        }
+    }
+
+    load_snapshot() {
+        // Diffs arriving while the snapshot loads are queued and replayed on top of it
+        this.pending = [];
+        frappe.call({
+            method: 'car_rental.car_rental.active_rentals.get_snapshot',
+            callback: r => {
+                const pending = this.pending || [];
+                this.pending = null;
+                this.rows = {};
+                (r.message.rows || []).forEach(row => { this.rows[row.name] = row; });
+                pending.forEach(diff => this.apply_diff(diff));
+                this.render();
+            }
+        });
+    }
+
+    on_diff(diff) {
+        if (this.pending) {
+            this.pending.push(diff);
+            return;
+        }
+        this.apply_diff(diff);
+        this.render();
+    }
+
+    apply_diff(diff) {
+        (diff.upsert || []).forEach(row => {
+            const current = this.rows[row.name];
+            // Drop diffs that arrive after a newer version of the row
+            if (!current || current.modified <= row.modified) {
+                this.rows[row.name] = row;
+            }
+        });
+        (diff.remove || []).forEach(name => { delete this.rows[name]; });
+    }
+
+    render() {
+        const rows = Object.values(this.rows).sort((a, b) => (a.rental_end || '').localeCompare(b.rental_end || ''));
+        this.page.set_indicator(__('{0} active', [rows.length]), 'blue');
+
+        if (!rows.length) {
+            this.$body.html(`<div class="text-muted text-center" style="padding: 40px;">${__('No vehicles are out')}</div>`);
+            return;
+        }
+
+        const now = frappe.datetime.now_datetime();
+        this.$body.html(`
+            <table class="table table-bordered">
+                <thead>
+                    <tr>
+                        <th>${__('Rental Booking')}</th>
+                        <th>${__('Status')}</th>
+                        <th>${__('Customer')}</th>
+                        <th>${__('Vehicle')}</th>
+                        <th>${__('Rental Start')}</th>
+                        <th>${__('Rental End')}</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    ${rows.map(row => this.get_row_html(row, now)).join('')}
+                </tbody>
+            </table>
+        `);
+    }
+
+    get_row_html(row, now) {
+        const overdue = row.status === 'Out' && row.rental_end && row.rental_end < now;
+        const indicator = overdue ? 'red' : (row.status === 'Out' ? 'blue' : 'orange');
+        const status = overdue ? __('Overdue') : __(row.status);
+
+        return `
+            <tr>
+                <td><a href="#Form/Rental Booking/${encodeURIComponent(row.name)}">${frappe.utils.escape_html(row.name)}</a></td>
+                <td><span class="indicator ${indicator}">${status}</span></td>
+                <td>${frappe.utils.escape_html(row.customer || '')}</td>
+                <td>${frappe.utils.escape_html(row.vehicle || '')}</td>
+                <td>${frappe.datetime.str_to_user(row.rental_start)}</td>
+                <td>${frappe.datetime.str_to_user(row.rental_end)}</td>
+            </tr>
+        `;
+    }
+}
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Server-side rental pricing.
+
+Rental Rate Rules and vehicle rates are compiled into a RateTable of plain
+dict lookups, kept per process and rebuilt only when the pricing version in
+Redis changes (any Rental Rate Rule, Vehicle or Item update bumps it). Rent
+quotes are memoized per version, so a warm quote costs one Redis read.
+
+A day is priced at the base rate (the Base Rate rule of the vehicle's
+Vehicle Type, else the generic Base Rate rule, else the Rate Per Day stored
+on the Vehicle) times the Season and Weekday adjustments of that day. The
+Length Discount matching the number of days then applies to the rent total.
+Rules for a specific Vehicle Type take precedence over generic ones, and
+higher priority wins among rules of the same type. The rate entered on a
+booking is never used: a vehicle without a tariff or stored rate cannot be
+quoted, and its bookings cannot be submitted until it has one.
+"""
+
+from __future__ import unicode_literals
+import json
+from functools import lru_cache
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, date_diff, flt, getdate
+
+from car_rental.car_rental.instrumentation import instrument
+
+VERSION_KEY = 'car_rental:pricing_version'
+QUOTE_CACHE_SIZE = 8192
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+RULE_FIELDS = ['rule_type', 'vehicle_type', 'priority', 'rate', 'adjustment_percent',
+               'from_date', 'to_date', 'weekday', 'min_days']
+
+# {site: RateTable}; only the current version is kept
+_tables = {}
+
+
+class RateTable(object):
+    """Rate rules and vehicle rates compiled into dict lookups"""
+
+    def __init__(self, version, rules, vehicles):
+        self.version = version
+        self.base_rates = {}
+        self.weekday_percent = {}
+        self.season_percent = {}
+        self.length_discounts = {}
+        self.vehicles = {row.name: (flt(row.get('rate_per_day')), row.get('vehicle_type')) for row in vehicles}
+        self.item_rates = {}
+
+        # Ascending priority, so the highest priority rule is written last and wins
+        for rule in sorted(rules, key=lambda rule: cint(rule.priority)):
+            vehicle_type = rule.vehicle_type or None
+            if rule.rule_type == 'Base Rate':
+                self.base_rates[vehicle_type] = flt(rule.rate)
+            elif rule.rule_type == 'Weekday' and rule.weekday in WEEKDAYS:
+                self.weekday_percent[(vehicle_type, WEEKDAYS.index(rule.weekday))] = flt(rule.adjustment_percent)
+            elif rule.rule_type == 'Season' and rule.from_date and rule.to_date:
+                day = getdate(rule.from_date)
+                while day <= getdate(rule.to_date):
+                    self.season_percent[(vehicle_type, day)] = flt(rule.adjustment_percent)
+                    day = add_days(day, 1)
+            elif rule.rule_type == 'Length Discount' and cint(rule.min_days) > 0:
+                self.length_discounts.setdefault(vehicle_type, {})[cint(rule.min_days)] = flt(rule.adjustment_percent)
+
+        # Longest minimum first, so the first match is the best tier
+        self.length_discounts = {
+            vehicle_type: sorted(tiers.items(), reverse=True)
+            for vehicle_type, tiers in self.length_discounts.items()
+        }
+
+    @staticmethod
+    def _lookup(table, vehicle_type, key, default=0):
+        value = table.get((vehicle_type, key))
+        if value is None:
+            value = table.get((None, key), default)
+        return value
+
+    def get_base_rate(self, vehicle):
+        rate, vehicle_type = self.vehicles.get(vehicle, (0, None))
+        return self.base_rates.get(vehicle_type) or self.base_rates.get(None) or rate or 0
+
+    def get_vehicle_type(self, vehicle):
+        return self.vehicles.get(vehicle, (0, None))[1]
+
+    def get_day_factor(self, vehicle_type, day):
+        season = self._lookup(self.season_percent, vehicle_type, day)
+        weekday = self._lookup(self.weekday_percent, vehicle_type, day.weekday())
+        return (1 + season / 100.0) * (1 + weekday / 100.0)
+
+    def get_length_discount(self, vehicle_type, days):
+        tiers = self.length_discounts.get(vehicle_type) or self.length_discounts.get(None) or []
+        for min_days, percent in tiers:
+            if days >= min_days:
+                return percent
+        return 0
+
+    def get_item_rate(self, item_code):
+        if item_code not in self.item_rates:
+            self.item_rates[item_code] = flt(frappe.db.get_value('Item', item_code, 'standard_rate'))
+        return self.item_rates[item_code]
+
+
+def get_version():
+    version = frappe.cache().get_value(VERSION_KEY)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(VERSION_KEY, version)
+    return version
+
+
+@instrument
+def invalidate(doc=None, method=None):
+    """Drop compiled rate tables and memoized quotes on every worker (doc event)"""
+    frappe.cache().set_value(VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def _load_vehicles():
+    meta = frappe.get_meta('Vehicle')
+    fields = ['name'] + [f for f in ('rate_per_day', 'vehicle_type') if meta.has_field(f)]
+    return frappe.get_all('Vehicle', fields=fields)
+
+
+def get_rate_table():
+    """The compiled table for the current pricing version"""
+    version = get_version()
+    table = _tables.get(frappe.local.site)
+    if not table or table.version != version:
+        rules = frappe.get_all('Rental Rate Rule', filters={'enabled': 1}, fields=RULE_FIELDS)
+        table = RateTable(version, rules, _load_vehicles())
+        _tables[frappe.local.site] = table
+    return table
+
+
+@lru_cache(maxsize=QUOTE_CACHE_SIZE)
+def _quote_rent(site, version, vehicle, start_date, days):
+    table = _tables[site]
+    vehicle_type = table.get_vehicle_type(vehicle)
+    base_rate = table.get_base_rate(vehicle)
+
+    gross = 0
+    for i in range(days):
+        gross += base_rate * table.get_day_factor(vehicle_type, add_days(start_date, i))
+
+    discount_percent = table.get_length_discount(vehicle_type, days)
+    net = gross * (1 - discount_percent / 100.0)
+
+    # The booking and its invoice bill no_days x rate_per_day, so the quote
+    # is expressed as an average daily rate and the rent derived from it
+    rate_per_day = flt(net / days, 2)
+    return (base_rate, vehicle_type, flt(gross, 2), discount_percent, rate_per_day, flt(rate_per_day * days, 2))
+
+
+def has_rate(vehicle):
+    """Whether rent for `vehicle` can be quoted (it has a tariff or a stored rate)"""
+    return bool(get_rate_table().get_base_rate(vehicle))
+
+
+def get_rent_quote(vehicle, start_date, days):
+    """Rent for `days` days from `start_date`: base/average daily rate, discount and total"""
+    days = cint(days)
+    if days <= 0:
+        frappe.throw(_("End date must be after start date"))
+
+    table = get_rate_table()
+    if not table.get_base_rate(vehicle):
+        frappe.throw(_("No rate for Vehicle {0}: set its Rate Per Day or add a Base Rate rule").format(vehicle))
+
+    base_rate, vehicle_type, gross, discount_percent, rate_per_day, amount = _quote_rent(
+        frappe.local.site, table.version, vehicle, getdate(start_date), days)
+
+    return frappe._dict({
+        'vehicle': vehicle,
+        'vehicle_type': vehicle_type,
+        'no_days': days,
+        'base_rate': base_rate,
+        'gross_amount': gross,
+        'discount_percent': discount_percent,
+        'rate_per_day': rate_per_day,
+        'rental_amount': amount
+    })
+
+
+def price_services(services):
+    """[{service_name, rate, quantity, total}] for Additional Services rows.
+
+    Rows linked to a service Item use that Item's standard rate when it has
+    one; free-text services keep the entered rate.
+    """
+    table = get_rate_table()
+    priced = []
+    for service in services or []:
+        rate = flt(service.get('rate'))
+        if service.get('service_item'):
+            rate = table.get_item_rate(service.get('service_item')) or rate
+        quantity = cint(service.get('quantity')) or 1
+        priced.append(frappe._dict({
+            'service_name': service.get('service_name'),
+            'service_item': service.get('service_item'),
+            'rate': rate,
+            'quantity': quantity,
+            'total': flt(rate * quantity, 2)
+        }))
+    return priced
+
+
+@frappe.whitelist()
+@instrument
+def get_quote(vehicle, rental_start, rental_end, services=None):
+    """Price a prospective rental; the same figures RentalBooking.validate saves.
+
+    Returns None for a vehicle without any rate, so the form's preview stays
+    quiet; the booking submit reports the missing rate.
+    """
+    if isinstance(services, str):
+        services = json.loads(services)
+    if not has_rate(vehicle):
+        return None
+
+    quote = get_rent_quote(vehicle, rental_start, date_diff(rental_end, rental_start))
+    quote.services = price_services([frappe._dict(service) for service in services or []])
+    quote.services_amount = flt(sum(service.total for service in quote.services), 2)
+    quote.amount = flt(quote.rental_amount + quote.services_amount, 2)
+    return quote
@@ -0,0 +1,47 @@
+// Copyright (c) 2025, Hala and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Fleet Utilization"] = {
+    filters: [
+        {
+            fieldname: "from_date",
+            label: __("From Date"),
+            fieldtype: "Date",
+            default: frappe.datetime.add_months(frappe.datetime.get_today(), -1),
+            reqd: 1
+        },
+        {
+            fieldname: "to_date",
+            label: __("To Date"),
+            fieldtype: "Date",
+            default: frappe.datetime.get_today(),
+            reqd: 1
+        },
+        {
+            fieldname: "period",
+            label: __("Period"),
+            fieldtype: "Select",
+            options: "Whole Range\nMonthly\nQuarterly\nYearly",
+            default: "Monthly"
+        },
+        {
+            fieldname: "group_by",
+            label: __("Group By"),
+            fieldtype: "Select",
+            options: "Vehicle\nVehicle Type",
+            default: "Vehicle"
+        },
+        {
+            fieldname: "vehicle_type",
+            label: __("Vehicle Type"),
+            fieldtype: "Link",
+            options: "Vehicle Type"
+        },
+        {
+            fieldname: "include_confirmed",
+            label: __("Count Confirmed Bookings"),
+            fieldtype: "Check",
+            default: 0
+        }
+    ]
+};
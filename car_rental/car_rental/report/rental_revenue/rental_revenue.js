@@ -0,0 +1,40 @@
+// Copyright (c) 2025, Hala and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Rental Revenue"] = {
+    filters: [
+        {
+            fieldname: "from_date",
+            label: __("From Date"),
+            fieldtype: "Date",
+            default: frappe.datetime.add_months(frappe.datetime.get_today(), -1),
+            reqd: 1
+        },
+        {
+            fieldname: "to_date",
+            label: __("To Date"),
+            fieldtype: "Date",
+            default: frappe.datetime.get_today(),
+            reqd: 1
+        },
+        {
+            fieldname: "group_by",
+            label: __("Group By"),
+            fieldtype: "Select",
+            options: "Vehicle\nVehicle Type\nCustomer\nService Line\nPosting Date",
+            default: "Vehicle"
+        },
+        {
+            fieldname: "vehicle_type",
+            label: __("Vehicle Type"),
+            fieldtype: "Link",
+            options: "Vehicle Type"
+        },
+        {
+            fieldname: "customer",
+            label: __("Customer"),
+            fieldtype: "Link",
+            options: "Customer"
+        }
+    ]
+};
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, getdate
+
+# Group By option -> (rollup column, column definition)
+GROUP_BY_COLUMNS = {
+    'Vehicle': ('vehicle', {'label': _('Vehicle'), 'fieldtype': 'Link', 'options': 'Vehicle', 'width': 140}),
+    'Vehicle Type': ('vehicle_type', {'label': _('Vehicle Type'), 'fieldtype': 'Link', 'options': 'Vehicle Type', 'width': 130}),
+    'Customer': ('customer', {'label': _('Customer'), 'fieldtype': 'Link', 'options': 'Customer', 'width': 160}),
+    'Service Line': ('service_line', {'label': _('Service Line'), 'fieldtype': 'Data', 'width': 160}),
+    'Posting Date': ('posting_date', {'label': _('Posting Date'), 'fieldtype': 'Date', 'width': 110})
+}
+
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    if getdate(filters.to_date) < getdate(filters.from_date):
+        frappe.throw(_("To Date must be after From Date"))
+
+    group_by = filters.group_by if filters.group_by in GROUP_BY_COLUMNS else 'Vehicle'
+    rows = get_revenue(GROUP_BY_COLUMNS[group_by][0], filters)
+    for row in rows:
+        row['rental_count'] = cint(row['rental_count'])
+        row['invoiced_amount'] = flt(row['invoiced_amount'])
+        row['completed_amount'] = flt(row['completed_amount'])
+        row['open_amount'] = row['invoiced_amount'] - row['completed_amount']
+
+    return get_columns(group_by), rows
+
+
+def get_columns(group_by):
+    fieldname, column = GROUP_BY_COLUMNS[group_by]
+    return [
+        dict(column, fieldname=fieldname),
+        {'label': _('Rentals'), 'fieldname': 'rental_count', 'fieldtype': 'Int', 'width': 90},
+        {'label': _('Invoiced'), 'fieldname': 'invoiced_amount', 'fieldtype': 'Currency', 'width': 130},
+        {'label': _('Completed'), 'fieldname': 'completed_amount', 'fieldtype': 'Currency', 'width': 130},
+        {'label': _('Awaiting Completion'), 'fieldname': 'open_amount', 'fieldtype': 'Currency', 'width': 150}
+    ]
+
+
+def get_revenue(group_column, filters):
+    """Sum the daily Rental Revenue Rollup rows; never touches invoices or bookings"""
+    values = {'from_date': getdate(filters.from_date), 'to_date': getdate(filters.to_date)}
+    conditions = ''
+    for fieldname in ('vehicle_type', 'customer'):
+        if filters.get(fieldname):
+            conditions += ' and {0} = %({0})s'.format(fieldname)
+            values[fieldname] = filters.get(fieldname)
+
+    return frappe.db.sql("""
+        select {group_column},
+            sum(rental_count) as rental_count,
+            sum(invoiced_amount) as invoiced_amount,
+            sum(completed_amount) as completed_amount
+        from `tabRental Revenue Rollup`
+        where posting_date between %(from_date)s and %(to_date)s {conditions}
+        group by {group_column}
+        order by invoiced_amount desc
+    """.format(group_column=group_column, conditions=conditions), values, as_dict=True)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Due-boundary queue for date-driven vehicle status changes.
+
+A vehicle's status depends on the date: it can change on the first day of a
+Confirmed/Out booking and on the day after its last day. Whenever the
+occupancy calendar of a booking is written, those upcoming boundaries are
+pushed into a Redis sorted set scored by date. process_due_boundaries runs
+from the scheduler, pops only the boundaries that have passed and
+recomputes the status of just those vehicles, so each run costs in
+proportion to the transitions due, not to the fleet size.
+
+If Redis loses the queue, the next run seeds it again from the bookings
+that still have boundaries ahead.
+"""
+
+from __future__ import unicode_literals
+import time
+
+import frappe
+from frappe.utils import add_days, getdate, now, today
+
+from car_rental.car_rental.instrumentation import instrument
+
+QUEUE_KEY = 'car_rental:status_boundaries'
+SEEDED_KEY = 'car_rental:status_boundaries:seeded'
+LOCK_KEY = 'car_rental:status_boundaries:lock'
+LAST_RUN_KEY = 'car_rental:status_boundaries:last_run'
+LOCK_TTL = 600
+
+# Booking statuses whose calendar days make a vehicle Booked or Rented
+BOUNDARY_STATUSES = ('Confirmed', 'Out')
+
+
+def get_boundaries(booking, current_date=None):
+    """Future dates on which the booking can change its vehicle's status"""
+    if booking.get('docstatus') != 1 or booking.status not in BOUNDARY_STATUSES:
+        return []
+    if not booking.vehicle or not booking.rental_start or not booking.rental_end:
+        return []
+
+    current_date = getdate(current_date or today())
+    boundaries = [getdate(booking.rental_start), add_days(getdate(booking.rental_end), 1)]
+    return [day for day in boundaries if day > current_date]
+
+
+def _queue():
+    cache = frappe.cache()
+    return cache, cache.make_key(QUEUE_KEY)
+
+
+def push(entries):
+    """Queue (vehicle, date) boundaries; duplicates collapse into one member"""
+    if not entries:
+        return
+    cache, key = _queue()
+    cache.zadd(key, {f'{vehicle}|{day.toordinal()}': day.toordinal() for vehicle, day in entries})
+
+
+def push_bookings(bookings):
+    """Queue the upcoming boundaries of bookings; never fails the caller's save"""
+    try:
+        push([(booking.vehicle, day) for booking in bookings for day in get_boundaries(booking)])
+    except Exception as e:
+        frappe.log_error(f"Error queueing vehicle status boundaries: {str(e)}")
+
+
+def seed_queue():
+    """Queue every boundary still ahead, from the bookings table"""
+    rows = frappe.db.sql("""
+        select vehicle, docstatus, status, rental_start, rental_end
+        from `tabRental Booking`
+        where docstatus = 1 and status in %s and rental_end >= %s
+    """, (BOUNDARY_STATUSES, today()), as_dict=True)
+
+    entries = [(row.vehicle, day) for row in rows for day in get_boundaries(row)]
+    push(entries)
+    frappe.cache().set_value(SEEDED_KEY, 1)
+    return len(entries)
+
+
+def pop_due(current_date):
+    """Atomically take every boundary on or before `current_date` off the queue"""
+    cache, key = _queue()
+    pipe = cache.pipeline()
+    pipe.zrangebyscore(key, '-inf', current_date.toordinal())
+    pipe.zremrangebyscore(key, '-inf', current_date.toordinal())
+    members = pipe.execute()[0]
+    return [frappe.safe_decode(member) for member in members]
+
+
+def process_due_boundaries():
+    """Scheduler job: refresh the status of vehicles whose boundary has passed"""
+    from car_rental.car_rental import availability_cache, data_access
+    from car_rental.car_rental.doctype.rental_booking.rental_booking import set_vehicle_statuses
+    from car_rental.car_rental.doctype.vehicle_occupancy import vehicle_occupancy
+
+    cache = frappe.cache()
+    if not cache.set(cache.make_key(LOCK_KEY), 1, nx=True, ex=LOCK_TTL):
+        return
+
+    started = time.time()
+    current_date = getdate(today())
+    members = []
+    try:
+        seeded = 0
+        if not cache.get_value(SEEDED_KEY):
+            seeded = seed_queue()
+
+        members = pop_due(current_date)
+        vehicles = list({member.rsplit('|', 1)[0] for member in members})
+
+        current = data_access.get_fields_map('Vehicle', vehicles, ['status'])
+        changes = {}
+        for vehicle, status in vehicle_occupancy.get_vehicle_statuses(vehicles, current_date).items():
+            if vehicle in current and current[vehicle].status != status:
+                changes.setdefault(status, []).append(vehicle)
+        set_vehicle_statuses(changes)
+        frappe.db.commit()
+
+        for names in changes.values():
+            for vehicle in names:
+                availability_cache.invalidate(vehicle)
+
+        cache.set_value(LAST_RUN_KEY, {
+            'ran_at': now(),
+            'seeded': seeded,
+            'boundaries': len(members),
+            'vehicles': len(vehicles),
+            'updated': sum(len(names) for names in changes.values()),
+            'by_status': {status: len(names) for status, names in changes.items()},
+            'elapsed': round(time.time() - started, 4)
+        })
+    except Exception as e:
+        frappe.db.rollback()
+        # Put the boundaries back so the next run retries them
+        if members:
+            push([(member.rsplit('|', 1)[0], current_date) for member in members])
+        frappe.log_error(f"Error processing vehicle status boundaries: {str(e)}\n{frappe.get_traceback()}")
+    finally:
+        cache.delete(cache.make_key(LOCK_KEY))
+
+
+@frappe.whitelist()
+@instrument
+def get_queue_status():
+    """Queue size, next due boundary and the result of the last run"""
+    cache, key = _queue()
+    upcoming = cache.zrange(key, 0, 0, withscores=True)
+    next_due = None
+    if upcoming:
+        from datetime import date
+        next_due = date.fromordinal(int(upcoming[0][1]))
+
+    return {
+        'queued': cache.zcard(key),
+        'next_due': next_due,
+        'last_run': cache.get_value(LAST_RUN_KEY)
+    }
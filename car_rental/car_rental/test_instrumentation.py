@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and Contributors
+# See license.txt
+from __future__ import unicode_literals
+
+import unittest
+
+from car_rental.car_rental.instrumentation import Histogram, MethodStats
+
+
+class TestInstrumentation(unittest.TestCase):
+	def test_histogram_percentiles(self):
+		histogram = Histogram((10, 100, 1000))
+		for value in [5] * 50 + [50] * 45 + [500] * 4 + [5000]:
+			histogram.add(value)
+
+		self.assertEqual(histogram.count, 100)
+		self.assertEqual(histogram.percentile(0.5), 10)
+		self.assertEqual(histogram.percentile(0.95), 100)
+		self.assertEqual(histogram.percentile(0.99), 1000)
+		# Overflow values report the last bound
+		self.assertEqual(histogram.percentile(1), 1000)
+		self.assertIsNone(Histogram((10,)).percentile(0.5))
+
+	def test_method_stats_merge_across_flushes(self):
+		first, second = MethodStats(), MethodStats()
+		first.add(12.5, 3, 4.0)
+		second.add(40, 8, 20.0, error=True)
+
+		merged = MethodStats()
+		for stats in (first, second):
+			for field, value in stats.to_fields().items():
+				merged.add_field(field, str(value))
+		# Fields of an unknown layout are ignored
+		merged.add_field('wall:99', '1')
+
+		summary = merged.summarize('car_rental.test')
+		self.assertEqual(summary['calls'], 2)
+		self.assertEqual(summary['errors'], 1)
+		self.assertEqual(summary['total_ms'], 52.5)
+		self.assertEqual(summary['queries'], 5.5)
+		self.assertEqual(summary['db_ms'], 12.0)
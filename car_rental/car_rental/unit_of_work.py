@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, Hala and contributors
+# For license information, please see license.txt
+
+"""Collect the field changes of one lifecycle event and write them together.
+
+    with UnitOfWork() as uow:
+        uow.set_value('Rental Contract', contract, {'contract_status': 'Terminated'})
+        uow.set_value('Vehicle', vehicle, 'status', 'Available')
+
+Nothing touches the database until the block exits without an error. Changes
+are then written as one UPDATE per doctype and distinct set of values, and
+the surrounding request commits them in a single transaction. Background
+jobs pass commit=True to commit right after the writes.
+"""
+
+from __future__ import unicode_literals
+from collections import OrderedDict
+
+import frappe
+from frappe.utils import now
+
+
+class UnitOfWork(object):
+
+    def __init__(self, commit=False):
+        self.commit = commit
+        self.changes = OrderedDict()
+        self.callbacks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.apply()
+        else:
+            self.discard()
+        return False
+
+    def set_value(self, doctype, name, fieldname, value=None):
+        """Stage a change; later values for the same field win"""
+        if not name:
+            return
+        values = fieldname if isinstance(fieldname, dict) else {fieldname: value}
+        self.changes.setdefault((doctype, name), OrderedDict()).update(values)
+
+    def get_value(self, doctype, name, fieldname):
+        """A staged value, or None when the field has no pending change"""
+        return self.changes.get((doctype, name), {}).get(fieldname)
+
+    def after_apply(self, callback):
+        """Run `callback()` once the writes are done (cache invalidation etc.)"""
+        self.callbacks.append(callback)
+
+    def get_batches(self):
+        """[(doctype, values, [names])] grouping rows that receive identical values"""
+        batches = OrderedDict()
+        for (doctype, name), values in self.changes.items():
+            key = (doctype, tuple(values.items()))
+            batches.setdefault(key, []).append(name)
+        return [(doctype, OrderedDict(values), names) for (doctype, values), names in batches.items()]
+
+    def apply(self):
+        modified = now()
+        for doctype, values, names in self.get_batches():
+            assignments = ', '.join('`{0}` = %s'.format(fieldname) for fieldname in values)
+            frappe.db.sql("""
+                update `tab{doctype}`
+                set {assignments}, modified = %s, modified_by = %s
+                where name in %s
+            """.format(doctype=doctype, assignments=assignments),
+                tuple(values.values()) + (modified, frappe.session.user, tuple(names)))
+
+        self.changes.clear()
+        if self.commit:
+            frappe.db.commit()
+
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def discard(self):
+        self.changes.clear()
+        self.callbacks = []
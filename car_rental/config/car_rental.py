@@ -58,31 +58,30 @@ def get_data():
             
             ]
         },
-        # {
-        #     "label": _("Reports & Analytics"),
-        #     "icon": "fa fa-bar-chart",
-        #     "items": [
-        #         {
-        #             "type": "report",
-        #             "name": "Fleet Utilization",
-        #             "doctype": "Vehicle", 
-        #             "is_query_report": True,
-        #             "description": _("Vehicle utilization analysis")
-        #         },
-        #         {
-        #             "type": "report", 
-        #             "name": "Rental Revenue",
-        #             "doctype": "Rental Booking",
-        #             "is_query_report": True,
-        #             "description": _("Revenue and earnings report")
-        #         },
-        #         {
-        #             "type": "report",
-        #             "name": "Active Rentals",
-        #             "doctype": "Rental Booking", 
-        #             "is_query_report": True,
-        #             "description": _("Currently active rentals")
-        #         }
-        #     ]
-        # }
+        {
+            "label": _("Reports & Analytics"),
+            "icon": "fa fa-bar-chart",
+            "items": [
+                {
+                    "type": "report",
+                    "name": "Fleet Utilization",
+                    "doctype": "Vehicle", 
+                    "is_query_report": True,
+                    "description": _("Vehicle utilization analysis")
+                },
+                {
+                    "type": "report", 
+                    "name": "Rental Revenue",
+                    "doctype": "Rental Booking",
+                    "is_query_report": True,
+                    "description": _("Revenue and earnings report")
+                },
+                {
+                    "type": "page",
+                    "name": "active-rentals",
+                    "label": _("Active Rentals"),
+                    "description": _("Currently active rentals")
+                }
+            ]
+        }
     ]
\ No newline at end of file
@@ -24,7 +24,15 @@ doc_events = {
         "on_submit": "car_rental.car_rental.doctype.rental_booking.rental_booking.on_payment_entry_submit"
     },
     "Sales Invoice": {
-        "on_update_after_submit": "car_rental.car_rental.doctype.rental_booking.rental_booking.on_sales_invoice_update"
+        "on_update_after_submit": "car_rental.car_rental.doctype.rental_booking.rental_booking.on_sales_invoice_update",
+        "on_cancel": "car_rental.car_rental.doctype.rental_revenue_rollup.rental_revenue_rollup.on_sales_invoice_cancel"
+    },
+    "Vehicle": {
+        "on_update": "car_rental.car_rental.pricing.invalidate",
+        "on_trash": "car_rental.car_rental.pricing.invalidate"
+    },
+    "Item": {
+        "on_update": "car_rental.car_rental.pricing.invalidate"
     }
 }
 
@@ -101,6 +109,14 @@ doc_events = {
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+    "cron": {
+        "*/5 * * * *": [
+            "car_rental.car_rental.status_scheduler.process_due_boundaries"
+        ]
+    }
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"car_rental.tasks.all"
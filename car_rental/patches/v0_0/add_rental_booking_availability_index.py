@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from car_rental.car_rental.doctype.rental_booking.rental_booking import AVAILABILITY_INDEX_FIELDS
+
+
+def execute():
+    frappe.reload_doc('car_rental', 'doctype', 'rental_booking')
+    frappe.db.add_index('Rental Booking', AVAILABILITY_INDEX_FIELDS, 'vehicle_availability_index')
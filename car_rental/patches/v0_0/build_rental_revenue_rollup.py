@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from car_rental.car_rental.doctype.rental_revenue_rollup.rental_revenue_rollup import rebuild_revenue_rollup
+
+
+def execute():
+    frappe.reload_doc('car_rental', 'doctype', 'rental_revenue_rollup')
+    rebuild_revenue_rollup()
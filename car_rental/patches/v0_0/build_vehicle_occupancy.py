@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from car_rental.car_rental.doctype.vehicle_occupancy.vehicle_occupancy import rebuild_occupancy
+
+
+def execute():
+    frappe.reload_doc('car_rental', 'doctype', 'vehicle_occupancy')
+    rebuild_occupancy()